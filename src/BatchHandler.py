@@ -0,0 +1,83 @@
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import os
+
+import numpy as np
+
+try:
+    from .ClassHandler import Election, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
+except ImportError:
+    from ClassHandler import Election, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
+
+
+def run_election(run, seed, nof_voters, nof_parties, methods, paths=(FIRST_NAME_PATH, LAST_NAME_PATH,
+                                                                      PARTY_NAME_PATH)):
+    """
+    Generates and counts a single election, returning a compact summary of it rather than the Election itself.
+
+    Args:
+    - run (int): the number of the run within its batch.
+    - seed (np.random.SeedSequence): the seed of the run's random number generator.
+    - nof_voters (int): the number of voters to generate.
+    - nof_parties (int): the number of parties to generate.
+    - methods (tuple): the names of the voting methods to count the election with.
+    - paths (tuple): the paths to the first name, last name and party name files.
+    """
+    election = Election(prearrange_list=True, seed=seed)
+    election.prepare_election(nof_voters, nof_parties, *paths)
+
+    summary = {"run": run, "parties": [party.name for party in election.parties], "winners": {}, "counts": {}}
+    for method in methods:
+        result = election.count(method)
+        summary["winners"][method] = result.winner_index
+        summary["counts"][method] = result.counts.tolist()
+    return summary
+
+
+def run_batch(nof_runs, nof_voters=1000, nof_parties=5, methods=("fptp",), seed=None, workers=None,
+              paths=(FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH)):
+    """
+    Runs many independent elections across a pool of processes and returns the summary of each, in run order.
+
+    Every run gets its own random number stream spawned from the batch seed, so the same seed gives the same results
+    however many workers are used.
+
+    Args:
+    - nof_runs (int): the number of elections to run.
+    - nof_voters (int): the number of voters in each election.
+    - nof_parties (int): the number of parties in each election.
+    - methods (tuple): the names of the voting methods to count each election with.
+    - seed (int): the seed of the batch. A fresh seed is used when not given.
+    - workers (int): the number of processes to use, all available cores when not given. With one worker the runs
+        happen in this process.
+    - paths (tuple): the paths to the first name, last name and party name files.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(nof_runs)
+    arguments = (range(nof_runs), seeds, itertools.repeat(nof_voters), itertools.repeat(nof_parties),
+                 itertools.repeat(tuple(methods)), itertools.repeat(tuple(paths)))
+
+    if workers == 1:
+        return list(map(run_election, *arguments))
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Sends runs over in batches so that small elections are not dominated by inter-process overhead
+        return list(executor.map(run_election, *arguments, chunksize=max(1, nof_runs // (workers * 4))))
+
+
+def disagreement_rates(summaries):
+    """
+    Returns how often each pair of voting methods picked different winners across a batch of runs.
+
+    Args:
+    - summaries (list): the run summaries returned by run_batch.
+    """
+    if not summaries:
+        return {}
+
+    methods = list(summaries[0]["winners"])
+    rates = {}
+    for first, second in itertools.combinations(methods, 2):
+        disagreements = sum(summary["winners"][first] != summary["winners"][second] for summary in summaries)
+        rates[f"{first}/{second}"] = disagreements / len(summaries)
+    return rates
@@ -0,0 +1,184 @@
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    from .ClassHandler import (Election, FIRST_NAME_PATH, LAST_NAME_PATH, NEAREST_METHODS, PARTY_NAME_PATH,
+                               VOTING_METHODS)
+except ImportError:
+    from ClassHandler import (Election, FIRST_NAME_PATH, LAST_NAME_PATH, NEAREST_METHODS, PARTY_NAME_PATH,
+                              VOTING_METHODS)
+
+VOTER_COUNTS = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+PARTY_COUNTS = (2, 10, 100, 1000)
+
+# Methods that compare every pair of parties for every voter, so their work grows with the square of the parties
+PAIRWISE_METHODS = ("schulze", "copeland", "ranked_pairs")
+
+# The most units of work (voter-party cells, or voter-party-party cells for pairwise methods) a method is timed at.
+# Bigger points are recorded as skipped rather than left to run for hours or run out of memory
+MAX_WORK = 1 << 28
+
+
+def method_work(method, nof_voters, nof_parties):
+    """
+    Returns roughly how many units of work counting an election with the named method takes.
+
+    Args:
+    - method (str): the name of the voting method.
+    - nof_voters (int): the number of voters.
+    - nof_parties (int): the number of parties.
+    """
+    if method in NEAREST_METHODS:
+        return nof_voters
+    if method in PAIRWISE_METHODS:
+        return nof_voters * nof_parties * nof_parties
+    return nof_voters * nof_parties
+
+
+def measure(setup, function, repeat=3):
+    """
+    Times a function and measures the most memory it allocates, returning the fastest time in seconds and the peak
+    number of bytes allocated. The function is run repeat times untraced for the timing and once more under
+    tracemalloc for the memory, as tracing slows it down. NumPy reports its arrays to tracemalloc, so they are counted.
+
+    Args:
+    - setup (callable): a function taking no arguments that returns the argument to pass to function. It is called
+        before every run and is not timed.
+    - function (callable): the function to measure.
+    - repeat (int): the number of timed runs.
+    """
+    times = []
+    for _ in range(max(repeat, 1)):
+        argument = setup()
+        start = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - start)
+
+    argument = setup()
+    tracemalloc.start()
+    try:
+        function(argument)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def environment():
+    """Returns a description of the machine and code the benchmarks were run on, so results can be told apart."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count()}
+
+
+def benchmark_point(nof_voters, nof_parties, methods=("fptp",), repeat=3, seed=0, max_work=MAX_WORK,
+                    paths=(FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH)):
+    """
+    Benchmarks every phase of an election of one size, returning a row for each phase.
+
+    The phases are generation (prepare_election), assignment (generate_party_approval) and counting with each of the
+    given methods. Assignment and every method are timed from an empty cache, so a method's time includes the
+    distances or rankings it needs.
+
+    Args:
+    - nof_voters (int): the number of voters.
+    - nof_parties (int): the number of parties.
+    - methods (tuple): the names of the voting methods to time.
+    - repeat (int): the number of timed runs of each phase, the fastest of which is kept.
+    - seed (int): the seed of the generated election.
+    - max_work (int): methods that would take more work than this are skipped, see method_work.
+    - paths (tuple): the paths to the first name, last name and party name files.
+    """
+    def generate(election):
+        election.prepare_election(nof_voters, nof_parties, *paths)
+
+    seconds, peak = measure(lambda: Election(prearrange_list=True, seed=seed), generate, repeat)
+    rows = [{"phase": "generation", "voters": nof_voters, "parties": nof_parties, "seconds": seconds,
+             "peak_bytes": peak}]
+
+    election = Election(prearrange_list=True, seed=seed)
+    generate(election)
+
+    def cold():
+        election.clear_cache()
+        return election
+
+    seconds, peak = measure(cold, lambda e: e.generate_party_approval(), repeat)
+    rows.append({"phase": "assignment", "voters": nof_voters, "parties": nof_parties, "seconds": seconds,
+                 "peak_bytes": peak})
+
+    for method in methods:
+        row = {"phase": method, "voters": nof_voters, "parties": nof_parties}
+        if method_work(method, nof_voters, nof_parties) > max_work:
+            row["skipped"] = True
+        else:
+            row["seconds"], row["peak_bytes"] = measure(cold, lambda e: e.count(method), repeat)
+        rows.append(row)
+    election.clear_cache()
+    return rows
+
+
+def run_benchmarks(voter_counts=VOTER_COUNTS, party_counts=PARTY_COUNTS, methods=tuple(VOTING_METHODS), repeat=3,
+                   seed=0, max_work=MAX_WORK, paths=(FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH), progress=None):
+    """
+    Benchmarks every combination of the given numbers of voters and parties and returns a dictionary that can be
+    written as JSON: the environment it was run in and a row per phase per point, see benchmark_point.
+
+    Args:
+    - voter_counts (tuple): the numbers of voters to sweep.
+    - party_counts (tuple): the numbers of parties to sweep.
+    - methods (tuple): the names of the voting methods to time.
+    - repeat (int): the number of timed runs of each phase, the fastest of which is kept.
+    - seed (int): the seed of the generated elections.
+    - max_work (int): methods that would take more work than this are skipped, see method_work.
+    - paths (tuple): the paths to the first name, last name and party name files.
+    - progress (file): a file to report each point to as it finishes, such as sys.stderr. Nothing is reported when
+        not given.
+    """
+    unknown = [method for method in methods if method not in VOTING_METHODS]
+    if unknown:
+        raise ValueError(f"Error! Unknown voting method {unknown[0]!r}, expected one of {', '.join(VOTING_METHODS)}")
+
+    results = []
+    for nof_parties in party_counts:
+        for nof_voters in voter_counts:
+            rows = benchmark_point(nof_voters, nof_parties, methods, repeat, seed, max_work, paths)
+            results.extend(rows)
+            if progress is not None:
+                total = sum(row.get("seconds", 0) for row in rows)
+                print(f"{nof_voters} voters, {nof_parties} parties: {total:.3f}s", file=progress, flush=True)
+    return {"environment": environment(), "repeat": repeat, "seed": seed, "results": results}
+
+
+def compare_benchmarks(baseline, current, tolerance=0.25):
+    """
+    Returns the phases that got slower or used more memory between two benchmark runs, as a list of dictionaries
+    giving the phase, the point and the ratio of the current figure to the baseline.
+
+    Args:
+    - baseline (dict): the results of run_benchmarks on the code being compared against.
+    - current (dict): the results of run_benchmarks on the current code.
+    - tolerance (float): how much worse a figure may get before it counts, 0.25 meaning 25%.
+    """
+    previous = {(row["phase"], row["voters"], row["parties"]): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = previous.get((row["phase"], row["voters"], row["parties"]))
+        if old is None or row.get("skipped") or old.get("skipped"):
+            continue
+        for figure in ("seconds", "peak_bytes"):
+            if old[figure] and row[figure] > old[figure] * (1 + tolerance):
+                regressions.append({"phase": row["phase"], "voters": row["voters"], "parties": row["parties"],
+                                    "figure": figure, "ratio": row[figure] / old[figure]})
+    return regressions
+
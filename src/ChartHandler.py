@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+
+try:
+    from .LogHandler import PROFILER
+except ImportError:
+    from LogHandler import PROFILER
+
+# Charts are drawn one at a time off the counting thread, see render_in_background
+_executor = None
+
+
+def party_colours(nof_parties):
+    """
+    Returns a distinct colour for each of the given number of parties: the tab20 palette for up to 20 parties and
+    evenly spaced hues beyond that.
+
+    Args:
+    - nof_parties (int): the number of parties to colour.
+    """
+    from matplotlib import colormaps
+
+    if nof_parties <= 20:
+        return [colormaps["tab20"](i) for i in range(nof_parties)]
+    return [colormaps["hsv"](i / nof_parties) for i in range(nof_parties)]
+
+
+def render_pie_chart(result, path, file_format=None):
+    """
+    Draws a pie chart of an election result and saves it to a file, without opening a window. Matplotlib is only
+    imported the first time a chart is drawn.
+
+    Args:
+    - result (ElectionResult): the result to draw.
+    - path (str): the file to save the chart to.
+    - file_format (str): "png" or "svg", taken from the extension of path when not given.
+    """
+    with PROFILER.span("render"):
+        return _render_pie_chart(result, path, file_format)
+
+
+def _render_pie_chart(result, path, file_format):
+    """Draws and saves the chart, see render_pie_chart."""
+    # The Figure API draws straight to a file, so no GUI backend is ever loaded
+    from matplotlib.figure import Figure
+
+    party_names = [party.name for party in result.parties]
+    explode = [0.1 if i == result.winner_index else 0 for i in range(len(party_names))]
+
+    figure = Figure(figsize=(8, 8))
+    axes = figure.subplots()
+    axes.pie(result.counts, labels=party_names, colors=party_colours(len(party_names)), explode=explode,
+             autopct='%1.1f%%', shadow=True, startangle=140)
+    axes.axis('equal')
+    axes.set_title(f'Election Results ({result.method})')
+    axes.legend(loc='best')
+
+    if file_format is None:
+        file_format = os.path.splitext(path)[1].lstrip(".").lower() or "png"
+    figure.savefig(path, format=file_format)
+    PROFILER.count("charts rendered")
+    return path
+
+
+def render_in_background(result, path, file_format=None):
+    """
+    Draws a pie chart on a background thread and returns a Future that resolves to the path once the file is saved.
+
+    Args:
+    - result (ElectionResult): the result to draw.
+    - path (str): the file to save the chart to.
+    - file_format (str): "png" or "svg", taken from the extension of path when not given.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="charts")
+    return _executor.submit(render_pie_chart, result, path, file_format)
+
+
+def render_sweep_map(result, method, path, file_format=None):
+    """
+    Draws the map of a sweep for one voting method and saves it to a file. A sweep of one parameter is drawn as each
+    party's share of the vote against it, over a strip coloured by the winner; a sweep of two as a map coloured by the
+    winner at each grid point.
+
+    Args:
+    - result (SweepResult): the sweep to draw, see SweepHandler.
+    - method (str): the name of the voting method whose map to draw.
+    - path (str): the file to save the chart to.
+    - file_format (str): "png" or "svg", taken from the extension of path when not given.
+    """
+    with PROFILER.span("render"):
+        return _render_sweep_map(result, method, path, file_format)
+
+
+def _render_sweep_map(result, method, path, file_format):
+    """Draws and saves the map, see render_sweep_map."""
+    from matplotlib.colors import ListedColormap
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    if len(result.parameters) not in (1, 2):
+        raise ValueError("Error! Only sweeps of one or two parameters can be drawn")
+    colours = party_colours(len(result.parties))
+    colour_map = ListedColormap(colours)
+    names = list(result.parameters)
+    values = list(result.parameters.values())
+    winners = result.winners[method]
+
+    figure = Figure(figsize=(9, 7))
+    if len(names) == 1:
+        shares_axes, strip = figure.subplots(2, 1, sharex=True, gridspec_kw={"height_ratios": (5, 1)})
+        for i, party in enumerate(result.parties):
+            shares_axes.plot(values[0], result.shares[method][:, i], color=colours[i], label=party.name)
+        shares_axes.set_ylabel("share")
+        shares_axes.legend(loc="best")
+        # Each grid point's cell reaches halfway to its neighbours
+        middles = (values[0][1:] + values[0][:-1]) / 2
+        edges = np.concatenate(([2 * values[0][0] - (middles[0] if len(middles) else values[0][0] + 0.5)], middles,
+                                [2 * values[0][-1] - (middles[-1] if len(middles) else values[0][-1] - 0.5)]))
+        strip.pcolormesh(edges, [0, 1], winners[None, :], cmap=colour_map, vmin=-0.5, vmax=len(result.parties) - 0.5)
+        strip.set_yticks([])
+        strip.set_xlabel(names[0])
+        shares_axes.set_title(f"Sweep of {result.target} ({method})")
+    else:
+        axes = figure.subplots()
+        # The first parameter runs down the rows of the map, so it goes on the vertical axis
+        axes.pcolormesh(values[1], values[0], winners, cmap=colour_map, vmin=-0.5, vmax=len(result.parties) - 0.5,
+                        shading="nearest")
+        axes.set_xlabel(names[1])
+        axes.set_ylabel(names[0])
+        axes.set_title(f"Winner as {result.target} changes ({method})")
+        axes.legend(handles=[Patch(color=colours[i], label=result.parties[i].name) for i in np.unique(winners)],
+                    loc="best")
+
+    if file_format is None:
+        file_format = os.path.splitext(path)[1].lstrip(".").lower() or "png"
+    figure.savefig(path, format=file_format)
+    PROFILER.count("charts rendered")
+    return path
@@ -1,7 +1,74 @@
-import random
-import matplotlib.pyplot as plt
-from tqdm import *
+from collections.abc import Sequence
 import itertools
+import os
+import numpy as np
+
+try:
+    from .CorpusHandler import load_names
+    from .DistanceHandler import (chunk_rows, distance_matrix, l1_distances, pairwise_counts, pairwise_matrix,
+                                  party_positions, rank_distances, rank_matrix)
+    from .ElectorateHandler import check_age, Electorate
+    from .LogHandler import get_logger, PROFILER
+    from .StorageHandler import read_election_file, write_election_file
+    from .TallyHandler import (approval_tally, borda_tally, copeland_tally, fptp_from_counts, IncrementalTally,
+                               MethodComparison, ranked_pairs_tally, ranked_tally, SCORE_RANGE, schulze_tally,
+                               score_tally, StreamingTally)
+except ImportError:
+    from CorpusHandler import load_names
+    from DistanceHandler import (chunk_rows, distance_matrix, l1_distances, pairwise_counts, pairwise_matrix,
+                                 party_positions, rank_distances, rank_matrix)
+    from ElectorateHandler import check_age, Electorate
+    from LogHandler import get_logger, PROFILER
+    from StorageHandler import read_election_file, write_election_file
+    from TallyHandler import (approval_tally, borda_tally, copeland_tally, fptp_from_counts, IncrementalTally,
+                              MethodComparison, ranked_pairs_tally, ranked_tally, SCORE_RANGE, schulze_tally,
+                              score_tally, StreamingTally)
+
+# The name files shipped with the project
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+FIRST_NAME_PATH = os.path.join(DATA_DIRECTORY, "first_names.txt")
+LAST_NAME_PATH = os.path.join(DATA_DIRECTORY, "last_names.txt")
+PARTY_NAME_PATH = os.path.join(DATA_DIRECTORY, "party_names.txt")
+
+logger = get_logger("election")
+
+
+class IdCounter:
+    """
+    An itertools.count replacement that can also hand out a whole block of IDs at once, so that generating millions of
+    voters does not have to call next() once per voter.
+
+    Methods:
+    - reserve(count): Returns the first of count consecutive IDs.
+    """
+
+    def __init__(self):
+        self.next_id = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.reserve(1)
+
+    def reserve(self, count):
+        """
+        Returns the first of count consecutive IDs and moves the counter past them.
+
+        Args:
+        - count (int): the number of IDs to reserve.
+        """
+        first_id = self.next_id
+        self.next_id += count
+        return first_id
+
+
+def _id_number(prefix, object_id):
+    """Returns the number in an ID such as "V12", or None if the ID does not have the given prefix."""
+    object_id = str(object_id)
+    if not object_id.startswith(prefix) or not object_id[len(prefix):].isdigit():
+        return None
+    return int(object_id[len(prefix):])
 
 
 class Voter:
@@ -16,19 +83,22 @@ class Voter:
     - diplomatic_ideology (float): The diplomatic ideology of the voter, ranging from 0 to 1.
     - civil_ideology (float): The civil ideology of the voter, ranging from 0 to 1.
     - social_ideology (float): The social ideology of the voter, ranging from 0 to 1.
-    - preferred_party (Party): The political party that is most suitable for the voter based on their ideology spectrum
+    - party_scores (list): The distance from the voter to each party, in the order the parties were given.
+    - most_suitable_party (Party): The political party that is most suitable for the voter based on their ideology
+        spectrum.
 
     Methods:
     - __str__(): Returns a string representation of the voter's information.
     - __repr__(): Returns a string representation of the voter's information.
-    - determine_most_suitable_party(parties): Determines the political party that is most suitable for the voter based
-        on their ideological positions.
+    - generate_party_approval(parties): Scores every party by its distance from the voter and determines the
+        political party that is most suitable for the voter based on their ideological positions.
     """
 
-    id_obj = itertools.count()
+    id_obj = IdCounter()
 
     def __init__(self, first_name: str, last_name: str, age: int, economic_ideology: float,
-                 diplomatic_ideology: float, civil_ideology: float, social_ideology: float, election):
+                 diplomatic_ideology: float, civil_ideology: float, social_ideology: float, election,
+                 voter_id: str = None):
         """
         Initializes a Voter object with their personal information and political ideologies.
 
@@ -41,12 +111,13 @@ class Voter:
             civil_ideology (float): The civil ideology of the voter, ranging from 0 to 1.
             social_ideology (float): The social ideology of the voter, ranging from 0 to 1.
             election: The Election object the Voter is part of.
+            voter_id (str): The ID of the voter, only given when recreating a voter stored in an Electorate.
             party_scores: A list of party scores based on the voter's ideological positions and the parties' ideological
                 positions.
             most_suitable_party: The political party that is most suitable for the voter based on their ideological
                 positions.
         """
-        self.id = str("V" + str(next(Voter.id_obj)))
+        self.id = voter_id if voter_id is not None else str("V" + str(next(Voter.id_obj)))
         self.first_name: str = first_name
         self.last_name: str = last_name
         self.age: int = age
@@ -54,9 +125,9 @@ class Voter:
         self.diplomatic_ideology: float = diplomatic_ideology
         self.civil_ideology: float = civil_ideology
         self.social_ideology: float = social_ideology
-        self.generate_party_approval(election.parties)
         self.party_scores = []
-        self.most_suitable_party = self.party_scores.index(min(self.party_scores))
+        self.most_suitable_party = None
+        self.generate_party_approval(election.parties)
 
     def __str__(self):
         """
@@ -83,18 +154,13 @@ class Voter:
         Args:
             parties: A list of Party objects.
         """
-        self.party_scores = []
-
-        for party in parties:
-            voter_party_difference = [abs(self.economic_ideology - party.economic_ideology),
-                                      abs(self.diplomatic_ideology - party.diplomatic_ideology),
-                                      abs(self.civil_ideology - party.civil_ideology),
-                                      abs(self.social_ideology - party.social_ideology)]
-
-            voter_difference_total = sum(voter_party_difference)
-            self.party_scores.append(voter_difference_total)
+        ideology = np.array([[self.economic_ideology, self.diplomatic_ideology, self.civil_ideology,
+                              self.social_ideology]], dtype=np.float32)
+        # Uses the same distance calculation as Election.party_distances so a voter always agrees with its election
+        self.party_scores = l1_distances(ideology, party_positions(parties))[0].tolist()
 
-        self.most_suitable_party = parties[self.party_scores.index(min(self.party_scores))]
+        if self.party_scores:
+            self.most_suitable_party = parties[self.party_scores.index(min(self.party_scores))]
 
 
 class Party:
@@ -142,23 +208,113 @@ class Party:
         return self.__str__()
 
 
+class VoterView(Sequence):
+    """
+    A read-only list of the voters in an election that creates Voter objects from the Electorate as they are accessed.
+    """
+
+    def __init__(self, election):
+        self.election = election
+
+    def __len__(self):
+        return len(self.election.electorate)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.election.materialize_voter(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("voter index out of range")
+        return self.election.materialize_voter(index)
+
+    def __str__(self):
+        return str(list(self))
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class PartyList(list):
+    """
+    The list of an election's parties. It behaves exactly like a list, but every change made to it moves its version
+    on, so the election can tell when its index from party ID to position is out of date without checking the list.
+
+    Attributes:
+    - version (int): a counter that goes up whenever the list is changed.
+    """
+
+    # A class attribute, so the counter also works while a pickled list is filled in before its attributes are set
+    version = 0
+
+    def _changed(method):
+        """Wraps a list method that changes the list so that it moves the version on."""
+        def changed(self, *args):
+            self.version += 1
+            return method(self, *args)
+
+        changed.__name__ = method.__name__
+        changed.__doc__ = method.__doc__
+        return changed
+
+    __setitem__ = _changed(list.__setitem__)
+    __delitem__ = _changed(list.__delitem__)
+    __iadd__ = _changed(list.__iadd__)
+    __imul__ = _changed(list.__imul__)
+    append = _changed(list.append)
+    extend = _changed(list.extend)
+    insert = _changed(list.insert)
+    pop = _changed(list.pop)
+    remove = _changed(list.remove)
+    clear = _changed(list.clear)
+    reverse = _changed(list.reverse)
+    del _changed
+
+    def sort(self, *, key=None, reverse=False):
+        self.version += 1
+        super().sort(key=key, reverse=reverse)
+
+
 class Election:
     """
     A class representing an election with voters and political parties.
 
     Attributes:
-    - voters (list): a list of Voter objects representing the voters in the election.
+    - electorate (Electorate): the array-backed store of every voter in the election.
+    - voters (VoterView): the voters in the election, created as Voter objects when accessed.
     - parties (list): a list of Party objects representing the political parties in the election.
+    - rng (np.random.Generator): the random number generator used to generate parties and voters.
+    - interactive (bool): whether missing arguments are asked for on the terminal.
+    - chart (Future): the pie chart FPTP_vote last drew in the background, None until one is drawn.
 
     Methods:
     - __str__(): Returns a string representation of the election's voters and parties.
     - __repr__(): Returns a string representation of the election's voters and parties.
     - generate_election(nof_voters): Generates a list of voters with random attributes.
+    - stream_election(nof_voters, nof_parties): Generates and counts an election chunk by chunk without storing voters.
+    - count(method): Counts the election with the named voting method.
+    - compare_methods(methods): Counts the election with several voting methods from one set of distances.
+    - save(path): Saves the voters and parties to a file.
+    - load(path): Opens an election saved to a file, memory mapping its voters.
     - FPTP_vote(): Determines the winner of the election using First Past The Post.
-    - generate_pie_charts(): Generates pie charts of the election winners.
+    - party_distances(): Returns the voters x parties distance matrix.
+    - clear_cache(): Forgets the distances, rankings and tallies worked out so far.
+    - generate_party_approval(): Returns the most suitable party of every voter.
+    - first_preference_counts(): Returns how many voters find each party the most suitable.
+    - party_rankings(): Returns each voter's ranking of the parties.
+    - IRV_vote(): Determines the winner of the election using Instant Runoff Voting.
+    - STV_vote(seats): Determines the winners of the election using the Single Transferable Vote.
+    - Approval_vote(threshold, k): Determines the winner of the election using approval voting.
+    - Score_vote(max_score): Determines the winner of the election using score voting.
+    - Borda_vote(): Determines the winner of the election using the Borda count.
+    - pairwise_preferences(): Returns how many voters prefer each party to each other party.
+    - Schulze_vote(): Determines the winner of the election using the Schulze method.
+    - Copeland_vote(): Determines the winner of the election using Copeland's method.
+    - RankedPairs_vote(): Determines the winner of the election using Ranked Pairs.
+    - generate_pie_charts(result): Draws a pie chart of the election results to a file.
     """
 
-    def __init__(self, nof_voters=1000, nof_parties=5, prearrange_list=False):
+    def __init__(self, nof_voters=1000, nof_parties=5, prearrange_list=False, seed=None, interactive=False):
         """
         Initializes an Election object with an empty list of voters and an empty list of parties.
         Generates a list of voters using the generate_election method.
@@ -167,9 +323,20 @@ class Election:
         - nof_voters (int): the number of voters to generate.
         - nof_parties (int): the number of parties to generate.
         - prearrange_list (bool): whether to generate a list of voters and parties or not.
+        - seed (int or np.random.SeedSequence): the seed for the election's random number generator, so that the same
+            seed always generates the same election. A fresh seed is used when not given.
+        - interactive (bool): whether to ask for missing arguments on the terminal. When False a missing argument
+            raises a ValueError instead, so scripts never block waiting for input.
         """
-        self.voters = []
+        self.electorate = Electorate()
         self.parties = []
+        self.rng = np.random.default_rng(seed)
+        self.interactive = interactive
+        self.chart = None
+        self._cache = {}
+        self._cache_key = None
+        self._party_index = {}
+        self._party_index_version = None
         if not prearrange_list:
             self.prepare_election(nof_voters, nof_parties)
 
@@ -177,7 +344,7 @@ class Election:
         """
         Returns a string representation of the election's voters and parties.
         """
-        return f"""Voters: {self.voters}
+        return f"""Voters: {len(self.electorate)}
         Parties: {self.parties}"""
 
     def __repr__(self):
@@ -186,8 +353,192 @@ class Election:
         """
         return self.__str__()
 
+    @property
+    def parties(self):
+        """The Party objects standing in the election, as a PartyList."""
+        return self._parties
+
+    @parties.setter
+    def parties(self, parties):
+        """Replaces the parties in the election with the given Party objects, copying them into a PartyList."""
+        self._parties = PartyList(parties)
+        self._party_index_version = None
+
+    @property
+    def voters(self):
+        """The voters in the election, created as Voter objects when accessed."""
+        return VoterView(self)
+
+    @voters.setter
+    def voters(self, voters):
+        """Replaces the voters in the election with the given Voter objects."""
+        self.electorate.clear()
+        for voter in voters:
+            voter_id = _id_number("V", voter.id)
+            if voter_id is None:
+                voter_id = Voter.id_obj.reserve(1)
+            self.electorate.append(voter_id, voter.first_name, voter.last_name, voter.age,
+                                   [voter.economic_ideology, voter.diplomatic_ideology, voter.civil_ideology,
+                                    voter.social_ideology])
+
+    def materialize_voter(self, position):
+        """
+        Creates a Voter object for the voter stored in the given row of the electorate.
+
+        Args:
+        - position (int): the row of the voter in the electorate.
+        """
+        voter_id, first_name, last_name, age, ideology = self.electorate.row(position)
+        return Voter(first_name, last_name, age, *ideology, self, voter_id=f"V{voter_id}")
+
+    def _state_key(self):
+        """Returns a key that changes whenever the voters or the parties change."""
+        return (self.electorate.version, tuple((party.id, party.economic_ideology, party.diplomatic_ideology,
+                                                party.civil_ideology, party.social_ideology)
+                                               for party in self.parties))
+
+    def _current_tally(self):
+        """Returns the cached IncrementalTally if it is still up to date, or None."""
+        if self._cache_key != self._state_key():
+            return None
+        return self._cache.get("tally")
+
+    def _keep_tally(self, tally):
+        """Caches a tally that has been brought up to date with a change, dropping everything else in the cache."""
+        self._cache = {"tally": tally}
+        self._cache_key = self._state_key()
+
+    def _cached(self, name, compute):
+        """
+        Returns a value worked out from the voters and parties, only calling compute when the voters or the parties
+        have changed since it was last called.
+
+        Args:
+        - name (str): the name the value is cached under.
+        - compute (callable): a function taking no arguments that works out the value.
+        """
+        key = self._state_key()
+        if key != self._cache_key:
+            self._cache = {}
+            self._cache_key = key
+        if name in self._cache:
+            PROFILER.count("cache hits")
+        else:
+            # Only the distances themselves are timed as such, see _work_out_distances. Reducing a distance matrix
+            # that is already cached counts as part of the tally
+            self._cache[name] = compute()
+            PROFILER.count("cache misses")
+            logger.debug("Worked out %s for %d voters and %d parties", name, len(self.electorate), len(self.parties))
+        return self._cache[name]
+
+    def clear_cache(self):
+        """Forgets every value worked out from the voters and parties, so the next count works them out again."""
+        self._cache = {}
+        self._cache_key = None
+
+    def _work_out_distances(self, compute):
+        """
+        Calls compute, a function that works out the distance between every voter and every party, timing it as the
+        distances phase and counting the distances worked out.
+
+        Args:
+        - compute (callable): a function taking no arguments that works out the distances, or reduces them chunk by
+            chunk as they are worked out.
+        """
+        with PROFILER.span("distances"):
+            value = compute()
+        PROFILER.count("distance cells", len(self.electorate) * len(self.parties))
+        return value
+
+    def party_distances(self, chunk_size=None):
+        """
+        Returns the voters x parties matrix of L1 distances between each voter and each party. The matrix is kept
+        until the voters or parties change, so every voting method can share it.
+
+        Args:
+        - chunk_size (int): the number of voters to work on at once.
+        """
+        return self._cached("distances", lambda: self._work_out_distances(
+            lambda: distance_matrix(self.electorate.ideology, party_positions(self.parties), chunk_size)))
+
+    def _tally(self, chunk_size=None):
+        """
+        Returns the IncrementalTally of each voter's most suitable party. It is worked out from the distance matrix
+        when that has already been built, and is then kept up to date by add_party, delete_party, add_voter and
+        delete_voter rather than being worked out again.
+        """
+        def compute():
+            if "distances" in self._cache:
+                distances = self._cache["distances"]
+                preferred = distances.argmin(axis=1)
+                return IncrementalTally(preferred, distances[np.arange(len(distances)), preferred], len(self.parties))
+            return self._work_out_distances(lambda: IncrementalTally.from_ideology(
+                self.electorate.ideology, party_positions(self.parties), chunk_size))
+
+        return self._cached("tally", compute)
+
+    def generate_party_approval(self, chunk_size=None):
+        """
+        Returns the index into self.parties of the most suitable party for every voter, worked out for the whole
+        electorate in chunks. Reuses the distance matrix when it has already been built.
+
+        Args:
+        - chunk_size (int): the number of voters to work on at once.
+        """
+        return self._tally(chunk_size).preferred
+
+    def first_preference_counts(self):
+        """Returns the number of voters whose most suitable party is each party."""
+        return self._tally().counts
+
+    def _load_name_files(self, first_name_path, last_name_path, party_name_path):
+        """
+        Loads the first name, last name and party name files, using the files in the data directory for any path that
+        is not given. Each file is only read once per process, see CorpusHandler.load_names.
+
+        Args:
+        - first_name_path (str): the path to the first_names.txt file.
+        - last_name_path (str): the path to the last_names.txt file.
+        - party_name_path (str): the path to the party_names.txt file.
+        """
+        first_name_path = first_name_path or FIRST_NAME_PATH
+        last_name_path = last_name_path or LAST_NAME_PATH
+        party_name_path = party_name_path or PARTY_NAME_PATH
+
+        with PROFILER.span("corpus load"):
+            try:
+                first_names_f = load_names(first_name_path)
+            except FileNotFoundError:
+                raise FileNotFoundError("Error! Could not load first_names.txt")
+
+            try:
+                last_names_f = load_names(last_name_path)
+            except FileNotFoundError:
+                raise FileNotFoundError("Error! Could not load last_names.txt")
+
+            try:
+                parties_f = load_names(party_name_path)
+            except FileNotFoundError:
+                raise FileNotFoundError("Error! Could not load party_names.txt")
+
+        logger.debug("Loaded %d first names, %d last names and %d party names", len(first_names_f), len(last_names_f),
+                     len(parties_f))
+        return first_names_f, last_names_f, parties_f
+
+    def _generate_parties(self, nof_parties, parties_f):
+        """
+        Adds the given number of parties with random ideologies, named from the list of party names. Once the names
+        run out they are reused with a number after them, so large candidate fields can be generated.
+        """
+        for i in range(nof_parties):
+            economic, diplomatic, civil, social = np.round(self.rng.random(4), 2).tolist()
+            name = parties_f[i % len(parties_f)]
+            if i >= len(parties_f):
+                name = f"{name} {i // len(parties_f) + 1}"
+            self.parties.append(Party(name, economic, diplomatic, civil, social))
+
     def prepare_election(self, nof_voters, nof_parties, first_name_path=None, last_name_path=None,
-                         party_name_path=None):
+                         party_name_path=None, nof_districts=1):
         """
         Generates a list of voters and parties with random attributes.
 
@@ -197,78 +548,316 @@ class Election:
         - first_name_path (str): the path to the first_names.txt file.
         - last_name_path (str): the path to the last_names.txt file.
         - party_name_path (str): the path to the party_names.txt file.
+        - nof_districts (int): the number of districts (constituencies) voters are spread across at random.
         """
-        # Opens the file and reads the contents into a list
-        if not first_name_path:
-            first_name_path = input("Enter the path to the first_names.txt file: ")
-        if not last_name_path:
-            last_name_path = input("Enter the path to the last_names.txt file: ")
-        if not party_name_path:
-            party_name_path = input("Enter the path to the party_names.txt file: ")
+        first_names_f, last_names_f, parties_f = self._load_name_files(first_name_path, last_name_path,
+                                                                       party_name_path)
+        with PROFILER.span("generation"):
+            self._generate_parties(nof_parties, parties_f)
+
+            # Voters are stored as codes into the name tables, so the tables can only be swapped while there are no
+            # voters
+            if not len(self.electorate):
+                self.electorate = Electorate(first_names_f, last_names_f)
+            self.electorate.generate(nof_voters, Voter.id_obj.reserve(nof_voters), self.rng,
+                                     nof_districts=nof_districts)
+        PROFILER.count("voters generated", nof_voters)
+        PROFILER.count("parties generated", nof_parties)
+        logger.info("Generated %d voters and %d parties", nof_voters, nof_parties)
+
+    def stream_election(self, nof_voters, nof_parties, methods=("fptp",), chunk_size=1 << 16, first_name_path=None,
+                        last_name_path=None, party_name_path=None, **options):
+        """
+        Generates parties and then voters one chunk at a time, folding each chunk of voters into running tallies and
+        discarding it. The voters are never stored, so memory use does not depend on the number of voters. Returns a
+        dictionary of the result of each voting method.
 
-        try:
-            with open(first_name_path, "r") as f:
-                first_names_f = f.readlines()
-                first_names_f = [x.strip() for x in first_names_f]
-        except FileNotFoundError:
-            raise FileNotFoundError("Error! Could not load first_names.txt")
+        Only methods whose tallies can be added up chunk by chunk can be streamed, see StreamingTally.
 
-        try:
-            with open(last_name_path, "r") as f:
-                last_names_f = f.readlines()
-                last_names_f = [x.strip() for x in last_names_f]
-        except FileNotFoundError:
-            raise FileNotFoundError("Error! Could not load last_names.txt")
+        Args:
+        - nof_voters (int): the number of voters to generate.
+        - nof_parties (int): the number of parties to generate.
+        - methods (tuple): the names of the voting methods to count the election with.
+        - chunk_size (int): the number of voters generated at once.
+        - first_name_path (str): the path to the first_names.txt file.
+        - last_name_path (str): the path to the last_names.txt file.
+        - party_name_path (str): the path to the party_names.txt file.
+        - options: the options of the approval and score methods, such as threshold or max_score.
+        """
+        first_names_f, last_names_f, parties_f = self._load_name_files(first_name_path, last_name_path,
+                                                                       party_name_path)
+        with PROFILER.span("generation"):
+            self._generate_parties(nof_parties, parties_f)
+
+        tally = StreamingTally(self.parties, methods, **options)
+        positions = party_positions(self.parties)
+        generator = Electorate(first_names_f, last_names_f)
+        chunks = generator.generate_chunks(nof_voters, Voter.id_obj.reserve(nof_voters), self.rng, chunk_size)
+        while True:
+            with PROFILER.span("generation"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            rows = chunk_rows(len(positions))
+            for start in range(0, len(chunk), rows):
+                with PROFILER.span("distances"):
+                    distances = l1_distances(chunk.ideology[start:start + rows], positions)
+                with PROFILER.span("tally"):
+                    tally.add(distances)
+            PROFILER.count("voters generated", len(chunk))
+            PROFILER.count("distance cells", len(chunk) * len(positions))
+        logger.info("Streamed %d voters and %d parties", nof_voters, nof_parties)
+
+        with PROFILER.span("tally"):
+            return {method: tally.result(method) for method in methods}
+
+    def compare_methods(self, methods=None, **options):
+        """
+        Counts the election with several voting methods and returns their results side by side as a
+        MethodComparison.
 
-        try:
-            with open(party_name_path, "r") as f:
-                parties_f = f.readlines()
-                parties_f = [x.strip() for x in parties_f]
-        except FileNotFoundError:
-            raise FileNotFoundError("Error! Could not load party_names.txt")
+        When any method needs more than each voter's closest party, the voters x parties distance matrix is worked out
+        once and every ranking, tally and pairwise count is then reduced from it, so the voters are only compared with
+        the parties in a single pass. Everything worked out is cached until the voters or the parties change, so
+        comparing again, or counting with one of the methods afterwards, reuses it.
 
-        # Generates a list of parties
-        for i in range(nof_parties):
-            self.parties.append(Party(parties_f[i], round(random.random(), 2), round(random.random(), 2),
-                                      round(random.random(), 2), round(random.random(), 2)))
+        Args:
+        - methods (tuple): the names of the voting methods to compare, every method in VOTING_METHODS except "stv"
+            when not given.
+        - options: options for the methods that take them, such as seats for "stv" or threshold for "approval". Each
+            is only passed to the methods in METHOD_OPTIONS that take it.
+        """
+        methods = tuple(methods) if methods else tuple(method for method in VOTING_METHODS if method != "stv")
+        for method in methods:
+            if method not in VOTING_METHODS:
+                raise ValueError(f"Error! Unknown voting method {method!r}, expected one of "
+                                 f"{', '.join(VOTING_METHODS)}")
+        known = {option for names in METHOD_OPTIONS.values() for option in names}
+        for option in options:
+            if option not in known:
+                raise ValueError(f"Error! Unknown voting method option {option!r}")
+
+        if any(method not in NEAREST_METHODS for method in methods):
+            self.party_distances()
+        return MethodComparison(self.parties, {method: self.count(method, **method_options(method, options))
+                                               for method in methods})
+
+    def save(self, path):
+        """
+        Saves the voters, the parties and the state of the random number generator to a single binary file, see
+        StorageHandler.write_election_file.
+
+        Args:
+        - path (str): the file to write.
+        """
+        ids = self.electorate.ids
+        parties = [{"name": party.name,
+                    "ideology": [party.economic_ideology, party.diplomatic_ideology, party.civil_ideology,
+                                 party.social_ideology]} for party in self.parties]
+        metadata = {"rng": self.rng.bit_generator.state, "next_voter_id": int(ids.max()) + 1 if len(ids) else 0}
+        write_election_file(path, self.electorate, parties, metadata)
+        logger.info("Saved %d voters and %d parties to %s", len(self.electorate), len(self.parties), path)
+
+    @classmethod
+    def load(cls, path, seed=None, interactive=False):
+        """
+        Opens an election saved with save. The voters are memory mapped rather than read, so opening takes
+        milliseconds however many there are and processes that open the same file share its memory. Changes to the
+        loaded election are never written back to the file.
+
+        The parties are given new IDs, as IDs are only unique within a process. The random number generator carries
+        on from where the saved election's left off unless a seed is given.
+
+        Args:
+        - path (str): the file to open.
+        - seed (int or np.random.SeedSequence): a new seed for the election's random number generator.
+        - interactive (bool): whether to ask for missing arguments on the terminal.
+        """
+        with PROFILER.span("corpus load"):
+            electorate, parties, metadata = read_election_file(path)
+
+        election = cls(prearrange_list=True, seed=seed, interactive=interactive)
+        election.electorate = electorate
+        election.parties = [Party(party["name"], *party["ideology"]) for party in parties]
+        if seed is None and metadata.get("rng", {}).get("bit_generator") == election.rng.bit_generator.state[
+                "bit_generator"]:
+            election.rng.bit_generator.state = metadata["rng"]
+
+        # Voters added from now on must not reuse the IDs of the saved voters
+        Voter.id_obj.next_id = max(Voter.id_obj.next_id, metadata.get("next_voter_id", 0))
+        logger.info("Loaded %d voters and %d parties from %s", len(electorate), len(parties), path)
+        return election
+
+    def count(self, method, **options):
+        """
+        Counts the election with the named voting method and returns the result, without printing or drawing anything.
+
+        Args:
+        - method (str): the name of the voting method, one of the keys of VOTING_METHODS.
+        - options: any further arguments the voting method takes, such as seats for "stv".
+        """
+        if method not in VOTING_METHODS:
+            raise ValueError(f"Error! Unknown voting method {method!r}, expected one of {', '.join(VOTING_METHODS)}")
+        with PROFILER.span("tally"):
+            result = VOTING_METHODS[method](self, **options)
+        PROFILER.count("ballots counted", len(self.electorate))
+        logger.debug("Counted %d ballots with %s", len(self.electorate), method)
+        return result
+
+    def FPTP_vote(self, chart_path=None):
+        """
+        Determines the winner of the election using First Past The Post. Every first preference is counted in one pass
+        and the Party objects are left untouched, so the count can be repeated. Returns an ElectionResult.
+
+        Args:
+        - chart_path (str): a PNG or SVG file to draw a pie chart of the results to in the background. No chart is
+            drawn when not given. Wait on the chart attribute for the file to be saved; an error drawing it is logged.
+        """
+        result = self.count("fptp")
+        print(result)
+
+        if chart_path:
+            def report(chart):
+                # Callers need not wait on the chart, so its error is reported here rather than lost with the Future
+                if not chart.cancelled() and chart.exception() is not None:
+                    logger.error("Could not draw the chart to %s: %s", chart_path, chart.exception())
+
+            self.chart = self.generate_pie_charts(result, chart_path, background=True)
+            self.chart.add_done_callback(report)
+        return result
+
+    def party_rankings(self, chunk_size=None):
+        """
+        Returns the voters x parties matrix of each voter's ranking of the parties, from most to least suitable. The
+        matrix is kept until the voters or parties change, and is sorted from the distance matrix when that has
+        already been built.
+
+        Args:
+        - chunk_size (int): the number of voters to work on at once.
+        """
+        def compute():
+            if "distances" in self._cache:
+                return rank_distances(self._cache["distances"], chunk_size)
+            return self._work_out_distances(lambda: rank_matrix(self.electorate.ideology,
+                                                                party_positions(self.parties), chunk_size))
+
+        return self._cached("rankings", compute)
+
+    def IRV_vote(self):
+        """Determines the winner of the election using Instant Runoff Voting. Returns a RunoffResult."""
+        result = self.count("irv")
+        print(result)
+        return result
 
-        for i in range(nof_voters):
-            self.voters.append(Voter(random.choice(first_names_f), random.choice(last_names_f), random.randint(18, 100),
-                                     round(random.random(), 2), round(random.random(), 2), round(random.random(), 2),
-                                     round(random.random(), 2), self))
+    def STV_vote(self, seats):
+        """
+        Determines the winners of the election using the Single Transferable Vote. Returns a RunoffResult.
+
+        Args:
+        - seats (int): the number of parties to elect.
+        """
+        result = self.count("stv", seats=seats)
+        print(f"Elected: {', '.join(party.name for party in result.winners)}")
+        return result
+
+    def Approval_vote(self, threshold=None, k=None):
+        """
+        Determines the winner of the election using approval voting. Returns an ElectionResult.
+
+        Args:
+        - threshold (float): every voter approves of each party within this distance of them.
+        - k (int): every voter approves of their k most suitable parties instead.
+        """
+        result = self.count("approval", threshold=threshold, k=k)
+        print(f"The winner is {result.winner.name} with {result.counts[result.winner_index]} approvals")
+        return result
+
+    def Score_vote(self, max_score=SCORE_RANGE):
+        """
+        Determines the winner of the election using score (range) voting. Returns an ElectionResult.
 
-    def FPTP_vote(self):
-        """Determines the winner of the election using First Past The Post. Returns the winner of the party."""
-        for party in self.parties:
-            for voter in tqdm(self.voters, desc=f"Counting votes for {party.name}", unit="voters"):
-                if voter.most_suitable_party == party:
-                    party.votes += 1
+        Args:
+        - max_score (int): the most points a voter can give a party.
+        """
+        result = self.count("score", max_score=max_score)
+        print(f"The winner is {result.winner.name} with {result.counts[result.winner_index]} points")
+        return result
 
-        sorted_parties = sorted(self.parties, key=lambda party: party.votes, reverse=True)
-        winner = sorted_parties[0]
-        print(f"The winner is {winner.name} with {winner.votes} votes")
+    def Borda_vote(self):
+        """Determines the winner of the election using the Borda count. Returns an ElectionResult."""
+        result = self.count("borda")
+        print(f"The winner is {result.winner.name} with {result.counts[result.winner_index]} points")
+        return result
 
-        self.generate_pie_charts(winner)
-        return winner
+    def pairwise_preferences(self, chunk_size=None):
+        """
+        Returns the parties x parties matrix of how many voters prefer party i to party j. The matrix is built once and
+        kept until the voters or parties change, so every Condorcet method shares it. It is counted from the distance
+        matrix when that has already been built.
 
-    def generate_pie_charts(self, winner):
-        """Creates a pie chart of the election results."""
-        winner_name = winner.name
+        Args:
+        - chunk_size (int): the number of voters to work on at once.
+        """
+        def compute():
+            if "distances" in self._cache:
+                return pairwise_counts(self._cache["distances"])
+            return self._work_out_distances(lambda: pairwise_matrix(self.electorate.ideology,
+                                                                    party_positions(self.parties), chunk_size))
+
+        return self._cached("pairwise", compute)
+
+    def Schulze_vote(self):
+        """Determines the winner of the election using the Schulze method. Returns a CondorcetResult."""
+        result = self.count("schulze")
+        print(f"The winner is {result.winner.name}")
+        return result
+
+    def Copeland_vote(self):
+        """Determines the winner of the election using Copeland's method. Returns a CondorcetResult."""
+        result = self.count("copeland")
+        print(f"The winner is {result.winner.name}")
+        return result
+
+    def RankedPairs_vote(self):
+        """Determines the winner of the election using Ranked Pairs. Returns a CondorcetResult."""
+        result = self.count("ranked_pairs")
+        print(f"The winner is {result.winner.name}")
+        return result
+
+    def generate_pie_charts(self, result, path="election_results.png", background=False):
+        """
+        Draws a pie chart of the election results to a PNG or SVG file, see ChartHandler.render_pie_chart. Returns the
+        path, or a Future that resolves to it when drawn in the background.
 
-        party_names = [party.name for party in self.parties]
-        party_votes = [party.votes for party in self.parties]
+        Args:
+        - result (ElectionResult): the result to draw.
+        - path (str): the file to save the chart to.
+        - background (bool): whether to draw the chart on a background thread rather than wait for it.
+        """
+        try:
+            from .ChartHandler import render_in_background, render_pie_chart
+        except ImportError:
+            from ChartHandler import render_in_background, render_pie_chart
 
-        winner_index = party_names.index(winner_name)
+        if background:
+            return render_in_background(result, path)
+        return render_pie_chart(result, path)
 
-        colours = ['gold', 'yellowgreen', 'lightcoral', 'lightskyblue']
+    def _ask(self, value, description, cast=str):
+        """
+        Returns an argument converted to the given type, asking for it on the terminal if it is missing and the election
+        is interactive.
 
-        plt.pie(party_votes, labels=party_names, colors=colours,
-                explode=[0 if i != winner_index else 0.1 for i in range(len(party_names))],
-                autopct='%1.1f%%', shadow=True, startangle=140)
-        plt.axis('equal')
-        plt.title('Election Results')
-        plt.legend(loc='best')
-        plt.show()
+        Args:
+        - value: the argument as given, None or "" when missing.
+        - description (str): what the argument is, e.g. "the name of the party".
+        - cast (type): the type to convert the argument to.
+        """
+        if value is None or value == "":
+            if not self.interactive:
+                raise ValueError(f"Error! No value given for {description}")
+            value = input(f"Enter {description}: ")
+        return cast(value)
 
     def clear_parties(self):
         """Clears the list of parties."""
@@ -276,7 +865,7 @@ class Election:
 
     def clear_voters(self):
         """Clears the list of voters."""
-        self.voters = []
+        self.electorate.clear()
 
     def add_party(self, name: str, economic_ideology: float, diplomatic_ideology: float, civil_ideology: float,
                   social_ideology: float):
@@ -290,18 +879,22 @@ class Election:
         - civil_ideology (float): the civil ideology of the party.
         - social_ideology (float): the social ideology of the party.
         """
-        if not name:
-            name = input("Enter the name of the party: ")
-        if not economic_ideology:
-            economic_ideology = float(input("Enter the economic ideology of the party: "))
-        if not diplomatic_ideology:
-            diplomatic_ideology = float(input("Enter the diplomatic ideology of the party: "))
-        if not civil_ideology:
-            civil_ideology = float(input("Enter the civil ideology of the party: "))
-        if not social_ideology:
-            social_ideology = float(input("Enter the social ideology of the party: "))
-
-        self.parties.append(Party(name, economic_ideology, diplomatic_ideology, civil_ideology, social_ideology))
+        name = self._ask(name, "the name of the party")
+        economic_ideology = self._ask(economic_ideology, "the economic ideology of the party", float)
+        diplomatic_ideology = self._ask(diplomatic_ideology, "the diplomatic ideology of the party", float)
+        civil_ideology = self._ask(civil_ideology, "the civil ideology of the party", float)
+        social_ideology = self._ask(social_ideology, "the social ideology of the party", float)
+
+        tally = self._current_tally()
+        party = Party(name, economic_ideology, diplomatic_ideology, civil_ideology, social_ideology)
+        indexed = self._party_index_version == self.parties.version
+        self.parties.append(party)
+        if indexed:
+            self._party_index[party.id] = len(self.parties) - 1
+            self._party_index_version = self.parties.version
+        if tally is not None:
+            tally.add_party(self.electorate.ideology, party_positions([party]))
+            self._keep_tally(tally)
 
     def add_voter(self, first_name: str, last_name: str, age: int, economic_ideology: float,
                   diplomatic_ideology: float, civil_ideology: float, social_ideology: float):
@@ -316,74 +909,134 @@ class Election:
         - civil_ideology (float): the civil ideology of the voter.
         - social_ideology (float): the social ideology of the voter.
         """
-        if not first_name:
-            first_name = input("Enter the first name of the voter: ")
-        if not last_name:
-            last_name = input("Enter the last name of the voter: ")
-        if not age:
-            age = input("Enter the age of the voter: ")
-        if not economic_ideology:
-            economic_ideology = input("Enter the economic ideology of the voter: ")
-        if not diplomatic_ideology:
-            diplomatic_ideology = input("Enter the diplomatic ideology of the voter: ")
-        if not civil_ideology:
-            civil_ideology = input("Enter the civil ideology of the voter: ")
-        if not social_ideology:
-            social_ideology = input("Enter the social ideology of the voter: ")
-
-        self.voters.append(Voter(first_name, last_name, age, economic_ideology, diplomatic_ideology,
-                                 civil_ideology, social_ideology, self))
+        first_name = self._ask(first_name, "the first name of the voter")
+        last_name = self._ask(last_name, "the last name of the voter")
+        age = self._ask(age, "the age of the voter", int)
+        economic_ideology = self._ask(economic_ideology, "the economic ideology of the voter", float)
+        diplomatic_ideology = self._ask(diplomatic_ideology, "the diplomatic ideology of the voter", float)
+        civil_ideology = self._ask(civil_ideology, "the civil ideology of the voter", float)
+        social_ideology = self._ask(social_ideology, "the social ideology of the voter", float)
+        check_age(age)
+
+        tally = self._current_tally()
+        self.electorate.append(Voter.id_obj.reserve(1), first_name, last_name, age,
+                               [economic_ideology, diplomatic_ideology, civil_ideology, social_ideology])
+        if tally is not None:
+            tally.add_voter(self.electorate.ideology[-1:], party_positions(self.parties))
+            self._keep_tally(tally)
 
     def delete_party(self, party_id):
-        """Deletes a party from the list of parties.
+        """Deletes a party from the list of parties. The last party takes its place, so this takes constant time.
 
         Args:
         - party_id (str): the ID of the party to delete."""
-        if not party_id:
-            party_id = input("Enter the ID of the party you want to delete: ")
-
-        for party in self.parties:
-            if party.id == party_id:
-                self.parties.remove(party)
-                break
+        party_id = self._ask(party_id, "the ID of the party you want to delete")
+
+        position = self._party_position(party_id)
+        if position is not None:
+            tally = self._current_tally()
+            # Moves the last party into the gap rather than shifting every party after it
+            last = self.parties.pop()
+            if position < len(self.parties):
+                self.parties[position] = last
+                self._party_index[last.id] = position
+            del self._party_index[party_id]
+            self._party_index_version = self.parties.version
+
+            if tally is not None and self.parties:
+                tally.remove_party(position, self.electorate.ideology, party_positions(self.parties))
+                self._keep_tally(tally)
 
     def delete_voter(self, voter_id):
-        """Deletes a voter from the list of voters.
+        """Deletes a voter from the list of voters. The last voter takes its place, so this takes constant time.
 
         Args:
         - voter_id (str): the ID of the voter to delete."""
-        if not voter_id:
-            voter_id = input("Enter the first name of the voter you want to delete: ")
+        voter_id = self._ask(voter_id, "the ID of the voter you want to delete")
 
-        for voter in self.voters:
-            if voter.name == voter_id:
-                self.voters.remove(voter)
-                break
+        position = self.electorate.position(_id_number("V", voter_id))
+        if position is not None:
+            tally = self._current_tally()
+            self.electorate.remove(position)
+            if tally is not None:
+                tally.remove_voter(position)
+                self._keep_tally(tally)
+
+    def _party_position(self, party_id):
+        """
+        Returns the position of the party with the given ID in self.parties, or None if there is no such party.
+
+        The hash index from ID to position is only rebuilt when self.parties has been replaced or changed since it
+        was built, which the PartyList's version shows, so it stays correct even when the list is edited directly and
+        looking up an unknown ID takes constant time.
+
+        Args:
+        - party_id (str): the ID of the party.
+        """
+        if self._party_index_version != self.parties.version:
+            self._rebuild_party_index()
+        return self._party_index.get(party_id)
+
+    def _rebuild_party_index(self):
+        """Rebuilds the hash index from party ID to position in self.parties."""
+        self._party_index = {party.id: i for i, party in enumerate(self.parties)}
+        self._party_index_version = self.parties.version
 
     def get_party(self, party_id):
         """Returns the party with the given ID.
 
         Args:
         - party_id (str): the ID of the party to get."""
-        if not party_id:
-            party_id = input("Enter the ID of the party you want to get: ")
-
-        for party in self.parties:
-            if party.id == party_id:
-                return party
+        party_id = self._ask(party_id, "the ID of the party you want to get")
 
-        return None
+        position = self._party_position(party_id)
+        if position is None:
+            return None
+        return self.parties[position]
 
     def get_voter(self, voter_id):
         """Returns the voter with the given ID.
 
         Args:
         - voter_id (str): the ID of the voter to get."""
-        if not voter_id:
-            voter_id = input("Enter the ID of the voter you want to get: ")
-
-        for voter in self.voters:
-            if voter.id == voter_id:
-                return voter
+        voter_id = self._ask(voter_id, "the ID of the voter you want to get")
+
+        position = self.electorate.position(_id_number("V", voter_id))
+        if position is None:
+            return None
+        return self.materialize_voter(position)
+
+
+# Voting methods that only need each voter's closest party, which is found without building the distance matrix
+NEAREST_METHODS = ("fptp",)
+
+# The voting methods Election.count knows, each taking the Election to count
+VOTING_METHODS = {
+    "fptp": lambda election: fptp_from_counts(election.first_preference_counts(), election.parties),
+    "irv": lambda election: ranked_tally(election.party_rankings(), election.parties),
+    "stv": lambda election, seats=1: ranked_tally(election.party_rankings(), election.parties, seats),
+    "schulze": lambda election: schulze_tally(election.pairwise_preferences(), election.parties),
+    "copeland": lambda election: copeland_tally(election.pairwise_preferences(), election.parties),
+    "ranked_pairs": lambda election: ranked_pairs_tally(election.pairwise_preferences(), election.parties),
+    # Approving the k closest parties needs the rankings, approving by threshold only the distances
+    "approval": lambda election, threshold=None, k=None: approval_tally(
+        election.parties, election.party_distances() if k is None else None,
+        election.party_rankings() if k is not None else None, threshold, k),
+    "score": lambda election, max_score=SCORE_RANGE: score_tally(election.party_distances(), election.parties,
+                                                                 max_score),
+    "borda": lambda election: borda_tally(election.party_rankings(), election.parties),
+}
+
+# The options each voting method takes, so a set of options can be shared between methods, see method_options
+METHOD_OPTIONS = {"stv": ("seats",), "approval": ("threshold", "k"), "score": ("max_score",)}
+
+
+def method_options(method, options):
+    """
+    Returns the options the named voting method takes out of a dictionary of options for several methods.
 
-        return None
+    Args:
+    - method (str): the name of the voting method.
+    - options (dict): options for any of the voting methods, such as {"seats": 3, "threshold": 0.8}.
+    """
+    return {name: options[name] for name in METHOD_OPTIONS.get(method, ()) if options.get(name) is not None}
@@ -0,0 +1,237 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import itertools
+import os
+
+import numpy as np
+
+try:
+    from .ClassHandler import Election, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
+    from .CorpusHandler import load_names
+    from .DistanceHandler import iter_distance_chunks, party_positions
+    from .ElectorateHandler import Electorate
+    from .TallyHandler import read_only
+except ImportError:
+    from ClassHandler import Election, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
+    from CorpusHandler import load_names
+    from DistanceHandler import iter_distance_chunks, party_positions
+    from ElectorateHandler import Electorate
+    from TallyHandler import read_only
+
+# The divisor of each party's nth seat under each highest averages method
+DIVISORS = {
+    "dhondt": lambda seats: np.arange(1, seats + 1),
+    "sainte_lague": lambda seats: np.arange(1, 2 * seats, 2),
+}
+
+
+@dataclass(frozen=True, eq=False)
+class SeatResult:
+    """
+    The immutable result of allocating the seats of a parliament.
+
+    Attributes:
+    - method (str): the name of the allocation method, "fptp", "dhondt" or "sainte_lague".
+    - parties (tuple): the Party objects that stood, in the order of seats and votes.
+    - votes (np.ndarray): a read-only array of the votes each party received across every district.
+    - seats (np.ndarray): a read-only array of the seats each party won.
+    - district_winners (np.ndarray): a read-only array of the index of the party that won each district, or None when
+        seats were allocated proportionally.
+
+    Methods:
+    - as_dict(): Returns the result as a dictionary that can be written out as JSON.
+    """
+
+    method: str
+    parties: tuple
+    votes: np.ndarray
+    seats: np.ndarray
+    district_winners: np.ndarray = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "parties", tuple(self.parties))
+        object.__setattr__(self, "votes", read_only(self.votes))
+        object.__setattr__(self, "seats", read_only(self.seats))
+        if self.district_winners is not None:
+            object.__setattr__(self, "district_winners", read_only(self.district_winners))
+
+    def __str__(self):
+        return f"{self.winner.name} wins the most seats with {self.seats[self.winner_index]} of {self.seats.sum()}"
+
+    @property
+    def winner_index(self):
+        """The index of the party with the most seats, ties going to the party that comes first."""
+        return int(self.seats.argmax())
+
+    @property
+    def winner(self):
+        """The Party with the most seats."""
+        return self.parties[self.winner_index]
+
+    def as_dict(self):
+        """Returns the result as a dictionary that can be written out as JSON."""
+        result = {
+            "method": self.method,
+            "winner": self.winner.id,
+            "parties": [party.id for party in self.parties],
+            "names": [party.name for party in self.parties],
+            "votes": self.votes.tolist(),
+            "seats": self.seats.tolist(),
+        }
+        if self.district_winners is not None:
+            result["district_winners"] = self.district_winners.tolist()
+        return result
+
+
+def district_counts(preferred, districts, nof_districts, nof_parties):
+    """
+    Returns the districts x parties matrix of first preference counts, tallied for every district in one bincount.
+
+    Args:
+    - preferred (np.ndarray): the index of each voter's most suitable party.
+    - districts (np.ndarray): the district each voter lives in.
+    - nof_districts (int): the number of districts.
+    - nof_parties (int): the number of parties.
+    """
+    cells = districts.astype(np.int64) * nof_parties + preferred
+    return np.bincount(cells, minlength=nof_districts * nof_parties).reshape(nof_districts, nof_parties)
+
+
+def highest_averages(votes, seats, method="dhondt"):
+    """
+    Allocates seats in proportion to votes with a highest averages method, returning the seats each party wins. Each
+    seat goes to the largest remaining quotient of votes over divisor; equal quotients go to the party that comes
+    first.
+
+    Args:
+    - votes (np.ndarray): the votes each party received.
+    - seats (int): the number of seats to allocate.
+    - method (str): "dhondt" or "sainte_lague".
+    """
+    if method not in DIVISORS:
+        raise ValueError(f"Error! Unknown allocation method {method!r}, expected one of {', '.join(DIVISORS)}")
+
+    votes = np.asarray(votes, dtype=np.float64)
+    quotients = votes[:, None] / DIVISORS[method](seats)[None, :]
+    # Row-major order keeps each party's quotients together, so the stable sort favours earlier parties in a tie
+    order = np.argsort(-quotients, axis=None, kind="stable")[:seats]
+    return np.bincount(order // seats, minlength=len(votes))
+
+
+class Parliament:
+    """
+    A parliament of single seat districts, reduced to the votes every party received in every district.
+
+    Attributes:
+    - parties (list): the Party objects standing in every district.
+    - counts (np.ndarray): the districts x parties matrix of first preference counts.
+
+    Methods:
+    - from_election(election, nof_districts): Tallies an Election whose voters have been given districts.
+    - simulate(nof_districts, voters_per_district, nof_parties): Generates and tallies every district, in parallel.
+    - FPTP_seats(): Gives each district's seat to its First Past The Post winner.
+    - DHondt_seats(seats): Allocates seats in proportion to the national vote with the D'Hondt method.
+    - SainteLague_seats(seats): Allocates seats in proportion to the national vote with the Sainte-Laguë method.
+    """
+
+    def __init__(self, parties, counts):
+        """
+        Initializes a Parliament from already tallied counts.
+
+        Args:
+        - parties (list): the Party objects standing in every district.
+        - counts (np.ndarray): the districts x parties matrix of first preference counts.
+        """
+        self.parties = list(parties)
+        self.counts = np.asarray(counts)
+
+    def __str__(self):
+        return f"Parliament of {len(self.counts)} districts and {len(self.parties)} parties"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def from_election(cls, election, nof_districts=None):
+        """
+        Tallies every district of an Election in one grouped pass over its voters.
+
+        Args:
+        - election (Election): an election whose voters have been given districts, see prepare_election.
+        - nof_districts (int): the number of districts, one more than the highest district number when not given.
+        """
+        districts = election.electorate.districts
+        if nof_districts is None:
+            nof_districts = int(districts.max()) + 1 if len(districts) else 1
+        return cls(election.parties, district_counts(election.generate_party_approval(), districts, nof_districts,
+                                                     len(election.parties)))
+
+    @classmethod
+    def simulate(cls, nof_districts, voters_per_district, nof_parties, seed=None, workers=None,
+                 paths=(FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH)):
+        """
+        Generates the same parties in every district and a separate electorate for each district, tallying each
+        district as it is generated. Districts are spread across a pool of processes and each gets its own random
+        number stream, so the result for a seed does not depend on the number of workers.
+
+        Args:
+        - nof_districts (int): the number of districts.
+        - voters_per_district (int): the number of voters in each district.
+        - nof_parties (int): the number of parties.
+        - seed (int): the seed of the simulation. A fresh seed is used when not given.
+        - workers (int): the number of processes to use, all available cores when not given. With one worker the
+            districts are generated in this process.
+        - paths (tuple): the paths to the first name, last name and party name files.
+        """
+        party_seed, *district_seeds = np.random.SeedSequence(seed).spawn(nof_districts + 1)
+        election = Election(prearrange_list=True, seed=party_seed)
+        election.prepare_election(0, nof_parties, *paths)
+
+        arguments = (district_seeds, itertools.repeat(voters_per_district),
+                     itertools.repeat(party_positions(election.parties)), itertools.repeat(tuple(paths[:2])))
+        if workers == 1:
+            counts = list(map(_tally_district, *arguments))
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                counts = list(executor.map(_tally_district, *arguments,
+                                           chunksize=max(1, nof_districts // (workers * 4))))
+        return cls(election.parties, np.array(counts).reshape(nof_districts, nof_parties))
+
+    def FPTP_seats(self):
+        """Gives each district's seat to the party with the most votes there. Returns a SeatResult."""
+        winners = self.counts.argmax(axis=1)
+        return SeatResult("fptp", self.parties, self.counts.sum(axis=0),
+                          np.bincount(winners, minlength=len(self.parties)), winners)
+
+    def DHondt_seats(self, seats=None):
+        """
+        Allocates seats in proportion to the national vote with the D'Hondt method. Returns a SeatResult.
+
+        Args:
+        - seats (int): the number of seats, one per district when not given.
+        """
+        return self._proportional_seats("dhondt", seats)
+
+    def SainteLague_seats(self, seats=None):
+        """
+        Allocates seats in proportion to the national vote with the Sainte-Laguë method. Returns a SeatResult.
+
+        Args:
+        - seats (int): the number of seats, one per district when not given.
+        """
+        return self._proportional_seats("sainte_lague", seats)
+
+    def _proportional_seats(self, method, seats):
+        votes = self.counts.sum(axis=0)
+        return SeatResult(method, self.parties, votes, highest_averages(votes, seats or len(self.counts), method))
+
+
+def _tally_district(seed, nof_voters, positions, paths):
+    """Generates one district's voters a chunk at a time and returns its first preference counts."""
+    electorate = Electorate(load_names(paths[0]), load_names(paths[1]))
+    counts = np.zeros(len(positions), dtype=np.int64)
+    for chunk in electorate.generate_chunks(nof_voters, 0, np.random.default_rng(seed)):
+        for _, distances in iter_distance_chunks(chunk.ideology, positions):
+            counts += np.bincount(distances.argmin(axis=1), minlength=len(positions))
+    return counts
@@ -0,0 +1,119 @@
+from collections.abc import Sequence
+import mmap
+import os
+
+import numpy as np
+
+# Every name file loaded by this process, keyed by path, modification time and size
+_NAME_TABLES = {}
+
+
+class NameTable(Sequence):
+    """
+    A read-only list of names backed by the raw bytes of a name file and the offsets of each line within it.
+
+    The file is never split into a list of strings; a name is only decoded when it is read. When the file is memory
+    mapped, every process that opens it shares the same pages.
+
+    Attributes:
+    - blob (bytes or mmap.mmap): the contents of the name file.
+    - offsets (np.ndarray): a 2 x N int64 array of the start and end of each line within blob.
+    """
+
+    def __init__(self, blob, offsets):
+        """
+        Initializes a NameTable over a blob of bytes.
+
+        Args:
+        - blob (bytes or mmap.mmap): the contents of the name file.
+        - offsets (np.ndarray): a 2 x N array of the start and end of each line within blob.
+        """
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return self.offsets.shape[1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start, end = self.offsets[:, index]
+        return self.blob[start:end].decode("utf-8").strip()
+
+    def __str__(self):
+        return f"NameTable of {len(self)} names"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def line_offsets(blob):
+    """
+    Returns the 2 x N array of the start and end of each line in a blob of bytes, excluding the newlines. As with
+    readlines, a newline at the very end of the blob does not start another line.
+
+    Args:
+    - blob (bytes or mmap.mmap): the contents of a name file.
+    """
+    if not len(blob):
+        return np.zeros((2, 0), dtype=np.int64)
+
+    newlines = np.flatnonzero(np.frombuffer(blob, dtype=np.uint8) == ord("\n"))
+    ends = newlines if newlines.size and newlines[-1] == len(blob) - 1 else np.append(newlines, len(blob))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    return np.stack((starts, ends)).astype(np.int64)
+
+
+def index_path(path):
+    """Returns the path of the offset index kept next to a name file."""
+    return path + ".idx.npy"
+
+
+def build_name_index(path):
+    """
+    Writes the line offsets of a name file to an index next to it, so later loads map the index instead of scanning
+    the file for newlines.
+
+    Args:
+    - path (str): the path to the name file.
+    """
+    with open(path, "rb") as f:
+        offsets = line_offsets(f.read())
+    with open(index_path(path), "wb") as f:
+        np.save(f, offsets)
+    return index_path(path)
+
+
+def load_names(path, use_mmap=True):
+    """
+    Returns the names in a name file as a NameTable. Each file is only read once per process; later calls return the
+    same table until the file changes on disk.
+
+    Args:
+    - path (str): the path to the name file.
+    - use_mmap (bool): whether to memory map the file rather than read it into memory.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key in _NAME_TABLES:
+        return _NAME_TABLES[key]
+
+    with open(path, "rb") as f:
+        if use_mmap and stat.st_size:
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            blob = f.read()
+
+    index = index_path(path)
+    if os.path.exists(index) and os.stat(index).st_mtime_ns >= stat.st_mtime_ns:
+        offsets = np.load(index, mmap_mode="r")
+    else:
+        offsets = line_offsets(blob)
+
+    _NAME_TABLES[key] = NameTable(blob, offsets)
+    return _NAME_TABLES[key]
+
+
+def clear_name_cache():
+    """Forgets every name file loaded by this process."""
+    _NAME_TABLES.clear()
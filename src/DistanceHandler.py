@@ -0,0 +1,170 @@
+import numpy as np
+
+# The number of voter-party distances worked out at once, which bounds the memory used by a chunk to around 16MB
+CHUNK_ELEMENTS = 1 << 22
+
+
+def party_positions(parties):
+    """
+    Returns the ideological positions of the given parties as a P x 4 float32 matrix.
+
+    Args:
+    - parties (list): a list of Party objects.
+    """
+    positions = np.empty((len(parties), 4), dtype=np.float32)
+    for i, party in enumerate(parties):
+        positions[i] = (party.economic_ideology, party.diplomatic_ideology, party.civil_ideology,
+                        party.social_ideology)
+    return positions
+
+
+def chunk_rows(nof_parties, chunk_size=None):
+    """
+    Returns how many voters to work on at once so that a chunk holds about CHUNK_ELEMENTS distances.
+
+    Args:
+    - nof_parties (int): the number of parties each voter is compared against.
+    - chunk_size (int): an explicit number of voters per chunk, used as is when given.
+    """
+    if chunk_size:
+        return chunk_size
+    return max(1, CHUNK_ELEMENTS // max(nof_parties, 1))
+
+
+def l1_distances(ideology, positions):
+    """
+    Returns the n x P matrix of L1 distances between each voter and each party.
+
+    The four axes are added up one at a time in a fixed order, so a distance is the same whichever function or chunk
+    it is worked out in. Ties between parties therefore always break the same way.
+
+    Args:
+    - ideology (np.ndarray): an n x 4 matrix of voter ideologies.
+    - positions (np.ndarray): a P x 4 matrix of party positions.
+    """
+    distances = np.abs(ideology[:, 0, None] - positions[None, :, 0])
+    for axis in range(1, 4):
+        distances += np.abs(ideology[:, axis, None] - positions[None, :, axis])
+    return distances
+
+
+def iter_distance_chunks(ideology, positions, chunk_size=None):
+    """
+    Yields the start row and the distance matrix of each chunk of voters in turn.
+
+    Args:
+    - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+    - positions (np.ndarray): a P x 4 matrix of party positions.
+    - chunk_size (int): the number of voters per chunk, picked from the number of parties when not given.
+    """
+    rows = chunk_rows(len(positions), chunk_size)
+    for start in range(0, len(ideology), rows):
+        yield start, l1_distances(ideology[start:start + rows], positions)
+
+
+def distance_matrix(ideology, positions, chunk_size=None):
+    """
+    Returns the full N x P float32 matrix of L1 distances between each voter and each party.
+
+    Args:
+    - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+    - positions (np.ndarray): a P x 4 matrix of party positions.
+    - chunk_size (int): the number of voters per chunk, picked from the number of parties when not given.
+    """
+    distances = np.empty((len(ideology), len(positions)), dtype=np.float32)
+    for start, chunk in iter_distance_chunks(ideology, positions, chunk_size):
+        distances[start:start + len(chunk)] = chunk
+    return distances
+
+
+def nearest_parties(ideology, positions, chunk_size=None):
+    """
+    Returns the index of the closest party to each voter along with the distance to it, without ever holding more
+    than one chunk of the distance matrix. Ties go to the party that comes first.
+
+    Args:
+    - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+    - positions (np.ndarray): a P x 4 matrix of party positions.
+    - chunk_size (int): the number of voters per chunk, picked from the number of parties when not given.
+    """
+    if not len(positions):
+        raise ValueError("Error! Cannot find the closest party when there are no parties")
+
+    preferred = np.empty(len(ideology), dtype=np.int32)
+    best = np.empty(len(ideology), dtype=np.float32)
+    for start, chunk in iter_distance_chunks(ideology, positions, chunk_size):
+        rows = slice(start, start + len(chunk))
+        preferred[rows] = chunk.argmin(axis=1)
+        best[rows] = chunk[np.arange(len(chunk)), preferred[rows]]
+    return preferred, best
+
+
+def rank_dtype(nof_parties):
+    """Returns the smallest integer type that can hold the index of any of the given number of parties."""
+    return np.int16 if nof_parties < 2 ** 15 else np.int32
+
+
+def rank_distances(distances, chunk_size=None):
+    """
+    Returns the n x P matrix of each voter's ranking of the parties from a distance matrix that has already been
+    worked out, sorting a chunk of rows at a time so the sort's temporary arrays stay small. Ties go to the party that
+    comes first, as in rank_matrix.
+
+    Args:
+    - distances (np.ndarray): an n x P matrix of voter-party distances.
+    - chunk_size (int): the number of voters per chunk, picked from the number of parties when not given.
+    """
+    rankings = np.empty(distances.shape, dtype=rank_dtype(distances.shape[1]))
+    rows = chunk_rows(distances.shape[1], chunk_size)
+    for start in range(0, len(distances), rows):
+        rankings[start:start + rows] = distances[start:start + rows].argsort(axis=1, kind="stable")
+    return rankings
+
+
+def rank_matrix(ideology, positions, chunk_size=None):
+    """
+    Returns the N x P matrix of each voter's ranking of the parties, from most to least suitable. Row i holds the
+    party indices in the order voter i prefers them, with ties going to the party that comes first.
+
+    Args:
+    - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+    - positions (np.ndarray): a P x 4 matrix of party positions.
+    - chunk_size (int): the number of voters per chunk, picked from the number of parties when not given.
+    """
+    rankings = np.empty((len(ideology), len(positions)), dtype=rank_dtype(len(positions)))
+    for start, chunk in iter_distance_chunks(ideology, positions, chunk_size):
+        rankings[start:start + len(chunk)] = chunk.argsort(axis=1, kind="stable")
+    return rankings
+
+
+def pairwise_counts(distances):
+    """
+    Returns the P x P matrix whose entry [i, j] is the number of voters in a block of distances who are closer to party
+    i than to party j. The block is compared a few rows at a time so only about CHUNK_ELEMENTS pairs exist at once.
+
+    Args:
+    - distances (np.ndarray): an n x P matrix of voter-party distances.
+    """
+    nof_parties = distances.shape[1]
+    pairwise = np.zeros((nof_parties, nof_parties), dtype=np.int64)
+    rows = chunk_rows(nof_parties * nof_parties)
+    for start in range(0, len(distances), rows):
+        chunk = distances[start:start + rows]
+        pairwise += (chunk[:, :, None] < chunk[:, None, :]).sum(axis=0)
+    return pairwise
+
+
+def pairwise_matrix(ideology, positions, chunk_size=None):
+    """
+    Returns the P x P matrix whose entry [i, j] is the number of voters who are closer to party i than to party j.
+    Voters who are equally close to both count towards neither.
+
+    Args:
+    - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+    - positions (np.ndarray): a P x 4 matrix of party positions.
+    - chunk_size (int): the number of voters per chunk, picked from the number of parties when not given.
+    """
+    pairwise = np.zeros((len(positions), len(positions)), dtype=np.int64)
+    for _, chunk in iter_distance_chunks(ideology, positions, chunk_size):
+        pairwise += pairwise_counts(chunk)
+    return pairwise
@@ -0,0 +1,350 @@
+import itertools
+
+import numpy as np
+
+IDEOLOGY_AXES = ("economic", "diplomatic", "civil", "social")
+
+# Versions are drawn from one counter for every electorate, so an electorate that replaces another never shares a
+# version with it and results cached for the old one cannot pass for the new one's
+_versions = itertools.count(1)
+
+# The columns of an Electorate, with the type and the shape of a single voter's entry
+COLUMNS = {
+    "_ids": (np.int64, ()),
+    "_ideology": (np.float32, (len(IDEOLOGY_AXES),)),
+    "_ages": (np.uint8, ()),
+    "_first_name_codes": (np.int32, ()),
+    "_last_name_codes": (np.int32, ()),
+    "_districts": (np.uint16, ()),
+}
+
+
+def check_age(age):
+    """
+    Raises a ValueError if an age does not fit in the ages column, before anything is stored.
+
+    Args:
+    - age (int): the age of a voter.
+    """
+    oldest = np.iinfo(COLUMNS["_ages"][0]).max
+    if not 0 <= age <= oldest:
+        raise ValueError(f"Error! A voter's age must be between 0 and {oldest}, not {age}")
+
+
+class NameColumn:
+    """
+    A table of names that voters refer to by integer code rather than by string.
+
+    The shared table (usually the contents of first_names.txt or last_names.txt) is never modified. Names that are
+    not part of it, such as those given to add_voter, are appended to a per-electorate list of extra names so that
+    every name still has a code.
+
+    Attributes:
+    - table (sequence): the shared list of names loaded from disk.
+    - extra (list): names added to this column that are not part of the shared table.
+
+    Methods:
+    - code(name): Returns the code for a name, adding it to the extra names if it is not known yet.
+    """
+
+    def __init__(self, table=()):
+        """
+        Initializes a NameColumn over a shared table of names.
+
+        Args:
+        - table (sequence): the names that codes 0 to len(table) - 1 refer to.
+        """
+        self.table = table
+        self.extra = []
+        self._codes = None
+
+    def __len__(self):
+        return len(self.table) + len(self.extra)
+
+    def __getitem__(self, code):
+        """Returns the name for the given code."""
+        code = int(code)
+        if code < len(self.table):
+            return self.table[code]
+        return self.extra[code - len(self.table)]
+
+    def code(self, name):
+        """
+        Returns the code for a name, adding it to the extra names if it is not known yet.
+
+        Args:
+        - name (str): the name to look up.
+        """
+        if self._codes is None:
+            # Only built the first time a name is looked up, as generated voters never need it
+            self._codes = {}
+            for i in range(len(self.table)):
+                self._codes.setdefault(self.table[i], i)
+
+        if name not in self._codes:
+            self.extra.append(name)
+            self._codes[name] = len(self) - 1
+        return self._codes[name]
+
+
+class Electorate:
+    """
+    A structure-of-arrays store holding every voter of an election.
+
+    Rather than keeping one Voter object per voter, each attribute is held in its own NumPy column. Voter objects are
+    only created when they are asked for, see Election.get_voter.
+
+    Attributes:
+    - ids (np.ndarray): the int64 ID numbers of the voters (a voter with ID "V12" has the number 12).
+    - ideology (np.ndarray): an N x 4 float32 matrix of economic, diplomatic, civil and social ideologies.
+    - ages (np.ndarray): the uint8 ages of the voters.
+    - first_name_codes (np.ndarray): int32 codes into first_names.
+    - last_name_codes (np.ndarray): int32 codes into last_names.
+    - districts (np.ndarray): the uint16 number of the district (constituency) each voter lives in.
+    - first_names (NameColumn): the names the first name codes refer to.
+    - last_names (NameColumn): the names the last name codes refer to.
+    - version (int): a number that changes whenever voters are added or removed, and is never shared by two
+        electorates, used to tell when results worked out from the electorate are out of date.
+
+    Methods:
+    - from_columns(columns): Returns an Electorate over existing columns without copying them.
+    - generate(nof_voters, first_id, rng): Appends randomly generated voters.
+    - generate_chunks(nof_voters, first_id, rng): Yields randomly generated voters a chunk at a time.
+    - append(voter_id, first_name, last_name, age, ideology): Appends a single voter.
+    - position(voter_id): Returns the row a voter is stored in, using a hash index from ID to row.
+    - row(position): Returns the attributes of the voter in a row.
+    - remove(position): Removes the voter in a row.
+    - clear(): Removes every voter.
+    """
+
+    GENERATION_CHUNK = 1 << 20
+
+    def __init__(self, first_names=(), last_names=(), capacity=0):
+        """
+        Initializes an empty Electorate.
+
+        Args:
+        - first_names (sequence): the table of first names voters are drawn from.
+        - last_names (sequence): the table of last names voters are drawn from.
+        - capacity (int): the number of voters to allocate space for up front.
+        """
+        self.first_names = NameColumn(first_names)
+        self.last_names = NameColumn(last_names)
+        self.size = 0
+        self.version = next(_versions)
+        self._index = None
+        self._allocate(capacity)
+
+    @classmethod
+    def from_columns(cls, columns, first_names=(), last_names=()):
+        """
+        Returns an Electorate over existing columns without copying them, e.g. memory mapped from a saved election.
+        The columns are only copied if voters are later appended beyond their length.
+
+        Args:
+        - columns (dict): an array for each name in COLUMNS, all with the same number of rows.
+        - first_names (sequence or NameColumn): the names the first name codes refer to.
+        - last_names (sequence or NameColumn): the names the last name codes refer to.
+        """
+        electorate = cls()
+        for name, column in (("first_names", first_names), ("last_names", last_names)):
+            setattr(electorate, name, column if isinstance(column, NameColumn) else NameColumn(column))
+        for name in COLUMNS:
+            setattr(electorate, name, columns[name])
+        electorate.size = len(columns["_ids"])
+        return electorate
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self):
+        return f"Electorate of {self.size} voters"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def ids(self):
+        return self._ids[:self.size]
+
+    @property
+    def ideology(self):
+        return self._ideology[:self.size]
+
+    @property
+    def ages(self):
+        return self._ages[:self.size]
+
+    @property
+    def first_name_codes(self):
+        return self._first_name_codes[:self.size]
+
+    @property
+    def last_name_codes(self):
+        return self._last_name_codes[:self.size]
+
+    @property
+    def districts(self):
+        return self._districts[:self.size]
+
+    def _allocate(self, capacity):
+        """Allocates columns with room for the given number of voters, keeping the voters already stored."""
+        for name, (dtype, shape) in COLUMNS.items():
+            column = np.empty((capacity,) + shape, dtype=dtype)
+            if self.size:
+                column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+
+    def reserve(self, capacity):
+        """
+        Makes sure there is room for at least the given number of voters, growing geometrically so that repeated
+        appends stay amortised O(1).
+
+        Args:
+        - capacity (int): the number of voters that must fit.
+        """
+        if capacity > len(self._ids):
+            self._allocate(max(capacity, 2 * len(self._ids), 16))
+
+    def _draw(self, count, first_id, rng, nof_districts):
+        """Returns the columns of count randomly generated voters, numbered consecutively from first_id."""
+        columns = {
+            "_ids": np.arange(first_id, first_id + count, dtype=np.int64),
+            "_first_name_codes": rng.integers(0, len(self.first_names), count, dtype=np.int32),
+            "_last_name_codes": rng.integers(0, len(self.last_names), count, dtype=np.int32),
+            "_ages": rng.integers(18, 101, count, dtype=np.uint8),
+            "_ideology": np.round(rng.random((count, len(IDEOLOGY_AXES))), 2).astype(np.float32),
+            "_districts": np.zeros(count, dtype=np.uint16),
+        }
+        # Only drawn when there is a choice, so single district electorates come out the same as they always have
+        if nof_districts > 1:
+            columns["_districts"] = rng.integers(0, nof_districts, count, dtype=np.uint16)
+        return columns
+
+    def generate_chunks(self, nof_voters, first_id, rng, chunk_size=None, nof_districts=1):
+        """
+        Yields randomly generated voters as Electorates of at most chunk_size voters that share this electorate's name
+        tables. Nothing is stored, so only one chunk exists at a time however many voters are generated.
+
+        Args:
+        - nof_voters (int): the number of voters to generate.
+        - first_id (int): the ID number of the first voter, the rest are numbered consecutively.
+        - rng (np.random.Generator): the random number generator to draw from.
+        - chunk_size (int): the number of voters in each chunk, GENERATION_CHUNK when not given.
+        - nof_districts (int): the number of districts voters are spread across at random.
+        """
+        if not 1 <= nof_districts <= np.iinfo(np.uint16).max + 1:
+            raise ValueError("Error! The number of districts must be between 1 and 65536")
+        if nof_voters and (not len(self.first_names) or not len(self.last_names)):
+            raise ValueError("Error! Cannot generate voters without first and last names")
+
+        chunk_size = chunk_size or self.GENERATION_CHUNK
+        for start in range(0, nof_voters, chunk_size):
+            count = min(chunk_size, nof_voters - start)
+            yield Electorate.from_columns(self._draw(count, first_id + start, rng, nof_districts), self.first_names,
+                                          self.last_names)
+
+    def generate(self, nof_voters, first_id, rng, chunk_size=None, nof_districts=1):
+        """
+        Appends randomly generated voters to the electorate. Drawing the same number of voters in the same chunk size
+        from the same generator gives the same voters as generate_chunks.
+
+        Args:
+        - nof_voters (int): the number of voters to generate.
+        - first_id (int): the ID number of the first voter, the rest are numbered consecutively.
+        - rng (np.random.Generator): the random number generator to draw from.
+        - chunk_size (int): the number of voters drawn at once, GENERATION_CHUNK when not given.
+        - nof_districts (int): the number of districts voters are spread across at random.
+        """
+        self.reserve(self.size + nof_voters)
+        for chunk in self.generate_chunks(nof_voters, first_id, rng, chunk_size, nof_districts):
+            rows = slice(self.size, self.size + len(chunk))
+            for name in COLUMNS:
+                getattr(self, name)[rows] = getattr(chunk, name)
+            if self._index is not None:
+                self._index.update(zip(chunk.ids.tolist(), range(self.size, self.size + len(chunk))))
+            self.size += len(chunk)
+        self.version = next(_versions)
+
+    def append(self, voter_id, first_name, last_name, age, ideology, district=0):
+        """
+        Appends a single voter to the electorate.
+
+        Args:
+        - voter_id (int): the ID number of the voter.
+        - first_name (str): the first name of the voter.
+        - last_name (str): the last name of the voter.
+        - age (int): the age of the voter.
+        - ideology (sequence): the economic, diplomatic, civil and social ideologies of the voter.
+        - district (int): the number of the district the voter lives in.
+        """
+        # Checked before anything is stored, so a voter that does not fit leaves no names behind
+        check_age(age)
+        if not 0 <= district <= np.iinfo(COLUMNS["_districts"][0]).max:
+            raise ValueError(f"Error! A district must be between 0 and {np.iinfo(COLUMNS['_districts'][0]).max}, "
+                             f"not {district}")
+        self.reserve(self.size + 1)
+        self._ids[self.size] = voter_id
+        self._first_name_codes[self.size] = self.first_names.code(first_name)
+        self._last_name_codes[self.size] = self.last_names.code(last_name)
+        self._ages[self.size] = age
+        self._ideology[self.size] = ideology
+        self._districts[self.size] = district
+        if self._index is not None:
+            self._index[int(voter_id)] = self.size
+        self.size += 1
+        self.version = next(_versions)
+
+    def position(self, voter_id):
+        """
+        Returns the row the voter with the given ID number is stored in, or None if there is no such voter.
+
+        Args:
+        - voter_id (int): the ID number of the voter.
+        """
+        if voter_id is None:
+            return None
+        if self._index is None:
+            # Built on the first lookup so that electorates nobody looks voters up in never pay for it
+            self._index = dict(zip(self.ids.tolist(), range(self.size)))
+        return self._index.get(voter_id)
+
+    def row(self, position):
+        """
+        Returns the ID number, first name, last name, age and ideologies of the voter in the given row.
+
+        Args:
+        - position (int): the row of the voter.
+        """
+        # float32 cannot hold values such as 0.57 exactly, rounding recovers the value that was stored
+        ideology = [round(float(value), 6) for value in self._ideology[position]]
+        return (int(self._ids[position]), self.first_names[self._first_name_codes[position]],
+                self.last_names[self._last_name_codes[position]], int(self._ages[position]), ideology)
+
+    def remove(self, position):
+        """
+        Removes the voter in the given row by moving the last voter into it, so removal takes constant time. This
+        changes the order of the voters.
+
+        Args:
+        - position (int): the row of the voter.
+        """
+        last = self.size - 1
+        removed_id, moved_id = int(self._ids[position]), int(self._ids[last])
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[position] = column[last]
+        self.size -= 1
+        self.version = next(_versions)
+
+        if self._index is not None:
+            del self._index[removed_id]
+            if moved_id != removed_id:
+                self._index[moved_id] = position
+
+    def clear(self):
+        """Removes every voter, keeping the name tables."""
+        self.size = 0
+        self.version = next(_versions)
+        self._index = None
+        self._allocate(0)
@@ -0,0 +1,329 @@
+import asyncio
+
+import numpy as np
+
+try:
+    from .DistanceHandler import l1_distances, party_positions, rank_dtype
+    from .ElectorateHandler import IDEOLOGY_AXES
+    from .LogHandler import get_logger, PROFILER
+    from .TallyHandler import StreamingTally
+except ImportError:
+    from DistanceHandler import l1_distances, party_positions, rank_dtype
+    from ElectorateHandler import IDEOLOGY_AXES
+    from LogHandler import get_logger, PROFILER
+    from TallyHandler import StreamingTally
+
+BALLOT_KINDS = ("ideology", "ranking")
+
+# The number of bytes read from a file or socket at once
+READ_SIZE = 1 << 16
+
+# The number of blocks of ballots that may wait to be counted before readers are made to wait
+MAX_PENDING = 16
+
+# The longest a line may grow, as a number of reads, before it is dropped as malformed. No ballot comes close, so this
+# only stops a source that never sends a newline from being buffered without limit
+MAX_LINE_READS = 4
+
+logger = get_logger("ingest")
+
+
+def _parse_slowly(data, nof_fields, convert):
+    """Parses ballots one line at a time, skipping blank lines and rejecting malformed ones."""
+    rows, rejected = [], 0
+    for line in data.split(b"\n"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = [convert(field.strip()) for field in line.split(b",")]
+        except (KeyError, ValueError):
+            rejected += 1
+            continue
+        if len(row) != nof_fields:
+            rejected += 1
+            continue
+        rows.append(row)
+    return rows, rejected
+
+
+def _parse_records(data, nof_fields, dtype, convert):
+    """
+    Parses lines of nof_fields comma separated values. Every line is checked to have the right number of commas with
+    array operations, and when they all do the whole block is split into fields and converted at once; otherwise, or
+    if any field is empty or does not convert, it is parsed a line at a time. Returns the n x nof_fields array of the
+    ballots that parsed and the number of lines that did not.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buffer == ord("\n"))
+    if not len(data) or not len(newlines) or newlines[-1] != len(data) - 1:
+        newlines = np.append(newlines, len(data))
+    commas_per_line = np.diff(np.searchsorted(np.flatnonzero(buffer == ord(",")), newlines), prepend=0)
+
+    if (commas_per_line == nof_fields - 1).all():
+        # Splitting on commas and newlines alone keeps every field on its own line, so an empty field fails to convert
+        # rather than a field of the next line sliding into its place
+        fields = (data[:-1] if data.endswith(b"\n") else data).replace(b"\n", b",").split(b",")
+        if len(fields) == len(commas_per_line) * nof_fields:
+            try:
+                return np.array(fields).astype(dtype).reshape(-1, nof_fields), 0
+            except ValueError:
+                pass
+
+    rows, rejected = _parse_slowly(data, nof_fields, convert)
+    return np.array(rows, dtype=dtype).reshape(-1, nof_fields), rejected
+
+
+def parse_ideology(data):
+    """
+    Parses a block of ideology ballots, one voter per line as comma separated economic, diplomatic, civil and social
+    ideologies, e.g. "0.25,0.5,0.75,0.1". Returns the n x 4 float32 matrix of the ballots that parsed and the number of
+    lines rejected as malformed, including those with an ideology outside [0, 1].
+
+    Args:
+    - data (bytes): whole lines of ballots.
+    """
+    ideology, rejected = _parse_records(data, len(IDEOLOGY_AXES), np.float32, float)
+    # NaN fails both comparisons, so non-numbers are rejected along with values out of range
+    valid = ((ideology >= 0) & (ideology <= 1)).all(axis=1)
+    return ideology[valid], rejected + int((~valid).sum())
+
+
+def parse_rankings(data, parties):
+    """
+    Parses a block of ranked ballots, one voter per line as the parties from most to least preferred, comma separated.
+    A party may be given by its index in parties (fastest) or by its ID, e.g. "2,0,1" or "P2,P0,P1". Every ballot must
+    rank every party exactly once. Returns the n x P matrix of the ballots that parsed and the number of lines rejected.
+
+    Args:
+    - data (bytes): whole lines of ballots.
+    - parties (list): the Party objects being ranked.
+    """
+    codes = {str(i).encode(): i for i in range(len(parties))}
+    codes.update({party.id.encode(): i for i, party in enumerate(parties)})
+    rankings, rejected = _parse_records(data, len(parties), np.int64, codes.__getitem__)
+
+    # A complete ranking holds every party once, so sorting it must give 0, 1, ..., P - 1
+    valid = (np.sort(rankings, axis=1) == np.arange(len(parties))).all(axis=1)
+    return rankings[valid].astype(rank_dtype(len(parties))), rejected + int((~valid).sum())
+
+
+class BallotIngester:
+    """
+    Counts ballots as they arrive from files or local sockets, using asyncio so that any number of sources can be read
+    at once while provisional results stay available.
+
+    Readers split what they read into blocks of whole lines and put them on a bounded queue, and a single counter
+    parses each block into an array and folds it into a StreamingTally. When counting falls behind, the queue fills and
+    readers wait, which in turn stops sockets being read until there is room, so memory use stays bounded however fast
+    ballots arrive. Counting happens on the event loop, so a snapshot never sees a block half counted.
+
+    Ideology ballots are counted with the same distances and tie-breaks as Election.count; ranked ballots can be
+    counted with any method that does not need distances. Instant Runoff and STV need every ballot at once, so they
+    cannot be counted as ballots arrive.
+
+    Attributes:
+    - parties (list): the Party objects standing.
+    - kind (str): "ideology" or "ranking", the kind of ballot read.
+    - methods (tuple): the names of the voting methods counted.
+    - tally (StreamingTally): the running tallies.
+    - rejected (int): the number of malformed ballots skipped so far.
+
+    Methods:
+    - ingest_file(path): Reads and counts every ballot in a file.
+    - ingest_reader(reader): Reads and counts ballots from an asyncio stream until it closes.
+    - serve(host, port): Starts a server that counts the ballots sent by every client that connects.
+    - feed(data): Queues whole lines of ballots to be counted.
+    - drain(): Waits until every queued ballot has been counted.
+    - close(): Counts every queued ballot and stops the counter.
+    - snapshot(): Returns the provisional results.
+    """
+
+    def __init__(self, parties, methods=("fptp",), kind="ideology", max_pending=MAX_PENDING, read_size=READ_SIZE,
+                 **options):
+        """
+        Initializes a BallotIngester with empty tallies.
+
+        Args:
+        - parties (list): the Party objects standing.
+        - methods (tuple): the names of the voting methods to count, see StreamingTally.
+        - kind (str): "ideology" or "ranking", the kind of ballot read.
+        - max_pending (int): the number of blocks of ballots that may wait to be counted.
+        - read_size (int): the number of bytes read from a file or socket at once.
+        - options: the options of the approval and score methods, see StreamingTally.
+        """
+        if kind not in BALLOT_KINDS:
+            raise ValueError(f"Error! Unknown ballot kind {kind!r}, expected one of {', '.join(BALLOT_KINDS)}")
+        if kind == "ranking" and ("score" in methods or ("approval" in methods and options.get("k") is None)):
+            raise ValueError("Error! Score voting and approval by threshold cannot be counted from ranked ballots")
+
+        self.parties = list(parties)
+        self.kind = kind
+        self.methods = tuple(methods)
+        self.tally = StreamingTally(self.parties, self.methods, **options)
+        self.rejected = 0
+        self.max_pending = max_pending
+        self.read_size = read_size
+        self._positions = party_positions(self.parties)
+        self._queue = None
+        self._counter = None
+
+    def _start(self):
+        """Creates the queue and starts the counter on the running event loop, the first time it is needed."""
+        if self._counter is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._counter = asyncio.get_running_loop().create_task(self._count_blocks())
+
+    async def _count_blocks(self):
+        """Counts blocks of ballots from the queue until cancelled."""
+        while True:
+            data = await self._queue.get()
+            try:
+                self._count(data)
+            except Exception:
+                logger.exception("Could not count a block of %d bytes", len(data))
+            finally:
+                self._queue.task_done()
+
+    def _count(self, data):
+        """Parses a block of whole lines of ballots and folds them into the tallies."""
+        with PROFILER.span("tally"):
+            if self.kind == "ideology":
+                ballots, rejected = parse_ideology(data)
+                if len(ballots):
+                    self.tally.add(l1_distances(ballots, self._positions))
+            else:
+                ballots, rejected = parse_rankings(data, self.parties)
+                if len(ballots):
+                    self.tally.add_rankings(ballots)
+        self.rejected += rejected
+        PROFILER.count("ballots ingested", len(ballots))
+        if rejected:
+            logger.warning("Rejected %d malformed ballots", rejected)
+
+    async def feed(self, data):
+        """
+        Queues whole lines of ballots to be counted, waiting while the queue is full.
+
+        Args:
+        - data (bytes): one or more ballots, each on its own line.
+        """
+        self._start()
+        if data:
+            await self._queue.put(bytes(data))
+
+    async def _ingest(self, read):
+        """
+        Reads blocks with read until it returns nothing, queueing the whole lines and carrying over the rest. A line
+        longer than MAX_LINE_READS reads is dropped and counted as rejected, so the carried over bytes stay bounded.
+        """
+        self._start()
+        remainder = b""
+        dropping = False
+        while True:
+            data = await read()
+            if not data:
+                break
+            if dropping:
+                # Skips the rest of a line that was too long, up to the newline that ends it
+                start = data.find(b"\n") + 1
+                if not start:
+                    continue
+                data, dropping = data[start:], False
+            data = remainder + data
+            end = data.rfind(b"\n") + 1
+            remainder = data[end:]
+            if len(remainder) > MAX_LINE_READS * self.read_size:
+                remainder, dropping = b"", True
+                self.rejected += 1
+                logger.warning("Rejected a line longer than %d bytes", MAX_LINE_READS * self.read_size)
+            await self.feed(data[:end])
+        # The last ballot does not have to end with a newline
+        await self.feed(remainder)
+
+    async def ingest_reader(self, reader):
+        """
+        Reads and counts ballots from an asyncio stream, such as a socket, until it closes.
+
+        Args:
+        - reader (asyncio.StreamReader): the stream to read.
+        """
+        await self._ingest(lambda: reader.read(self.read_size))
+
+    async def ingest_file(self, path):
+        """
+        Reads and counts every ballot in a file. The file is read on a worker thread so the event loop carries on
+        serving other sources in the meantime.
+
+        Args:
+        - path (str): the path to the file of ballots.
+        """
+        with open(path, "rb") as f:
+            await self._ingest(lambda: asyncio.to_thread(f.read, self.read_size))
+        logger.info("Read the ballots in %s", path)
+
+    async def serve(self, host="127.0.0.1", port=0, path=None):
+        """
+        Starts a server that counts the ballots sent by every client that connects, returning the asyncio Server. It
+        listens on a TCP port of the given host, or on a Unix socket if a path is given.
+
+        Args:
+        - host (str): the address to listen on, the local machine only by default.
+        - port (int): the port to listen on, any free port when 0.
+        - path (str): the path of a Unix socket to listen on instead.
+        """
+        self._start()
+
+        async def handle(reader, writer):
+            try:
+                await self.ingest_reader(reader)
+            finally:
+                writer.close()
+
+        if path:
+            return await asyncio.start_unix_server(handle, path)
+        return await asyncio.start_server(handle, host, port)
+
+    async def drain(self):
+        """Waits until every ballot queued so far has been counted."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        """Counts every queued ballot and stops the counter, returning the final results."""
+        await self.drain()
+        if self._counter is not None:
+            self._counter.cancel()
+            self._counter = None
+        return self.snapshot()
+
+    def snapshot(self):
+        """
+        Returns the provisional result of each voting method over the ballots counted so far. It can be called at any
+        time without pausing ingestion, and is None for every method until a ballot has been counted.
+        """
+        if not self.tally.nof_voters:
+            return {method: None for method in self.methods}
+        return {method: self.tally.result(method) for method in self.methods}
+
+
+def ingest_files(parties, paths, methods=("fptp",), kind="ideology", **options):
+    """
+    Counts the ballots in a list of files, reading them all at once, and returns the BallotIngester holding the
+    results.
+
+    Args:
+    - parties (list): the Party objects standing.
+    - paths (list): the paths to the files of ballots.
+    - methods (tuple): the names of the voting methods to count.
+    - kind (str): "ideology" or "ranking", the kind of ballot in the files.
+    - options: further arguments for BallotIngester, such as max_pending or threshold.
+    """
+    ingester = BallotIngester(parties, methods, kind, **options)
+
+    async def run():
+        await asyncio.gather(*(ingester.ingest_file(path) for path in paths))
+        await ingester.close()
+
+    asyncio.run(run())
+    return ingester
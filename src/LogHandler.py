@@ -0,0 +1,201 @@
+from contextlib import nullcontext
+import json
+import logging
+import threading
+import time
+
+LOGGER_NAME = "VotingMethods"
+
+# The phases of a run that are timed, in the order they usually happen
+PHASES = ("corpus load", "generation", "distances", "tally", "render")
+
+LOG_LEVELS = {
+    "critical": logging.CRITICAL,
+    "error": logging.ERROR,
+    "warning": logging.WARNING,
+    "info": logging.INFO,
+    "debug": logging.DEBUG,
+    "notset": logging.NOTSET,
+}
+
+
+def get_logger(name=None):
+    """
+    Returns the project's logger, or one of its children so messages can be told apart by module.
+
+    Args:
+    - name (str): the name of the child logger, such as "election".
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def set_log_level(level):
+    """
+    Sets the level of the project's logger, sending its messages to standard error the first time it is called.
+    Returns the numeric level.
+
+    Args:
+    - level (str or int): one of the names in LOG_LEVELS, or a level from the logging module.
+    """
+    if isinstance(level, str):
+        if level.lower() not in LOG_LEVELS:
+            raise ValueError(f"Error! Unknown logging level {level!r}, expected one of {', '.join(LOG_LEVELS)}")
+        level = LOG_LEVELS[level.lower()]
+
+    logger = get_logger()
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    return level
+
+
+class _Span:
+    """Times one run of a phase, see Profiler.span."""
+
+    __slots__ = ("profiler", "phase", "start", "children")
+
+    def __init__(self, profiler, phase):
+        self.profiler = profiler
+        self.phase = phase
+        self.children = 0.0
+
+    def __enter__(self):
+        self.profiler._stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+        self.profiler._record(self.phase, elapsed, elapsed - self.children)
+        return False
+
+
+class Profiler:
+    """
+    Collects how long each phase of a run takes and counts of the work done in it.
+
+    While disabled, span returns a shared do-nothing context manager and count returns straight away, so the
+    instrumentation left in the code costs a method call and nothing more.
+
+    Spans may nest, e.g. the distances worked out while counting an election. A phase's total time includes the
+    phases nested in it and its self time does not, so the self times of all phases add up to the time spent.
+
+    Attributes:
+    - enabled (bool): whether spans and counts are being recorded.
+    - phases (dict): the number of calls, total seconds, self seconds and longest call of each phase.
+    - counters (dict): the running total of each counter.
+
+    Methods:
+    - enable(): Starts recording, forgetting anything recorded before.
+    - disable(): Stops recording, keeping what was recorded.
+    - span(phase): Returns a context manager that times the code run inside it as part of a phase.
+    - count(name, amount): Adds to a counter.
+    - as_dict(): Returns what has been recorded as a dictionary that can be written as JSON.
+    - table(): Returns what has been recorded as a table for the terminal.
+    """
+
+    _DISABLED = nullcontext()
+
+    def __init__(self):
+        """Initializes a disabled Profiler."""
+        self.enabled = False
+        self.phases = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        """Returns the spans open on the current thread, innermost last."""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, phase, elapsed, own):
+        """Adds a finished span to its phase."""
+        with self._lock:
+            calls, total, self_total, longest = self.phases.get(phase, (0, 0.0, 0.0, 0.0))
+            self.phases[phase] = (calls + 1, total + elapsed, self_total + own, max(longest, elapsed))
+
+    def enable(self):
+        """Starts recording, forgetting anything recorded before."""
+        self.reset()
+        self.enabled = True
+
+    def disable(self):
+        """Stops recording, keeping what was recorded."""
+        self.enabled = False
+
+    def reset(self):
+        """Forgets everything recorded so far."""
+        with self._lock:
+            self.phases = {}
+            self.counters = {}
+
+    def span(self, phase):
+        """
+        Returns a context manager that times the code run inside it as part of a phase.
+
+        Args:
+        - phase (str): the name of the phase, usually one of PHASES.
+        """
+        if not self.enabled:
+            return self._DISABLED
+        return _Span(self, phase)
+
+    def count(self, name, amount=1):
+        """
+        Adds to a counter.
+
+        Args:
+        - name (str): the name of the counter, such as "voters generated".
+        - amount (int): the amount to add.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        """Returns the phases and counters recorded so far as a dictionary that can be written as JSON."""
+        with self._lock:
+            return {"phases": {phase: {"calls": calls, "seconds": total, "self_seconds": own, "max_seconds": longest}
+                               for phase, (calls, total, own, longest) in self.phases.items()},
+                    "counters": dict(self.counters)}
+
+    def to_json(self, path=None):
+        """
+        Returns what has been recorded as JSON, writing it to a file as well if a path is given.
+
+        Args:
+        - path (str): the file to write the JSON to.
+        """
+        text = json.dumps(self.as_dict(), indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def table(self):
+        """Returns the phases and counters recorded so far as a table for the terminal."""
+        recorded = self.as_dict()
+        order = [phase for phase in PHASES if phase in recorded["phases"]]
+        order += sorted(phase for phase in recorded["phases"] if phase not in PHASES)
+
+        lines = [f"{'phase':<14}{'calls':>8}{'total s':>12}{'self s':>12}{'max s':>12}"]
+        for phase in order:
+            entry = recorded["phases"][phase]
+            lines.append(f"{phase:<14}{entry['calls']:>8}{entry['seconds']:>12.4f}{entry['self_seconds']:>12.4f}"
+                         f"{entry['max_seconds']:>12.4f}")
+        for name, value in sorted(recorded["counters"].items()):
+            lines.append(f"{name:<34}{value:>12}")
+        return "\n".join(lines)
+
+
+# The profiler every module reports to
+PROFILER = Profiler()
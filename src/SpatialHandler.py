@@ -0,0 +1,141 @@
+import numpy as np
+
+try:
+    from .DistanceHandler import chunk_rows, l1_distances, nearest_parties
+except ImportError:
+    from DistanceHandler import chunk_rows, l1_distances, nearest_parties
+
+# Below this many parties comparing every voter with every party is faster than searching a PartyIndex
+INDEX_THRESHOLD = 256
+
+
+class PartyIndex:
+    """
+    A k-d tree over party positions that finds each voter's closest party by L1 distance without comparing them with
+    every party.
+
+    Parties are split at the median of their widest axis until each leaf holds at most leaf_size parties. A voter is
+    compared with the parties of one leaf at a time, nearest bounding box first, and stops once the next box is further
+    away than the closest party found so far. Whole arrays of voters are searched together, a round of leaves at a
+    time. The results, ties included, are exactly those of DistanceHandler.nearest_parties.
+
+    Attributes:
+    - positions (np.ndarray): the P x 4 matrix of party positions.
+    - leaves (list): the indices of the parties in each leaf, in ascending order.
+    - lower (np.ndarray): the lower corner of each leaf's bounding box.
+    - upper (np.ndarray): the upper corner of each leaf's bounding box.
+
+    Methods:
+    - nearest(ideology): Returns the index of the closest party to each voter and the distance to it.
+    """
+
+    def __init__(self, positions, leaf_size=None):
+        """
+        Builds the index over the given party positions.
+
+        Args:
+        - positions (np.ndarray): a P x 4 matrix of party positions.
+        - leaf_size (int): the most parties a leaf can hold. When not given it grows with the square root of the number
+            of parties, which keeps both the number of boxes and the parties searched per box small.
+        """
+        if not len(positions):
+            raise ValueError("Error! Cannot find the closest party when there are no parties")
+
+        self.positions = np.asarray(positions, dtype=np.float32)
+        self.leaf_size = leaf_size or max(32, int(2 * np.sqrt(len(self.positions))))
+        self.leaves = []
+        self._split(np.arange(len(self.positions)))
+        self.lower = np.array([self.positions[leaf].min(axis=0) for leaf in self.leaves], dtype=np.float32)
+        self.upper = np.array([self.positions[leaf].max(axis=0) for leaf in self.leaves], dtype=np.float32)
+
+    def _split(self, indices):
+        """Splits the given parties into leaves at the median of their widest axis."""
+        if len(indices) <= self.leaf_size:
+            self.leaves.append(np.sort(indices))
+            return
+
+        points = self.positions[indices]
+        axis = np.ptp(points, axis=0).argmax()
+        order = np.argsort(points[:, axis], kind="stable")
+        middle = len(indices) // 2
+        self._split(indices[order[:middle]])
+        self._split(indices[order[middle:]])
+
+    def box_distances(self, ideology):
+        """
+        Returns the n x leaves matrix of L1 distances from each voter to each leaf's bounding box. No party in a leaf
+        can be closer to a voter than the leaf's box is.
+
+        Args:
+        - ideology (np.ndarray): an n x 4 matrix of voter ideologies.
+        """
+        distances = np.zeros((len(ideology), len(self.leaves)), dtype=np.float32)
+        for axis in range(4):
+            values = ideology[:, axis, None]
+            distances += np.maximum(np.maximum(self.lower[None, :, axis] - values, values - self.upper[None, :, axis]),
+                                    0)
+        return distances
+
+    def nearest(self, ideology, chunk_size=None):
+        """
+        Returns the index of the closest party to each voter along with the distance to it. Ties go to the party that
+        comes first.
+
+        Args:
+        - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+        - chunk_size (int): the number of voters to search at once.
+        """
+        preferred = np.empty(len(ideology), dtype=np.int32)
+        best = np.empty(len(ideology), dtype=np.float32)
+        rows = chunk_rows(len(self.leaves), chunk_size)
+        for start in range(0, len(ideology), rows):
+            chunk = slice(start, start + rows)
+            preferred[chunk], best[chunk] = self._nearest_chunk(ideology[chunk])
+        return preferred, best
+
+    def _nearest_chunk(self, ideology):
+        """Searches the index for a chunk of voters."""
+        bounds = self.box_distances(ideology)
+        order = np.argsort(bounds, axis=1)
+        preferred = np.full(len(ideology), len(self.positions), dtype=np.int32)
+        best = np.full(len(ideology), np.inf, dtype=np.float32)
+
+        searching = np.arange(len(ideology))
+        for rank in range(len(self.leaves)):
+            leaves = order[searching, rank]
+            # Boxes are visited nearest first, so once a box is further away than the best party so far the rest are
+            # too. A box exactly as far away may still hold a tie with a party that comes first, so it is searched.
+            close = bounds[searching, leaves] <= best[searching]
+            searching, leaves = searching[close], leaves[close]
+            if not len(searching):
+                break
+
+            grouping = np.argsort(leaves, kind="stable")
+            boundaries = np.cumsum(np.bincount(leaves, minlength=len(self.leaves)))
+            for leaf, voters in enumerate(np.split(searching[grouping], boundaries[:-1])):
+                if not len(voters):
+                    continue
+                distances = l1_distances(ideology[voters], self.positions[self.leaves[leaf]])
+                local = distances.argmin(axis=1)
+                closest = distances[np.arange(len(voters)), local]
+                parties = self.leaves[leaf][local]
+                better = (closest < best[voters]) | ((closest == best[voters]) & (parties < preferred[voters]))
+                preferred[voters[better]] = parties[better]
+                best[voters[better]] = closest[better]
+
+        return preferred, best
+
+
+def find_nearest_parties(ideology, positions, chunk_size=None):
+    """
+    Returns the index of the closest party to each voter along with the distance to it, searching a PartyIndex when
+    there are enough parties for it to pay off and comparing with every party otherwise. Both give the same results.
+
+    Args:
+    - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+    - positions (np.ndarray): a P x 4 matrix of party positions.
+    - chunk_size (int): the number of voters to work on at once.
+    """
+    if len(positions) < INDEX_THRESHOLD:
+        return nearest_parties(ideology, positions, chunk_size)
+    return PartyIndex(positions).nearest(ideology, chunk_size)
@@ -0,0 +1,148 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+try:
+    from .CorpusHandler import NameTable
+    from .ElectorateHandler import COLUMNS, Electorate
+except ImportError:
+    from CorpusHandler import NameTable
+    from ElectorateHandler import COLUMNS, Electorate
+
+MAGIC = b"VMELECT\0"
+FORMAT_VERSION = 1
+
+# The magic bytes followed by the offset and length of the header, which is written after the data it describes
+_PREAMBLE = struct.Struct("<8sQQ")
+
+# Every section starts on a multiple of this many bytes, so memory mapped columns are aligned for any dtype
+ALIGNMENT = 64
+
+
+def _name_section(column):
+    """Returns the bytes of every name in a NameColumn and the 2 x N start and end of each name within them."""
+    if isinstance(column.table, NameTable):
+        # Names loaded from a file are written out as they are, without decoding them. The table may be a view into a
+        # whole saved election, so only the bytes its names span are copied
+        offsets = np.asarray(column.table.offsets, dtype=np.int64)
+        start, end = (int(offsets.min()), int(offsets.max())) if offsets.size else (0, 0)
+        blob, offsets = bytes(column.table.blob[start:end]), offsets - start
+        names = column.extra
+    else:
+        blob, offsets = b"", np.zeros((2, 0), dtype=np.int64)
+        names = list(column.table) + column.extra
+
+    encoded = [str(name).encode("utf-8") for name in names]
+    lengths = np.array([len(name) for name in encoded], dtype=np.int64)
+    ends = len(blob) + np.cumsum(lengths)
+    return blob + b"".join(encoded), np.concatenate((offsets, np.stack((ends - lengths, ends))), axis=1)
+
+
+class _Writer:
+    """Writes aligned sections to a file and records where each one starts."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data):
+        """Writes bytes or an array at the next aligned offset and returns the offset."""
+        offset = -self.f.tell() % ALIGNMENT + self.f.tell()
+        self.f.seek(offset)
+        self.f.write(np.ascontiguousarray(data).reshape(-1).view(np.uint8) if isinstance(data, np.ndarray) else data)
+        return offset
+
+    def array(self, values):
+        """Writes an array and returns its description in the header."""
+        values = np.ascontiguousarray(values)
+        return {"dtype": values.dtype.str, "shape": list(values.shape), "offset": self.write(values)}
+
+
+def write_election_file(path, electorate, parties, metadata=None):
+    """
+    Writes an electorate and its parties to a single columnar binary file.
+
+    The file starts with MAGIC and the offset and length of a JSON header. Each column of the electorate and the names
+    its codes refer to follow as raw little-endian arrays aligned to ALIGNMENT bytes, and the header at the end records
+    the dtype, shape and offset of each one so they can be memory mapped as they are, see read_election_file.
+
+    Args:
+    - path (str): the file to write.
+    - electorate (Electorate): the voters to write.
+    - parties (list): a dictionary for each party, holding its name and ideology.
+    - metadata (dict): anything else to keep with the election. It must be possible to write it as JSON.
+    """
+    # The electorate may be memory mapped from the very file being written, so it is written to a temporary file
+    # beside it that then replaces it. The old file is never truncated, and a failed write leaves it as it was
+    directory, name = os.path.split(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            _write_sections(f, electorate, parties, metadata)
+        # Temporary files are only readable by their owner, so the permissions a plain open would give are restored
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary, 0o666 & ~umask)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _write_sections(f, electorate, parties, metadata):
+    """Writes the preamble, the sections and the header of an election file, see write_election_file."""
+    f.write(_PREAMBLE.pack(MAGIC, 0, 0))
+    writer = _Writer(f)
+
+    header = {"format": FORMAT_VERSION, "size": len(electorate), "parties": parties,
+              "metadata": metadata or {}, "columns": {}, "names": {}}
+    for name in COLUMNS:
+        header["columns"][name] = writer.array(getattr(electorate, name)[:len(electorate)])
+
+    for name in ("first_names", "last_names"):
+        blob, offsets = _name_section(getattr(electorate, name))
+        start = writer.write(blob)
+        # Offsets are stored from the start of the file, so names can be read straight from one mapping of it
+        header["names"][name] = writer.array(offsets + start)
+
+    encoded = json.dumps(header).encode("utf-8")
+    header_offset = writer.write(encoded)
+    f.seek(0)
+    f.write(_PREAMBLE.pack(MAGIC, header_offset, len(encoded)))
+
+
+def _map_array(path, description):
+    """Returns a copy-on-write memory map of an array described in the header."""
+    shape = tuple(description["shape"])
+    if not np.prod(shape):
+        # Empty files and sections cannot be mapped
+        return np.empty(shape, dtype=description["dtype"])
+    return np.memmap(path, dtype=description["dtype"], mode="c", offset=description["offset"], shape=shape)
+
+
+def read_election_file(path):
+    """
+    Opens a file written by write_election_file, returning the electorate, the list of party dictionaries and the
+    metadata. Nothing is parsed or copied: the columns are copy-on-write memory maps of the file, so opening takes the
+    same time however many voters it holds, processes that open the same file share its pages, and changing the
+    electorate never changes the file.
+
+    Args:
+    - path (str): the file to open.
+    """
+    with open(path, "rb") as f:
+        magic, header_offset, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size).ljust(_PREAMBLE.size, b"\0"))
+        if magic != MAGIC:
+            raise ValueError(f"Error! {path} is not a saved election")
+        f.seek(header_offset)
+        header = json.loads(f.read(header_length).decode("utf-8"))
+        if header["format"] > FORMAT_VERSION:
+            raise ValueError(f"Error! {path} was saved in a newer format ({header['format']}) than this version reads")
+        blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    columns = {name: _map_array(path, header["columns"][name]) for name in COLUMNS}
+    names = [NameTable(blob, _map_array(path, header["names"][name])) for name in ("first_names", "last_names")]
+    return Electorate.from_columns(columns, *names), header["parties"], header["metadata"]
@@ -0,0 +1,432 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import itertools
+import os
+
+import numpy as np
+
+try:
+    from .ClassHandler import METHOD_OPTIONS, method_options, NEAREST_METHODS, VOTING_METHODS
+    from .DistanceHandler import distance_matrix, l1_distances, nearest_parties, pairwise_counts, party_positions, \
+        rank_distances
+    from .ElectorateHandler import IDEOLOGY_AXES
+    from .LogHandler import get_logger, PROFILER
+    from .TallyHandler import fptp_from_counts, read_only
+except ImportError:
+    from ClassHandler import METHOD_OPTIONS, method_options, NEAREST_METHODS, VOTING_METHODS
+    from DistanceHandler import distance_matrix, l1_distances, nearest_parties, pairwise_counts, party_positions, \
+        rank_distances
+    from ElectorateHandler import IDEOLOGY_AXES
+    from LogHandler import get_logger, PROFILER
+    from TallyHandler import fptp_from_counts, read_only
+
+# The parameters an electorate sweep can vary, and the value each takes when it is not varied. The chosen ideology axis
+# of every voter x becomes centre + spread * (x - centre) + shift, clipped to [0, 1], where centre is the mean voter
+ELECTORATE_PARAMETERS = {"shift": 0.0, "spread": 1.0}
+
+# The range each parameter is swept over unless told otherwise
+PARAMETER_RANGES = dict({axis: (0.0, 1.0) for axis in IDEOLOGY_AXES}, shift=(-0.5, 0.5), spread=(0.0, 2.0))
+
+logger = get_logger("sweep")
+
+
+@dataclass(frozen=True, eq=False)
+class SweepResult:
+    """
+    The winner and vote shares of every voting method at every point of a grid, as maps that can be plotted.
+
+    Attributes:
+    - kind (str): "party" when one party was moved, "electorate" when the voters were.
+    - target (str): the ID of the party moved, or the ideology axis of the voters that was changed.
+    - parameters (dict): the values each parameter of the grid took, by name, in the order of the map's dimensions.
+    - parties (tuple): the Party objects that stood, as they were before the sweep.
+    - winners (dict): for each voting method, a read-only array of the index of the winning party at each grid point.
+    - shares (dict): for each voting method, a read-only array of the share of the votes (or points) of each party at
+        each grid point, with the parties along the last dimension.
+
+    Methods:
+    - winner_ids(method): Returns the map of the winning party's ID at each grid point.
+    - render(method, path): Draws the map of a voting method to a file.
+    - as_dict(): Returns the sweep as a dictionary that can be written out as JSON.
+    """
+
+    kind: str
+    target: str
+    parameters: dict
+    parties: tuple
+    winners: dict
+    shares: dict
+
+    def __post_init__(self):
+        object.__setattr__(self, "parties", tuple(self.parties))
+        object.__setattr__(self, "parameters", {name: read_only(values, np.float64)
+                                                for name, values in self.parameters.items()})
+        object.__setattr__(self, "winners", {method: read_only(winners) for method, winners in self.winners.items()})
+        object.__setattr__(self, "shares", {method: read_only(shares) for method, shares in self.shares.items()})
+
+    def __repr__(self):
+        grid = " x ".join(f"{len(values)} {name}" for name, values in self.parameters.items())
+        return f"SweepResult(kind={self.kind!r}, target={self.target!r}, grid={grid!r}, methods={list(self.winners)})"
+
+    @property
+    def shape(self):
+        """The number of values each parameter took."""
+        return tuple(len(values) for values in self.parameters.values())
+
+    def winner_ids(self, method):
+        """
+        Returns the map of the winning party's ID at each grid point, as nested lists.
+
+        Args:
+        - method (str): the name of the voting method.
+        """
+        ids = np.array([party.id for party in self.parties], dtype=object)
+        return ids[self.winners[method]].tolist()
+
+    def render(self, method, path="sweep.png"):
+        """
+        Draws the map of a voting method to a PNG or SVG file and returns the path, see
+        ChartHandler.render_sweep_map.
+
+        Args:
+        - method (str): the name of the voting method whose map to draw.
+        - path (str): the file to save the map to.
+        """
+        # Only imported when a map is drawn, so sweeping never loads matplotlib
+        try:
+            from .ChartHandler import render_sweep_map
+        except ImportError:
+            from ChartHandler import render_sweep_map
+        return render_sweep_map(self, method, path)
+
+    def as_dict(self):
+        """Returns the sweep as a dictionary that can be written out as JSON."""
+        return {
+            "kind": self.kind,
+            "target": self.target,
+            "parameters": {name: values.tolist() for name, values in self.parameters.items()},
+            "parties": [party.id for party in self.parties],
+            "names": [party.name for party in self.parties],
+            "winners": {method: self.winner_ids(method) for method in self.winners},
+            "shares": {method: shares.tolist() for method, shares in self.shares.items()},
+        }
+
+
+class _Cell:
+    """
+    Stands in for an Election at one grid point, answering the calls VOTING_METHODS make from a single distance
+    matrix, so every voting method can count a sweep's grid point without an Election being built for it.
+    """
+
+    def __init__(self, distances, parties):
+        self.distances = distances
+        self.parties = parties
+        self._rankings = None
+
+    def party_distances(self):
+        return self.distances
+
+    def first_preference_counts(self):
+        return np.bincount(self.distances.argmin(axis=1), minlength=len(self.parties))
+
+    def party_rankings(self):
+        if self._rankings is None:
+            self._rankings = rank_distances(self.distances)
+        return self._rankings
+
+    def pairwise_preferences(self):
+        return pairwise_counts(self.distances)
+
+
+class Sweep:
+    """
+    Counts one electorate again and again while a single thing about the election changes over a grid, to show how
+    sensitive its result is: where one party stands, or how the voters are spread along an ideology axis.
+
+    The voters and the other parties never change, so only what depends on the swept parameters is worked out at each
+    grid point. Moving a party only changes its own column of the distance matrix, and First Past The Post only needs
+    that column, as each voter's closest other party is found once beforehand. Reshaping the electorate along one axis
+    keeps the distances summed over the axes before it. Every distance is added up in the same order as
+    DistanceHandler.l1_distances, so each grid point's result, ties included, is exactly that of an election with the
+    party or the voters moved there.
+
+    Results are kept for every grid point counted, so a point that comes up again, in the same sweep or a later one,
+    is not counted twice. A Sweep works from the voters and parties as they are when it is made, so a new one is needed
+    once the election changes.
+
+    Attributes:
+    - parties (list): the Party objects standing.
+    - ideology (np.ndarray): the N x 4 matrix of voter ideologies.
+    - methods (tuple): the names of the voting methods counted at each grid point.
+    - options (dict): the options of the voting methods that take them, see METHOD_OPTIONS.
+
+    Methods:
+    - from_election(election, methods): Returns a Sweep of an election's voters and parties.
+    - count_point(kind, target, point): Counts a single grid point.
+    - move_party(party, grid): Counts the election with one party moved to every point of a grid of positions.
+    - shift_electorate(axis, grid): Counts the election with the voters shifted and spread along an axis.
+    """
+
+    def __init__(self, parties, ideology, methods=("fptp",), **options):
+        """
+        Initializes a Sweep that has not counted anything yet.
+
+        Args:
+        - parties (list): the Party objects standing.
+        - ideology (np.ndarray): the N x 4 matrix of voter ideologies.
+        - methods (tuple): the names of the voting methods to count at each grid point.
+        - options: options for the methods that take them, such as threshold for "approval", see METHOD_OPTIONS.
+        """
+        if not len(parties):
+            raise ValueError("Error! Cannot sweep an election without any parties")
+        for method in methods:
+            if method not in VOTING_METHODS:
+                raise ValueError(f"Error! Unknown voting method {method!r}, expected one of "
+                                 f"{', '.join(VOTING_METHODS)}")
+        known = {option for names in METHOD_OPTIONS.values() for option in names}
+        for option in options:
+            if option not in known:
+                raise ValueError(f"Error! Unknown voting method option {option!r}")
+
+        self.parties = list(parties)
+        self.ideology = ideology
+        self.methods = tuple(methods)
+        self.options = {name: value for name, value in options.items() if value is not None}
+        self._positions = party_positions(self.parties)
+        self._results = {}
+        self._prepared = {}
+
+    @classmethod
+    def from_election(cls, election, methods=("fptp",), **options):
+        """
+        Returns a Sweep of an election's voters and parties.
+
+        Args:
+        - election (Election): the election to sweep.
+        - methods (tuple): the names of the voting methods to count at each grid point.
+        - options: options for the methods that take them, see METHOD_OPTIONS.
+        """
+        return cls(election.parties, election.electorate.ideology, methods, **options)
+
+    def _party_index(self, party):
+        """Returns the index of a party given by index, ID or Party object."""
+        if isinstance(party, (int, np.integer)):
+            if not 0 <= party < len(self.parties):
+                raise ValueError(f"Error! There is no party {party}, there are {len(self.parties)} parties")
+            return int(party)
+        party_id = getattr(party, "id", party)
+        for i, candidate in enumerate(self.parties):
+            if candidate.id == party_id:
+                return i
+        raise ValueError(f"Error! Party with ID {party_id} not found")
+
+    def _prepare(self, key, compute):
+        """Returns what a kind of sweep works out once before its first grid point, working it out if needed."""
+        if key not in self._prepared:
+            with PROFILER.span("distances"):
+                self._prepared[key] = compute()
+        return self._prepared[key]
+
+    def _closest_others(self, index):
+        """
+        Returns the closest party to each voter other than the one at index, with the distance to it, split into the
+        parties before and after it: a voter only switches to the moved party if it is strictly closer than every
+        party before it and no further than every party after it, so ties go to the party that comes first.
+        """
+        def closest(positions, offset):
+            if not len(positions):
+                return (np.zeros(len(self.ideology), dtype=np.int32),
+                        np.full(len(self.ideology), np.inf, dtype=np.float32))
+            preferred, best = nearest_parties(self.ideology, positions)
+            return preferred + offset, best
+
+        before, best_before = closest(self._positions[:index], 0)
+        after, best_after = closest(self._positions[index + 1:], index + 1)
+        preferred = np.where(best_before <= best_after, before, after)
+        return preferred, best_before, best_after, np.bincount(preferred, minlength=len(self.parties))
+
+    def _count(self, distances, parties, methods):
+        """Counts the grid point whose distance matrix is given with each method, returning the winners and counts."""
+        cell = _Cell(distances, parties)
+        results = {}
+        for method in methods:
+            result = VOTING_METHODS[method](cell, **method_options(method, self.options))
+            results[method] = (result.winner_index, result.counts)
+        return results
+
+    def _count_party(self, index, position, methods):
+        """Counts the election with the party at index moved to position."""
+        parties = self.parties
+        with PROFILER.span("distances"):
+            column = l1_distances(self.ideology, position[None, :])[:, 0]
+        results = {}
+        with PROFILER.span("tally"):
+            if any(method in NEAREST_METHODS for method in methods):
+                preferred, best_before, best_after, counts = self._prepare(
+                    ("closest", index), lambda: self._closest_others(index))
+                chosen = (column < best_before) & (column <= best_after)
+                counts = counts - np.bincount(preferred[chosen], minlength=len(parties))
+                counts[index] = chosen.sum()
+                result = fptp_from_counts(counts, parties)
+                results.update({method: (result.winner_index, result.counts) for method in methods
+                                if method in NEAREST_METHODS})
+
+            others = [method for method in methods if method not in NEAREST_METHODS]
+            if others:
+                # The one matrix is reused for every grid point, overwriting only the moved party's column
+                distances = self._prepare(("distances",), lambda: distance_matrix(self.ideology, self._positions))
+                original = distances[:, index].copy()
+                distances[:, index] = column
+                try:
+                    results.update(self._count(distances, parties, others))
+                finally:
+                    distances[:, index] = original
+        return results
+
+    def _count_electorate(self, axis, shift, spread, methods):
+        """Counts the election with the voters shifted and spread along an axis."""
+        def before():
+            # The distances summed over the axes before the one changed, in the order l1_distances adds them
+            prefix = np.zeros((len(self.ideology), len(self.parties)), dtype=np.float32)
+            for other in range(axis):
+                prefix += np.abs(self.ideology[:, other, None] - self._positions[None, :, other])
+            return prefix, np.float32(self.ideology[:, axis].mean()) if len(self.ideology) else np.float32(0.5)
+
+        prefix, centre = self._prepare(("electorate", axis), before)
+        with PROFILER.span("distances"):
+            moved = np.clip(centre + np.float32(spread) * (self.ideology[:, axis] - centre) + np.float32(shift), 0, 1)
+            distances = np.abs(moved[:, None] - self._positions[None, :, axis])
+            if axis:
+                distances = prefix + distances
+            for other in range(axis + 1, len(IDEOLOGY_AXES)):
+                distances += np.abs(self.ideology[:, other, None] - self._positions[None, :, other])
+        with PROFILER.span("tally"):
+            return self._count(distances, self.parties, methods)
+
+    def count_point(self, kind, target, point):
+        """
+        Counts one grid point with every method whose result there is not known yet, returning the winner index and
+        counts of every method.
+
+        Args:
+        - kind (str): "party" or "electorate".
+        - target (int): the index of the party moved, or of the ideology axis changed.
+        - point (tuple): for a party, its four ideologies; for the electorate, the shift and the spread.
+        """
+        key = (kind, target, tuple(float(value) for value in point))
+        known = self._results.setdefault(key, {})
+        missing = [method for method in self.methods if method not in known]
+        if missing:
+            if kind == "party":
+                known.update(self._count_party(target, np.asarray(point, dtype=np.float32), missing))
+            else:
+                known.update(self._count_electorate(target, *point, missing))
+            PROFILER.count("sweep points counted")
+        return {method: known[method] for method in self.methods}
+
+    def _sweep(self, kind, target, parameters, points, workers):
+        """Counts every grid point, across a pool of processes unless workers is 1, and returns the SweepResult."""
+        keys = [(kind, target, tuple(float(value) for value in point)) for point in points]
+        missing = list(dict.fromkeys(point for point, key in zip(points, keys)
+                                     if not all(method in self._results.get(key, {}) for method in self.methods)))
+
+        if workers == 1 or len(missing) <= 1:
+            for point in missing:
+                self.count_point(kind, target, point)
+        else:
+            workers = min(workers or os.cpu_count() or 1, len(missing))
+            # Every worker works out the distances it reuses once, so each is given an even share of the points
+            chunks = [missing[start::workers] for start in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker,
+                                     initargs=(self.parties, self.ideology, self.methods, self.options)) as executor:
+                for chunk, counted in zip(chunks, executor.map(_count_points, itertools.repeat(kind),
+                                                               itertools.repeat(target), chunks)):
+                    for point, results in zip(chunk, counted):
+                        self._results.setdefault((kind, target, tuple(float(value) for value in point)),
+                                                 {}).update(results)
+            PROFILER.count("sweep points counted", len(missing))
+        PROFILER.count("sweep points reused", len(points) - len(missing))
+        logger.info("Swept %d grid points, %d of them counted", len(points), len(missing))
+
+        shape = tuple(len(values) for values in parameters.values())
+        winners = {method: np.empty(len(points), dtype=np.int32) for method in self.methods}
+        shares = {method: np.empty((len(points), len(self.parties))) for method in self.methods}
+        for i, key in enumerate(keys):
+            for method in self.methods:
+                winner, counts = self._results[key][method]
+                total = counts.sum()
+                winners[method][i] = winner
+                shares[method][i] = counts / total if total else 0
+
+        return SweepResult(kind, self.parties[target].id if kind == "party" else IDEOLOGY_AXES[target], parameters,
+                           self.parties, {method: values.reshape(shape) for method, values in winners.items()},
+                           {method: values.reshape(shape + (len(self.parties),)) for method, values in shares.items()})
+
+    def move_party(self, party, grid, workers=1):
+        """
+        Counts the election with one party moved to every point of a grid of positions and returns the SweepResult.
+        The party keeps its own position on every axis not in the grid.
+
+        Args:
+        - party (int, str or Party): the party to move, by index, ID or object.
+        - grid (dict): the positions to try on each ideology axis varied, e.g.
+            {"economic": np.linspace(0, 1, 21), "social": np.linspace(0, 1, 21)}. The map has one dimension per axis,
+            in the order given.
+        - workers (int): the number of processes to spread the grid points across, all available cores when None.
+            With one worker, the default, every point is counted in this process.
+        """
+        index = self._party_index(party)
+        for axis in grid:
+            if axis not in IDEOLOGY_AXES:
+                raise ValueError(f"Error! Unknown ideology axis {axis!r}, expected one of {', '.join(IDEOLOGY_AXES)}")
+        axes = [IDEOLOGY_AXES.index(axis) for axis in grid]
+        parameters = {axis: np.asarray(values, dtype=np.float64).reshape(-1) for axis, values in grid.items()}
+
+        points = []
+        for values in itertools.product(*parameters.values()):
+            position = self._positions[index].copy()
+            position[axes] = values
+            points.append(tuple(position.tolist()))
+        return self._sweep("party", index, parameters, points, workers)
+
+    def shift_electorate(self, axis, grid, workers=1):
+        """
+        Counts the election with the voters shifted and spread along one ideology axis at every point of a grid and
+        returns the SweepResult. A voter at x moves to centre + spread * (x - centre) + shift, clipped to [0, 1], where
+        centre is the mean of the voters, so a spread below 1 brings the voters together and above 1 polarises them.
+
+        Args:
+        - axis (str): the ideology axis to change, one of IDEOLOGY_AXES.
+        - grid (dict): the values to try of "shift", "spread" or both, e.g. {"shift": np.linspace(-0.3, 0.3, 13)}. A
+            parameter not in the grid keeps its value in ELECTORATE_PARAMETERS.
+        - workers (int): the number of processes to spread the grid points across, all available cores when None.
+            With one worker, the default, every point is counted in this process.
+        """
+        if axis not in IDEOLOGY_AXES:
+            raise ValueError(f"Error! Unknown ideology axis {axis!r}, expected one of {', '.join(IDEOLOGY_AXES)}")
+        for name in grid:
+            if name not in ELECTORATE_PARAMETERS:
+                raise ValueError(f"Error! Unknown electorate parameter {name!r}, expected one of "
+                                 f"{', '.join(ELECTORATE_PARAMETERS)}")
+        parameters = {name: np.asarray(values, dtype=np.float64).reshape(-1) for name, values in grid.items()}
+
+        points = []
+        for values in itertools.product(*parameters.values()):
+            point = dict(ELECTORATE_PARAMETERS, **dict(zip(parameters, values)))
+            points.append((point["shift"], point["spread"]))
+        return self._sweep("electorate", IDEOLOGY_AXES.index(axis), parameters, points, workers)
+
+
+# The Sweep each worker process counts its grid points with, made once per process rather than once per point
+_worker_sweep = None
+
+
+def _start_worker(parties, ideology, methods, options):
+    """Makes the worker process's Sweep, see Sweep._sweep."""
+    global _worker_sweep
+    _worker_sweep = Sweep(parties, ideology, methods, **options)
+
+
+def _count_points(kind, target, points):
+    """Counts a share of a sweep's grid points in a worker process."""
+    return [_worker_sweep.count_point(kind, target, point) for point in points]
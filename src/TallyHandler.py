@@ -0,0 +1,812 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+try:
+    from .DistanceHandler import chunk_rows, l1_distances, pairwise_counts, rank_distances
+    from .SpatialHandler import find_nearest_parties
+except ImportError:
+    from DistanceHandler import chunk_rows, l1_distances, pairwise_counts, rank_distances
+    from SpatialHandler import find_nearest_parties
+
+# A voter approves of every party within this L1 distance unless told otherwise. Two random points in the ideology
+# space are 4/3 apart on average, so this approves a little under half the parties
+APPROVAL_THRESHOLD = 1.0
+
+# Score ballots give every party a whole number of points from 0 up to this
+SCORE_RANGE = 10
+
+
+def read_only(values, dtype=None):
+    """Returns a read-only copy of the given values as a NumPy array."""
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True, eq=False)
+class ElectionResult:
+    """
+    The immutable result of counting an election with a voting method.
+
+    Attributes:
+    - method (str): the name of the voting method used.
+    - parties (tuple): the Party objects that stood, in the order of counts.
+    - counts (np.ndarray): a read-only array of the votes (or points) each party received.
+    - winner_index (int): the index of the winning party in parties.
+
+    Methods:
+    - as_dict(): Returns the result as a dictionary that can be written out as JSON.
+    """
+
+    method: str
+    parties: tuple
+    counts: np.ndarray
+    winner_index: int
+
+    def __post_init__(self):
+        object.__setattr__(self, "parties", tuple(self.parties))
+        object.__setattr__(self, "counts", read_only(self.counts))
+        object.__setattr__(self, "winner_index", int(self.winner_index))
+
+    def __str__(self):
+        return f"The winner is {self.winner.name} with {self.counts[self.winner_index]:.10g} votes"
+
+    def __repr__(self):
+        return f"ElectionResult(method={self.method!r}, winner={self.winner.name!r}, counts={self.counts.tolist()})"
+
+    @property
+    def winner(self):
+        """The winning Party."""
+        return self.parties[self.winner_index]
+
+    @property
+    def total(self):
+        """The total number of votes (or points) counted."""
+        return self.counts.sum()
+
+    @property
+    def shares(self):
+        """The share of the total each party received, as a read-only array."""
+        total = self.total
+        return read_only(self.counts / total if total else np.zeros(len(self.counts)))
+
+    def as_dict(self):
+        """Returns the result as a dictionary that can be written out as JSON."""
+        return {
+            "method": self.method,
+            "winner": self.winner.id,
+            "parties": [party.id for party in self.parties],
+            "names": [party.name for party in self.parties],
+            "counts": self.counts.tolist(),
+            "shares": self.shares.tolist(),
+        }
+
+
+@dataclass(frozen=True, eq=False)
+class MethodComparison:
+    """
+    The results of counting the same election with several voting methods, side by side.
+
+    Attributes:
+    - parties (tuple): the Party objects that stood.
+    - results (dict): the result of each voting method, by name, in the order they were counted.
+
+    Methods:
+    - table(): Returns the winner under each method as a table for the terminal.
+    - as_dict(): Returns the comparison as a dictionary that can be written out as JSON.
+    """
+
+    parties: tuple
+    results: dict
+
+    def __post_init__(self):
+        object.__setattr__(self, "parties", tuple(self.parties))
+        object.__setattr__(self, "results", dict(self.results))
+
+    def __str__(self):
+        return self.table()
+
+    def __repr__(self):
+        return f"MethodComparison(winners={ {method: party.name for method, party in self.winners.items()} })"
+
+    @property
+    def winners(self):
+        """The winning Party under each voting method."""
+        return {method: result.winner for method, result in self.results.items()}
+
+    @property
+    def unanimous(self):
+        """Whether every voting method elected the same party."""
+        return len({party.id for party in self.winners.values()}) <= 1
+
+    def table(self):
+        """Returns the winner under each voting method, with its votes (or points) and share, as a table."""
+        width = max([len(party.name) for party in self.parties] + [6])
+        lines = [f"{'method':<14}{'winner':<{width + 2}}{'votes':>14}{'share':>9}"]
+        for method, result in self.results.items():
+            lines.append(f"{method:<14}{result.winner.name:<{width + 2}}{result.counts[result.winner_index]:>14.10g}"
+                         f"{result.shares[result.winner_index]:>9.1%}")
+        lines.append("Every method elected the same party." if self.unanimous else "The methods disagree.")
+        return "\n".join(lines)
+
+    def as_dict(self):
+        """Returns the comparison as a dictionary that can be written out as JSON."""
+        return {
+            "winners": {method: party.id for method, party in self.winners.items()},
+            "unanimous": self.unanimous,
+            "results": {method: result.as_dict() for method, result in self.results.items()},
+        }
+
+
+def fptp_tally(preferred, parties):
+    """
+    Counts an election with First Past The Post in a single pass over the voters' preferred parties. Ties go to the
+    party that comes first.
+
+    Args:
+    - preferred (np.ndarray): the index of each voter's most suitable party.
+    - parties (list): the Party objects the indices refer to.
+    """
+    if not len(parties):
+        raise ValueError("Error! Cannot count an election without any parties")
+
+    return fptp_from_counts(np.bincount(preferred, minlength=len(parties)), parties)
+
+
+def fptp_from_counts(counts, parties):
+    """
+    Returns the First Past The Post result for first preference counts that have already been tallied. Ties go to the
+    party that comes first.
+
+    Args:
+    - counts (np.ndarray): the number of first preferences each party received.
+    - parties (list): the Party objects the counts refer to.
+    """
+    if not len(parties):
+        raise ValueError("Error! Cannot count an election without any parties")
+    return ElectionResult("fptp", parties, counts, np.argmax(counts))
+
+
+@dataclass(frozen=True, eq=False)
+class RunoffResult(ElectionResult):
+    """
+    The immutable result of counting an election by ranked ballots with Instant Runoff or the Single Transferable Vote.
+
+    Attributes:
+    - rounds (tuple): a read-only array of the counts after each round, starting with the first preferences.
+    - elected (tuple): the indices of the elected parties, in the order they were elected.
+    - eliminated (tuple): the indices of the eliminated parties, in the order they were eliminated.
+    """
+
+    rounds: tuple
+    elected: tuple
+    eliminated: tuple
+
+    def __post_init__(self):
+        super().__post_init__()
+        object.__setattr__(self, "rounds", tuple(read_only(counts) for counts in self.rounds))
+        object.__setattr__(self, "elected", tuple(int(i) for i in self.elected))
+        object.__setattr__(self, "eliminated", tuple(int(i) for i in self.eliminated))
+
+    @property
+    def winners(self):
+        """The elected Party objects, in the order they were elected."""
+        return [self.parties[i] for i in self.elected]
+
+    def as_dict(self):
+        result = super().as_dict()
+        result["elected"] = [self.parties[i].id for i in self.elected]
+        result["eliminated"] = [self.parties[i].id for i in self.eliminated]
+        result["rounds"] = [counts.tolist() for counts in self.rounds]
+        return result
+
+
+class _BallotPiles:
+    """
+    Ranked ballots grouped by the party they currently count towards, so a transfer only has to touch the ballots of
+    the party being elected or eliminated.
+    """
+
+    def __init__(self, rankings, nof_parties):
+        self.rankings = rankings
+        self.nof_parties = nof_parties
+        self.weights = np.ones(len(rankings))
+        self.pointer = np.zeros(len(rankings), dtype=np.intp)
+        self.piles = [[] for _ in range(nof_parties)]
+        self.counts = np.zeros(nof_parties)
+        if len(rankings):
+            self._add(np.arange(len(rankings)), rankings[:, 0].astype(np.intp))
+
+    def _add(self, ballots, choices):
+        """Adds ballots to the piles of the parties they now count towards."""
+        self.counts += np.bincount(choices, self.weights[ballots], minlength=self.nof_parties)
+        order = np.argsort(choices, kind="stable")
+        boundaries = np.cumsum(np.bincount(choices, minlength=self.nof_parties))
+        for party, pile in enumerate(np.split(ballots[order], boundaries[:-1])):
+            if len(pile):
+                self.piles[party].append(pile)
+
+    def transfer(self, party, continuing, ratio=1.0):
+        """
+        Moves the ballots counting towards a party on to each ballot's next continuing preference.
+
+        Args:
+        - party (int): the index of the party whose ballots are transferred.
+        - continuing (np.ndarray): a boolean mask of the parties still in the count.
+        - ratio (float): the fraction of each ballot's weight that is passed on.
+        """
+        ballots = np.concatenate(self.piles[party]) if self.piles[party] else np.empty(0, dtype=np.intp)
+        self.piles[party] = []
+        self.counts[party] = 0
+        if ratio != 1.0:
+            self.weights[ballots] *= ratio
+        if not ratio:
+            return
+
+        pending, positions = ballots, self.pointer[ballots] + 1
+        while len(pending):
+            # Ballots whose preferences have all been elected or eliminated are exhausted
+            live = positions < self.nof_parties
+            pending, positions = pending[live], positions[live]
+            choices = self.rankings[pending, positions].astype(np.intp)
+            found = continuing[choices]
+            self.pointer[pending[found]] = positions[found]
+            self._add(pending[found], choices[found])
+            pending, positions = pending[~found], positions[~found] + 1
+
+
+def ranked_tally(rankings, parties, seats=1, method=None):
+    """
+    Counts ranked ballots with the Single Transferable Vote using the Droop quota and fractional surplus transfers. With
+    one seat this is Instant Runoff Voting. Each round only the ballots of the party elected or eliminated are moved,
+    so a count never recounts the whole electorate.
+
+    Args:
+    - rankings (np.ndarray): an N x P matrix of each voter's ranking of the parties.
+    - parties (list): the Party objects the rankings refer to.
+    - seats (int): the number of parties to elect.
+    - method (str): the name to give the result, "irv" for one seat and "stv" otherwise when not given.
+    """
+    if not len(parties):
+        raise ValueError("Error! Cannot count an election without any parties")
+    if not 1 <= seats <= len(parties):
+        raise ValueError("Error! The number of seats must be between 1 and the number of parties")
+
+    piles = _BallotPiles(rankings, len(parties))
+    quota = len(rankings) // (seats + 1) + 1
+    continuing = np.ones(len(parties), dtype=bool)
+    elected, eliminated = [], []
+    rounds = [piles.counts.copy()]
+
+    while len(elected) < seats:
+        candidates = np.flatnonzero(continuing)
+        if len(candidates) <= seats - len(elected):
+            # Everyone left fills the remaining seats
+            elected.extend(candidates[np.argsort(-piles.counts[candidates], kind="stable")])
+            break
+
+        leader = candidates[piles.counts[candidates].argmax()]
+        if piles.counts[leader] >= quota:
+            elected.append(leader)
+            continuing[leader] = False
+            if len(elected) < seats:
+                votes = piles.counts[leader]
+                piles.transfer(leader, continuing, (votes - quota) / votes)
+                piles.counts[leader] = quota
+        else:
+            loser = candidates[piles.counts[candidates].argmin()]
+            eliminated.append(loser)
+            continuing[loser] = False
+            piles.transfer(loser, continuing)
+        rounds.append(piles.counts.copy())
+
+    if method is None:
+        method = "irv" if seats == 1 else "stv"
+    return RunoffResult(method, parties, rounds[-1], elected[0], rounds, elected, eliminated)
+
+
+@dataclass(frozen=True, eq=False)
+class CondorcetResult(ElectionResult):
+    """
+    The immutable result of counting an election with a Condorcet method.
+
+    Attributes:
+    - pairwise (np.ndarray): a read-only P x P matrix of how many voters prefer party i to party j.
+    - condorcet_winner (int): the index of the party that beats every other head to head, or None if there is none.
+    """
+
+    pairwise: np.ndarray
+    condorcet_winner: int
+
+    def __post_init__(self):
+        super().__post_init__()
+        object.__setattr__(self, "pairwise", read_only(self.pairwise))
+
+    def as_dict(self):
+        result = super().as_dict()
+        result["pairwise"] = self.pairwise.tolist()
+        result["condorcet_winner"] = (self.parties[self.condorcet_winner].id
+                                      if self.condorcet_winner is not None else None)
+        return result
+
+
+def condorcet_winner(pairwise):
+    """
+    Returns the index of the party that beats every other party head to head, or None if there is no such party.
+
+    Args:
+    - pairwise (np.ndarray): a P x P matrix of how many voters prefer party i to party j.
+    """
+    beats = pairwise > pairwise.T
+    winners = np.flatnonzero(beats.sum(axis=1) == len(pairwise) - 1)
+    return int(winners[0]) if len(winners) else None
+
+
+def _check_pairwise(pairwise, parties):
+    if not len(parties):
+        raise ValueError("Error! Cannot count an election without any parties")
+    if pairwise.shape != (len(parties), len(parties)):
+        raise ValueError("Error! The pairwise matrix does not match the number of parties")
+
+
+def schulze_tally(pairwise, parties):
+    """
+    Counts an election with the Schulze method. The strongest path between every pair of parties is found with a
+    Floyd-Warshall pass that updates the whole matrix for each intermediate party at once. Each party scores the
+    number of parties it beats by strongest path, and ties go to the party that comes first.
+
+    Args:
+    - pairwise (np.ndarray): a P x P matrix of how many voters prefer party i to party j.
+    - parties (list): the Party objects the matrix refers to.
+    """
+    _check_pairwise(pairwise, parties)
+    strength = np.where(pairwise > pairwise.T, pairwise, 0)
+    for k in range(len(parties)):
+        # Paths through k from i back to i cannot strengthen a path, so the diagonal needs no special case
+        np.maximum(strength, np.minimum(strength[:, k, None], strength[None, k, :]), out=strength)
+    np.fill_diagonal(strength, 0)
+
+    wins = (strength > strength.T).sum(axis=1)
+    return CondorcetResult("schulze", parties, wins, wins.argmax(), pairwise, condorcet_winner(pairwise))
+
+
+def copeland_tally(pairwise, parties):
+    """
+    Counts an election with Copeland's method: a party scores one point for each party it beats head to head and half
+    a point for each it ties with. Ties go to the party that comes first.
+
+    Args:
+    - pairwise (np.ndarray): a P x P matrix of how many voters prefer party i to party j.
+    - parties (list): the Party objects the matrix refers to.
+    """
+    _check_pairwise(pairwise, parties)
+    ties = pairwise == pairwise.T
+    np.fill_diagonal(ties, False)
+    scores = (pairwise > pairwise.T).sum(axis=1) + 0.5 * ties.sum(axis=1)
+    return CondorcetResult("copeland", parties, scores, scores.argmax(), pairwise, condorcet_winner(pairwise))
+
+
+def ranked_pairs_tally(pairwise, parties):
+    """
+    Counts an election with Ranked Pairs. Head to head victories are locked in from the largest to the smallest,
+    skipping any that would create a cycle, and the winner is the party no locked victory points at. Each party scores
+    the number of its victories that were locked in.
+
+    Args:
+    - pairwise (np.ndarray): a P x P matrix of how many voters prefer party i to party j.
+    - parties (list): the Party objects the matrix refers to.
+    """
+    _check_pairwise(pairwise, parties)
+    winners, losers = np.nonzero(pairwise > pairwise.T)
+    # Largest number of winning votes first, then the smallest number of losing votes
+    order = np.lexsort((pairwise[losers, winners], -pairwise[winners, losers]))
+
+    locked = [[] for _ in parties]
+    defeated = np.zeros(len(parties), dtype=bool)
+    for winner, loser in zip(winners[order].tolist(), losers[order].tolist()):
+        # Locking winner -> loser creates a cycle if the loser can already reach the winner
+        stack, seen = [loser], {loser}
+        while stack and winner not in seen:
+            for party in locked[stack.pop()]:
+                if party not in seen:
+                    seen.add(party)
+                    stack.append(party)
+        if winner not in seen:
+            locked[winner].append(loser)
+            defeated[loser] = True
+
+    scores = np.array([len(victories) for victories in locked])
+    return CondorcetResult("ranked_pairs", parties, scores, np.flatnonzero(~defeated)[0], pairwise,
+                           condorcet_winner(pairwise))
+
+
+def approval_counts(distances, threshold=None):
+    """
+    Returns the number of voters in a block of distances who approve of each party, a voter approving of every party
+    within the threshold distance. The block is compared a chunk of rows at a time.
+
+    Args:
+    - distances (np.ndarray): an n x P matrix of voter-party distances.
+    - threshold (float): the furthest a party can be from a voter and still be approved of, APPROVAL_THRESHOLD when
+        not given.
+    """
+    # Compared in float32 like the distances themselves, so a party exactly on the threshold is always approved of
+    threshold = np.float32(APPROVAL_THRESHOLD if threshold is None else threshold)
+    counts = np.zeros(distances.shape[1], dtype=np.int64)
+    rows = chunk_rows(distances.shape[1])
+    for start in range(0, len(distances), rows):
+        counts += np.count_nonzero(distances[start:start + rows] <= threshold, axis=0)
+    return counts
+
+
+def closest_approval_counts(rankings, k):
+    """
+    Returns the number of voters in a block of rankings who approve of each party, a voter approving of their k most
+    suitable parties.
+
+    Args:
+    - rankings (np.ndarray): an n x P matrix of each voter's ranking of the parties.
+    - k (int): the number of parties each voter approves of.
+    """
+    if k < 1:
+        raise ValueError("Error! Each voter must approve of at least one party")
+    return np.bincount(rankings[:, :k].ravel(), minlength=rankings.shape[1]).astype(np.int64)
+
+
+def _row_extremes(distances):
+    """Returns the smallest and largest distance in each row of a block of distances."""
+    if distances.shape[1] > 64:
+        return distances.min(axis=1), distances.max(axis=1)
+    # NumPy reduces short rows slowly, so narrow blocks are reduced a column at a time instead
+    best, worst = distances[:, 0].copy(), distances[:, 0].copy()
+    for column in range(1, distances.shape[1]):
+        np.minimum(best, distances[:, column], out=best)
+        np.maximum(worst, distances[:, column], out=worst)
+    return best, worst
+
+
+def score_counts(distances, max_score=SCORE_RANGE):
+    """
+    Returns the total score each party receives from a block of distances. Every voter gives their most suitable party
+    max_score points, their least suitable none, and every other party a share in proportion to where it lies between
+    the two, rounded to a whole number. A voter who is equally far from every party gives them all max_score.
+
+    Args:
+    - distances (np.ndarray): an n x P matrix of voter-party distances.
+    - max_score (int): the most points a voter can give a party.
+    """
+    if max_score < 1:
+        raise ValueError("Error! The highest score must be at least 1")
+
+    counts = np.zeros(distances.shape[1], dtype=np.int64)
+    rows = chunk_rows(distances.shape[1])
+    for start in range(0, len(distances), rows):
+        chunk = distances[start:start + rows]
+        best, worst = _row_extremes(chunk)
+        spread = worst - best
+        scale = np.divide(np.float32(max_score), spread, out=np.zeros_like(spread), where=spread > 0)
+
+        scores = np.subtract(worst[:, None], chunk)
+        scores *= scale[:, None]
+        scores[spread == 0] = max_score
+        np.rint(scores, out=scores)
+        # Summed in float64, which holds whole numbers exactly, to avoid an int64 copy of the chunk
+        counts += scores.sum(axis=0, dtype=np.float64).astype(np.int64)
+    return counts
+
+
+def borda_counts(rankings):
+    """
+    Returns the Borda points each party receives from a block of rankings. A voter gives P - 1 points to their most
+    suitable party, P - 2 to the next and so on down to none for their least suitable.
+
+    Args:
+    - rankings (np.ndarray): an n x P matrix of each voter's ranking of the parties.
+    """
+    nof_parties = rankings.shape[1]
+    counts = np.zeros(nof_parties, dtype=np.int64)
+    for position in range(nof_parties - 1):
+        counts += (nof_parties - 1 - position) * np.bincount(rankings[:, position], minlength=nof_parties)
+    return counts
+
+
+def _check_parties(parties):
+    if not len(parties):
+        raise ValueError("Error! Cannot count an election without any parties")
+
+
+def approval_tally(parties, distances=None, rankings=None, threshold=None, k=None):
+    """
+    Counts an election with approval voting: every voter approves of each party within a threshold distance, or of
+    their k most suitable parties, and the party with the most approvals wins. Ties go to the party that comes first.
+
+    Args:
+    - parties (list): the Party objects being counted.
+    - distances (np.ndarray): the voters x parties distance matrix, needed when approving by threshold.
+    - rankings (np.ndarray): each voter's ranking of the parties, needed when approving the k closest.
+    - threshold (float): the furthest a party can be from a voter and still be approved of, APPROVAL_THRESHOLD when
+        neither threshold nor k is given.
+    - k (int): the number of parties each voter approves of.
+    """
+    _check_parties(parties)
+    if threshold is not None and k is not None:
+        raise ValueError("Error! Approve either by threshold or by the k closest parties, not both")
+    counts = closest_approval_counts(rankings, k) if k is not None else approval_counts(distances, threshold)
+    return ElectionResult("approval", parties, counts, counts.argmax())
+
+
+def score_tally(distances, parties, max_score=SCORE_RANGE):
+    """
+    Counts an election with score (range) voting, see score_counts. The party with the highest total score wins, with
+    ties going to the party that comes first.
+
+    Args:
+    - distances (np.ndarray): the voters x parties distance matrix.
+    - parties (list): the Party objects the distances refer to.
+    - max_score (int): the most points a voter can give a party.
+    """
+    _check_parties(parties)
+    counts = score_counts(distances, max_score)
+    return ElectionResult("score", parties, counts, counts.argmax())
+
+
+def borda_tally(rankings, parties):
+    """
+    Counts an election with the Borda count, see borda_counts. The party with the most points wins, with ties going to
+    the party that comes first.
+
+    Args:
+    - rankings (np.ndarray): each voter's ranking of the parties.
+    - parties (list): the Party objects the rankings refer to.
+    """
+    _check_parties(parties)
+    counts = borda_counts(rankings)
+    return ElectionResult("borda", parties, counts, counts.argmax())
+
+
+class StreamingTally:
+    """
+    Running tallies that chunks of voters are folded into one at a time, so an election can be counted without ever
+    holding every voter. Only methods whose tallies add up across chunks can be counted this way: First Past The Post
+    from the first preference counts, the Condorcet methods from the pairwise matrix, and approval, score and Borda
+    from their running totals.
+
+    Attributes:
+    - parties (list): the Party objects being counted.
+    - counts (np.ndarray): the number of first preferences each party has received so far.
+    - pairwise (np.ndarray): the pairwise preference matrix so far, or None when no Condorcet method was asked for.
+    - totals (dict): the approvals, score or Borda points each party has received so far, by method.
+    - options (dict): the options of the approval and score methods, see approval_tally and score_tally.
+    - nof_voters (int): the number of voters folded in so far.
+
+    Methods:
+    - add(distances): Folds a chunk of voters into the tallies.
+    - add_rankings(rankings): Folds a chunk of ranked ballots into the tallies.
+    - result(method): Returns the provisional result of a voting method.
+    """
+
+    CONDORCET_TALLIES = {"schulze": schulze_tally, "copeland": copeland_tally, "ranked_pairs": ranked_pairs_tally}
+    TOTALLED_METHODS = ("approval", "score", "borda")
+
+    def __init__(self, parties, methods=("fptp",), threshold=None, k=None, max_score=SCORE_RANGE):
+        """
+        Initializes empty tallies.
+
+        Args:
+        - parties (list): the Party objects being counted.
+        - methods (tuple): the names of the voting methods the tallies will be asked for.
+        - threshold (float): the approval threshold, see approval_tally.
+        - k (int): the number of closest parties each voter approves of, see approval_tally.
+        - max_score (int): the most points a voter can give a party, see score_tally.
+        """
+        unknown = set(methods) - {"fptp"} - set(self.CONDORCET_TALLIES) - set(self.TOTALLED_METHODS)
+        if unknown:
+            raise ValueError(f"Error! Cannot count {', '.join(sorted(unknown))} from streamed voters")
+        _check_parties(parties)
+        if threshold is not None and k is not None:
+            raise ValueError("Error! Approve either by threshold or by the k closest parties, not both")
+
+        self.parties = list(parties)
+        self.counts = np.zeros(len(parties), dtype=np.int64)
+        self.pairwise = None
+        if any(method in self.CONDORCET_TALLIES for method in methods):
+            self.pairwise = np.zeros((len(parties), len(parties)), dtype=np.int64)
+        self.totals = {method: np.zeros(len(parties), dtype=np.int64) for method in self.TOTALLED_METHODS
+                       if method in methods}
+        self.options = {"threshold": threshold, "k": k, "max_score": max_score}
+        self.nof_voters = 0
+
+    def add(self, distances):
+        """
+        Folds a chunk of voters into the tallies.
+
+        Args:
+        - distances (np.ndarray): the n x P matrix of distances between the chunk's voters and the parties.
+        """
+        self.counts += np.bincount(distances.argmin(axis=1), minlength=len(self.parties))
+        if self.pairwise is not None:
+            self.pairwise += pairwise_counts(distances)
+
+        rankings = None
+        if "borda" in self.totals or ("approval" in self.totals and self.options["k"] is not None):
+            rankings = rank_distances(distances)
+        if "approval" in self.totals:
+            if self.options["k"] is not None:
+                self.totals["approval"] += closest_approval_counts(rankings, self.options["k"])
+            else:
+                self.totals["approval"] += approval_counts(distances, self.options["threshold"])
+        if "score" in self.totals:
+            self.totals["score"] += score_counts(distances, self.options["max_score"])
+        if "borda" in self.totals:
+            self.totals["borda"] += borda_counts(rankings)
+        self.nof_voters += len(distances)
+
+    def add_rankings(self, rankings):
+        """
+        Folds a chunk of ranked ballots into the tallies, for when voters' rankings are known but not their ideologies.
+        Score voting and approval by threshold need distances, so they cannot be counted from rankings.
+
+        Args:
+        - rankings (np.ndarray): an n x P matrix of each voter's ranking of the parties, from most to least suitable.
+        """
+        if "score" in self.totals or ("approval" in self.totals and self.options["k"] is None):
+            raise ValueError("Error! Score voting and approval by threshold cannot be counted from rankings")
+
+        nof_parties = len(self.parties)
+        self.counts += np.bincount(rankings[:, 0], minlength=nof_parties)
+        if self.pairwise is not None:
+            # A party's position on a ballot orders the parties just as its distance from the voter would
+            positions = np.empty(rankings.shape, dtype=np.int32)
+            positions[np.arange(len(rankings))[:, None], rankings] = np.arange(nof_parties, dtype=np.int32)
+            self.pairwise += pairwise_counts(positions)
+        if "approval" in self.totals:
+            self.totals["approval"] += closest_approval_counts(rankings, self.options["k"])
+        if "borda" in self.totals:
+            self.totals["borda"] += borda_counts(rankings)
+        self.nof_voters += len(rankings)
+
+    def result(self, method="fptp"):
+        """
+        Returns the result of a voting method over the voters folded in so far.
+
+        Args:
+        - method (str): the name of the voting method.
+        """
+        if method == "fptp":
+            return fptp_from_counts(self.counts, self.parties)
+        if method in self.totals:
+            return ElectionResult(method, self.parties, self.totals[method], self.totals[method].argmax())
+        if method not in self.CONDORCET_TALLIES or self.pairwise is None:
+            raise ValueError(f"Error! {method!r} was not tallied")
+        return self.CONDORCET_TALLIES[method](self.pairwise, self.parties)
+
+
+class IncrementalTally:
+    """
+    Each voter's most suitable party, the distance to it and the first preference counts, kept up to date as voters and
+    parties are added and removed instead of being worked out again from scratch.
+
+    The results always match a full recount, including which party wins a tie: ties go to the party that comes first.
+
+    Attributes:
+    - preferred (np.ndarray): the index of each voter's most suitable party.
+    - best (np.ndarray): the distance between each voter and their most suitable party.
+    - counts (np.ndarray): the number of voters whose most suitable party is each party.
+
+    Methods:
+    - add_voter(ideology, positions): Adds a voter, in O(parties).
+    - remove_voter(position): Removes a voter by moving the last voter into its place, in O(1).
+    - add_party(ideology, position): Adds a party after the existing ones, in O(voters).
+    - remove_party(index, ideology, positions): Removes a party by moving the last party into its place, in
+        O(voters + former supporters x parties).
+    """
+
+    def __init__(self, preferred, best, nof_parties):
+        """
+        Initializes the tallies from each voter's most suitable party and the distance to it.
+
+        Args:
+        - preferred (np.ndarray): the index of each voter's most suitable party.
+        - best (np.ndarray): the distance between each voter and their most suitable party.
+        - nof_parties (int): the number of parties.
+        """
+        self._preferred = np.asarray(preferred, dtype=np.int32)
+        self._best = np.asarray(best, dtype=np.float32)
+        self.size = len(self._preferred)
+        self.counts = np.bincount(self._preferred, minlength=nof_parties)
+
+    @classmethod
+    def from_ideology(cls, ideology, positions, chunk_size=None):
+        """
+        Works out the tallies for an electorate from scratch.
+
+        Args:
+        - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+        - positions (np.ndarray): a P x 4 matrix of party positions.
+        - chunk_size (int): the number of voters to work on at once.
+        """
+        return cls(*find_nearest_parties(ideology, positions, chunk_size), len(positions))
+
+    @property
+    def preferred(self):
+        return self._preferred[:self.size]
+
+    @property
+    def best(self):
+        return self._best[:self.size]
+
+    def add_voter(self, ideology, positions):
+        """
+        Adds a voter after the existing ones.
+
+        Args:
+        - ideology (np.ndarray): a 1 x 4 matrix of the voter's ideology.
+        - positions (np.ndarray): a P x 4 matrix of party positions.
+        """
+        distances = l1_distances(ideology, positions)[0]
+        if self.size == len(self._preferred):
+            # Grows geometrically so that adding voters one at a time stays amortised O(1)
+            capacity = max(16, 2 * self.size)
+            self._preferred = np.resize(self._preferred, capacity)
+            self._best = np.resize(self._best, capacity)
+        self._preferred[self.size] = distances.argmin()
+        self._best[self.size] = distances[self._preferred[self.size]]
+        self.counts[self._preferred[self.size]] += 1
+        self.size += 1
+
+    def remove_voter(self, position):
+        """
+        Removes a voter by moving the last voter into its place, matching Electorate.remove.
+
+        Args:
+        - position (int): the row of the voter.
+        """
+        self.counts[self._preferred[position]] -= 1
+        self.size -= 1
+        self._preferred[position] = self._preferred[self.size]
+        self._best[position] = self._best[self.size]
+
+    def add_party(self, ideology, position):
+        """
+        Adds a party after the existing ones. Only the distance to the new party is worked out, and only the voters it
+        is strictly closer to than their current party move over, as earlier parties win ties.
+
+        Args:
+        - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+        - position (np.ndarray): a 1 x 4 matrix of the new party's position.
+        """
+        distances = l1_distances(ideology, position)[:, 0]
+        captured = distances < self.best
+        index = len(self.counts)
+
+        self.counts = np.append(self.counts, np.count_nonzero(captured))
+        self.counts[:index] -= np.bincount(self.preferred[captured], minlength=index)
+        self._preferred = np.where(captured, index, self.preferred).astype(np.int32)
+        self._best = np.where(captured, distances, self.best)
+
+    def remove_party(self, index, ideology, positions):
+        """
+        Removes a party whose place has been taken by the last party, matching Election.delete_party. Only the removed
+        party's former supporters are compared against every remaining party.
+
+        Args:
+        - index (int): the index of the removed party.
+        - ideology (np.ndarray): an N x 4 matrix of voter ideologies.
+        - positions (np.ndarray): the P x 4 matrix of party positions after the removal.
+        """
+        previous = self.preferred
+        preferred, best = previous.copy(), self.best.copy()
+
+        moved = len(positions)
+        if index < moved:
+            # The party that was last now sits at index, so it wins ties against any party after index
+            distances = l1_distances(ideology, positions[index:index + 1])[:, 0]
+            preferred[(previous == moved) | ((previous > index) & (distances == best))] = index
+
+        orphans = np.flatnonzero(previous == index)
+        if len(orphans):
+            preferred[orphans], best[orphans] = find_nearest_parties(ideology[orphans], positions)
+
+        self._preferred, self._best = preferred, best
+        self.counts = np.bincount(preferred, minlength=len(positions))
@@ -1,6 +1,29 @@
-from ClassHandler import *
+import argparse
+import asyncio
+import json
 import os, sys
 
+import numpy as np
+
+try:
+    from .BatchHandler import disagreement_rates, run_batch
+    from .BenchmarkHandler import MAX_WORK, PARTY_COUNTS, VOTER_COUNTS, compare_benchmarks, run_benchmarks
+    from .ClassHandler import *
+    from .ConstituencyHandler import Parliament
+    from .ElectorateHandler import IDEOLOGY_AXES
+    from .IngestHandler import BallotIngester, BALLOT_KINDS
+    from .LogHandler import LOG_LEVELS, PROFILER, set_log_level
+    from .SweepHandler import ELECTORATE_PARAMETERS, PARAMETER_RANGES, Sweep
+except ImportError:
+    from BatchHandler import disagreement_rates, run_batch
+    from BenchmarkHandler import MAX_WORK, PARTY_COUNTS, VOTER_COUNTS, compare_benchmarks, run_benchmarks
+    from ClassHandler import *
+    from ConstituencyHandler import Parliament
+    from ElectorateHandler import IDEOLOGY_AXES
+    from IngestHandler import BallotIngester, BALLOT_KINDS
+    from LogHandler import LOG_LEVELS, PROFILER, set_log_level
+    from SweepHandler import ELECTORATE_PARAMETERS, PARAMETER_RANGES, Sweep
+
 
 def init():
     print("""-----------------
@@ -27,6 +50,8 @@ def main_menu():
                     exit_program()
                 case "logging":
                     logging_menu(menu)
+                case "simulate" | "batch" | "parliament" | "bench" | "ingest" | "sweep":
+                    run_command(menu)
                 case _:
                     print("Invalid command. Type 'help' for a list of commands.")
         except KeyboardInterrupt:
@@ -34,29 +59,47 @@ def main_menu():
 
 
 def logging_menu(menu):
-    """Handles changing the logging level."""
-    if menu[1] == "critical":
-        print("Logging level set to CRITICAL.")
-        return "CRITICAL"
-    elif menu[1] == "error":
-        print("Logging level set to ERROR.")
-        return "ERROR"
-    elif menu[1] == "warning":
-        print("Logging level set to WARNING.")
-        return "WARNING"
-    elif menu[1] == "info":
-        print("Logging level set to INFO.")
-        return "INFO"
-    elif menu[1] == "debug":
-        print("Logging level set to DEBUG.")
-        return "DEBUG"
-    elif menu[1] == "notset":
-        print("Logging level set to NOTSET.")
-        return "NOTSET"
-    else:
+    """
+    Handles changing the logging level and the profiling of each phase of a run. Returns the new logging level, or
+    None if the level was not changed.
+
+    Args:
+    - menu (list): the command and its arguments, e.g. ["logging", "debug"] or ["logging", "profile", "show"].
+    """
+    if len(menu) < 2:
         print("Invalid logging level.")
+        return None
+
+    if menu[1] == "profile":
+        action = menu[2] if len(menu) > 2 else "show"
+        match action:
+            case "on":
+                PROFILER.enable()
+                print("Profiling enabled.")
+            case "off":
+                PROFILER.disable()
+                print("Profiling disabled.")
+            case "reset":
+                PROFILER.reset()
+                print("Profile cleared.")
+            case "show":
+                print(PROFILER.table())
+            case "json":
+                try:
+                    print(PROFILER.to_json(menu[3] if len(menu) > 3 else None))
+                except OSError as error:
+                    print(f"Error! Could not write the profile: {error}")
+            case _:
+                print("Invalid profile command.")
+        return None
 
-    print("NOTE: This feature is not yet implemented.")
+    try:
+        set_log_level(menu[1])
+    except ValueError:
+        print("Invalid logging level.")
+        return None
+    print(f"Logging level set to {menu[1].upper()}.")
+    return menu[1].upper()
 
 
 def help_menu(command):
@@ -65,8 +108,24 @@ def help_menu(command):
         case "help":
             print("""Available commands:
 logging [level] - Sets the logging level
+logging profile [on|off|show|json|reset] - Times each phase of a run
+simulate [options] - Generates and counts an election
+batch [options] - Runs many independent elections
+parliament [options] - Simulates a parliament of single seat districts
+bench [options] - Times each phase of an election over a range of sizes
+ingest [files] [options] - Counts ballots from files or a local socket as they arrive
+sweep [options] - Maps how the winner changes as a party or the voters move
 help [command] - Displays help for a command
-exit - Exits the program""")
+exit - Exits the program
+
+Every command except help, exit and logging can also be run directly, e.g.
+    python main.py simulate --voters 100000 --parties 5 --method fptp --seed 1 --out results.json""")
+
+        case "simulate" | "batch" | "parliament" | "bench" | "ingest" | "sweep":
+            try:
+                build_parser().parse_args([command, "--help"])
+            except SystemExit:
+                pass
 
         case "exit":
             print("exit - Exits the program")
@@ -79,12 +138,428 @@ exit - Exits the program""")
         warning
         info
         debug
-        notset""")
+        notset
+logging profile [on|off|show|json|reset] - Times each phase of a run
+    on - Starts timing corpus load, generation, distances, tally and render
+    off - Stops timing, keeping what was timed
+    show - Displays the timings and counters as a table
+    json [path] - Displays the timings and counters as JSON, writing them to path if given
+    reset - Forgets the timings and counters""")
 
         case _:
             print("No help available for this command, or command is not available.")
 
 
+def build_parser():
+    """Builds the parser for the non-interactive commands."""
+    parser = argparse.ArgumentParser(prog="main.py", description="Simulates elections under different voting methods. "
+                                     "Run without a command for the interactive menu.", exit_on_error=False)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", help="a JSON file of default options, e.g. {\"voters\": 1000, \"first_names\": "
+                                         "\"names.txt\"}. Options given on the command line take precedence")
+    common.add_argument("--seed", type=int, help="the random seed, so runs can be repeated")
+    common.add_argument("--out", help="the file to write the JSON results to (default standard output)")
+    common.add_argument("--first-names", help="the path to the first names file")
+    common.add_argument("--last-names", help="the path to the last names file")
+    common.add_argument("--party-names", help="the path to the party names file")
+    common.add_argument("--log-level", choices=list(LOG_LEVELS), help="log progress to standard error at this level")
+    common.add_argument("--profile", action="store_true", default=None,
+                        help="add the time taken by each phase and counts of the work done to the results")
+
+    single = argparse.ArgumentParser(add_help=False, parents=[common])
+    single.add_argument("--parties", type=int, help="the number of parties (default 5)")
+
+    simulate = commands.add_parser("simulate", parents=[single], help="generate and count an election")
+    simulate.add_argument("--voters", type=int, help="the number of voters (default 1000)")
+    simulate.add_argument("--method", action="append", choices=list(VOTING_METHODS),
+                          help="a voting method to count with, may be given more than once (default fptp)")
+    simulate.add_argument("--seats", type=int, help="the number of seats for stv (default 1)")
+    simulate.add_argument("--threshold", type=float, help="the distance within which voters approve of a party for "
+                                                          "approval (default 1.0)")
+    simulate.add_argument("--approvals", type=int, dest="k",
+                          help="have voters approve of this many of their closest parties for approval instead")
+    simulate.add_argument("--max-score", type=int, help="the highest score a voter can give for score (default 10)")
+    simulate.add_argument("--stream", action="store_true", default=None,
+                          help="generate and count voters in chunks without storing them")
+    simulate.add_argument("--chunk-size", type=int, help="the number of voters per chunk when streaming")
+    simulate.add_argument("--charts", help="a directory to draw a pie chart of each method's results to")
+    simulate.add_argument("--save", help="a file to save the generated election to, see Election.save")
+    simulate.add_argument("--load", help="a saved election to count instead of generating one")
+
+    batch = commands.add_parser("batch", parents=[single], help="run many independent elections")
+    batch.add_argument("--runs", type=int, help="the number of elections to run (default 100)")
+    batch.add_argument("--voters", type=int, help="the number of voters in each election (default 1000)")
+    batch.add_argument("--method", action="append", choices=[method for method in VOTING_METHODS if method != "stv"],
+                       help="a voting method to count with, may be given more than once (default fptp)")
+    batch.add_argument("--workers", type=int, help="the number of processes to use (default all cores)")
+
+    parliament = commands.add_parser("parliament", parents=[single], help="simulate a parliament of districts")
+    parliament.add_argument("--districts", type=int, help="the number of districts (default 650)")
+    parliament.add_argument("--voters", type=int, help="the number of voters in each district (default 1000)")
+    parliament.add_argument("--workers", type=int, help="the number of processes to use (default all cores)")
+
+    ingest = commands.add_parser("ingest", parents=[single], help="count ballots from files or a local socket")
+    ingest.add_argument("ballots", nargs="*", help="files of ballots, one per line")
+    ingest.add_argument("--kind", choices=BALLOT_KINDS,
+                        help="ideology ballots (\"0.1,0.5,0.9,0.3\") or rankings of the parties by index or ID "
+                             "(\"2,0,1\") (default ideology)")
+    ingest.add_argument("--load", help="a saved election whose parties the ballots are for, instead of generating "
+                                       "--parties parties")
+    ingest.add_argument("--method", action="append",
+                        choices=[method for method in VOTING_METHODS if method not in ("irv", "stv")],
+                        help="a voting method to count with, may be given more than once (default fptp)")
+    ingest.add_argument("--threshold", type=float, help="the distance within which voters approve of a party")
+    ingest.add_argument("--approvals", type=int, dest="k", help="the number of closest parties voters approve of")
+    ingest.add_argument("--max-score", type=int, help="the highest score a voter can give for score")
+    ingest.add_argument("--listen", help="also count ballots sent to HOST:PORT, or to a Unix socket at a path")
+    ingest.add_argument("--duration", type=float, help="stop listening after this many seconds (default until "
+                                                       "interrupted)")
+    ingest.add_argument("--snapshot-every", type=float,
+                        help="write the provisional winners to standard error this often, in seconds")
+
+    sweep = commands.add_parser("sweep", parents=[single], help="map how the winner changes as a party or the voters "
+                                                                "move")
+    sweep.add_argument("--voters", type=int, help="the number of voters (default 1000)")
+    sweep.add_argument("--load", help="a saved election to sweep instead of generating one")
+    sweep.add_argument("--method", action="append", choices=list(VOTING_METHODS),
+                       help="a voting method to count with, may be given more than once (default fptp)")
+    sweep.add_argument("--seats", type=int, help="the number of seats for stv (default 1)")
+    sweep.add_argument("--threshold", type=float, help="the distance within which voters approve of a party")
+    sweep.add_argument("--approvals", type=int, dest="k", help="the number of closest parties voters approve of")
+    sweep.add_argument("--max-score", type=int, help="the highest score a voter can give for score")
+    sweep.add_argument("--party", help="the index or ID of the party to move (default 0)")
+    sweep.add_argument("--electorate", choices=list(IDEOLOGY_AXES),
+                       help="shift and spread the voters along this axis instead of moving a party")
+    sweep.add_argument("--axis", action="append", choices=list(PARAMETER_RANGES),
+                       help="a parameter to sweep, may be given twice for a map: an ideology axis of the party, or "
+                            "shift or spread of the voters (default economic, or shift with --electorate)")
+    sweep.add_argument("--steps", type=int, help="the number of values of each parameter (default 21)")
+    sweep.add_argument("--range", type=float, nargs=2, metavar=("LOW", "HIGH"),
+                       help="the range of every parameter swept (default 0 to 1 for the party, -0.5 to 0.5 for "
+                            "shift and 0 to 2 for spread)")
+    sweep.add_argument("--workers", type=int, help="the number of processes to use (default all cores)")
+    sweep.add_argument("--map", help="a PNG or SVG file to draw the map of the first method to")
+
+    bench = commands.add_parser("bench", parents=[common], help="time each phase of an election over a range of sizes")
+    bench.add_argument("--voters", type=int, action="append",
+                       help="a number of voters to time, may be given more than once (default 1000 to 10000000)")
+    bench.add_argument("--parties", type=int, action="append",
+                       help="a number of parties to time, may be given more than once (default 2 to 1000)")
+    bench.add_argument("--method", action="append", choices=list(VOTING_METHODS),
+                       help="a voting method to time, may be given more than once (default all)")
+    bench.add_argument("--repeat", type=int, help="the number of timed runs of each phase (default 3)")
+    bench.add_argument("--max-work", type=int, help=f"skip methods that would take more voter-party cells of work "
+                                                    f"than this (default {MAX_WORK})")
+    bench.add_argument("--baseline", help="the JSON results of an earlier run to report regressions against")
+    return parser
+
+
+def config_actions():
+    """
+    Returns the options of every command that can be set in a config file, as a dictionary of command name to a
+    dictionary of option name to argparse action.
+    """
+    parsers = next(action for action in build_parser()._actions if isinstance(action, argparse._SubParsersAction))
+    return {name: {action.dest: action for action in parser._actions if action.dest not in ("help", "config")}
+            for name, parser in parsers.choices.items()}
+
+
+def convert_option(action, value):
+    """
+    Converts one value from a config file as the command line would convert the same text, raising ValueError if it
+    is not a valid value of the option.
+
+    Args:
+    - action (argparse.Action): the option the value is for.
+    - value: the value read from the config file.
+    """
+    if action.nargs == 0:
+        if not isinstance(value, bool):
+            raise ValueError("must be true or false")
+        return value
+    if action.type is None:
+        # text options such as paths and party IDs, where a whole number is read as its digits
+        if isinstance(value, bool) or not isinstance(value, (str, int)):
+            raise ValueError("must be text")
+        value = str(value)
+    elif isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError("must be a number")
+    else:
+        try:
+            value = action.type(str(value))
+        except ValueError:
+            raise ValueError(f"must be {'a whole number' if action.type is int else 'a number'}") from None
+    if action.choices is not None and value not in action.choices:
+        raise ValueError(f"must be one of {', '.join(map(str, action.choices))}")
+    return value
+
+
+def check_config(config, command):
+    """
+    Checks the options read from a config file and converts them to the types the command line gives, so a wrongly
+    typed value is reported before the command runs. Options of other commands are kept as they are, so one file can
+    be shared between commands.
+
+    Args:
+    - config (dict): the options read from the config file, keyed by their names with underscores.
+    - command (str): the command being run.
+    """
+    actions = config_actions()
+    checked = {}
+    for key, value in config.items():
+        if not any(key in options for options in actions.values()):
+            raise ValueError(f"Error! {key} is not an option of any command")
+        action = actions[command].get(key)
+        if action is None:
+            checked[key] = value
+            continue
+        many = isinstance(action, argparse._AppendAction) or action.nargs not in (None, "?", 0)
+        try:
+            if not many:
+                checked[key] = convert_option(action, value)
+            elif isinstance(action.nargs, int) and not (isinstance(value, list) and len(value) == action.nargs):
+                raise ValueError(f"must be a list of {action.nargs} values")
+            else:
+                values = value if isinstance(value, list) else [value]
+                checked[key] = [convert_option(action, item) for item in values]
+        except ValueError as error:
+            raise ValueError(f"Error! The config option {key} cannot be {json.dumps(value)}: {error}") from None
+    return checked
+
+
+def load_options(arguments):
+    """
+    Merges the options given on the command line over those in the config file and the defaults.
+
+    Args:
+    - arguments (argparse.Namespace): the parsed command line.
+    """
+    if arguments.command == "bench":
+        options = {"voters": list(VOTER_COUNTS), "parties": list(PARTY_COUNTS), "method": list(VOTING_METHODS),
+                   "repeat": 3, "max_work": MAX_WORK, "first_names": FIRST_NAME_PATH, "last_names": LAST_NAME_PATH,
+                   "party_names": PARTY_NAME_PATH}
+    else:
+        options = {"parties": 5, "voters": 1000, "method": ["fptp"], "seats": 1, "stream": False, "chunk_size": None,
+                   "runs": 100, "workers": None, "districts": 650, "first_names": FIRST_NAME_PATH,
+                   "last_names": LAST_NAME_PATH, "party_names": PARTY_NAME_PATH, "kind": "ideology", "party": "0",
+                   "steps": 21}
+    if arguments.config:
+        with open(arguments.config, "r") as f:
+            config = {key.replace("-", "_"): value for key, value in json.load(f).items()}
+        options.update(check_config(config, arguments.command))
+    options.update({key: value for key, value in vars(arguments).items() if value is not None})
+    for key in ("method", "axis") + (("voters", "parties") if arguments.command == "bench" else ()):
+        if key in options and not isinstance(options[key], list):
+            options[key] = [options[key]]
+    return options
+
+
+def simulate_command(options):
+    """Generates and counts an election, returning the results of each voting method."""
+    paths = (options["first_names"], options["last_names"], options["party_names"])
+    method_options = {name: options[name] for name in ("seats", "threshold", "k", "max_score")
+                      if options.get(name) is not None}
+    if options["stream"] and (options.get("load") or options.get("save")):
+        raise ValueError("Error! Streamed voters are never stored, so they cannot be loaded or saved")
+
+    if options.get("load"):
+        election = Election.load(options["load"], options.get("seed"))
+    else:
+        election = Election(prearrange_list=True, seed=options.get("seed"))
+
+    if options["stream"]:
+        method_options.pop("seats", None)
+        results = election.stream_election(options["voters"], options["parties"], tuple(options["method"]),
+                                           options["chunk_size"] or 1 << 16, *paths, **method_options)
+    else:
+        if not options.get("load"):
+            election.prepare_election(options["voters"], options["parties"], *paths)
+        results = election.compare_methods(options["method"], **method_options).results
+        if options.get("save"):
+            election.save(options["save"])
+    output = {"results": {method: result.as_dict() for method, result in results.items()}}
+    if options.get("charts"):
+        os.makedirs(options["charts"], exist_ok=True)
+        charts = [election.generate_pie_charts(result, os.path.join(options["charts"], f"{method}.png"), True)
+                  for method, result in results.items()]
+        output["charts"] = [chart.result() for chart in charts]
+    return output
+
+
+def batch_command(options):
+    """Runs many independent elections, returning each run's summary and how often the methods disagreed."""
+    summaries = run_batch(options["runs"], options["voters"], options["parties"], tuple(options["method"]),
+                          options.get("seed"), options["workers"],
+                          (options["first_names"], options["last_names"], options["party_names"]))
+    return {"disagreement_rates": disagreement_rates(summaries), "runs": summaries}
+
+
+def parliament_command(options):
+    """Simulates a parliament, returning the seats won under each allocation method."""
+    parliament = Parliament.simulate(options["districts"], options["voters"], options["parties"], options.get("seed"),
+                                     options["workers"],
+                                     (options["first_names"], options["last_names"], options["party_names"]))
+    return {"results": {result.method: result.as_dict() for result in (parliament.FPTP_seats(),
+                                                                       parliament.DHondt_seats(),
+                                                                       parliament.SainteLague_seats())}}
+
+
+def _listen_address(address):
+    """Returns the serve arguments for a --listen address: HOST:PORT, or the path of a Unix socket."""
+    host, _, port = address.rpartition(":")
+    if port.isdigit():
+        return {"host": host or "127.0.0.1", "port": int(port)}
+    return {"path": address}
+
+
+def ingest_command(options):
+    """Counts ballots from files, and from a socket while listening, returning the results of each voting method."""
+    if options.get("load"):
+        parties = Election.load(options["load"]).parties
+    else:
+        election = Election(prearrange_list=True, seed=options.get("seed"))
+        election.prepare_election(0, options["parties"], options["first_names"], options["last_names"],
+                                  options["party_names"])
+        parties = election.parties
+    method_options = {name: options[name] for name in ("threshold", "k", "max_score") if options.get(name) is not None}
+    ingester = BallotIngester(parties, tuple(options["method"]), options["kind"], **method_options)
+
+    def report():
+        winners = {method: result.winner.id if result else None for method, result in ingester.snapshot().items()}
+        print(json.dumps({"ballots": ingester.tally.nof_voters, "rejected": ingester.rejected, "winners": winners}),
+              file=sys.stderr, flush=True)
+
+    async def snapshots():
+        while True:
+            await asyncio.sleep(options["snapshot_every"])
+            report()
+
+    async def listen():
+        server = await ingester.serve(**_listen_address(options["listen"]))
+        print(json.dumps({"listening": [str(socket.getsockname()) for socket in server.sockets]}), file=sys.stderr,
+              flush=True)
+        async with server:
+            if options.get("duration"):
+                await asyncio.sleep(options["duration"])
+            else:
+                await server.serve_forever()
+
+    async def run():
+        reporter = asyncio.create_task(snapshots()) if options.get("snapshot_every") else None
+        try:
+            await asyncio.gather(*(ingester.ingest_file(path) for path in options["ballots"]),
+                                 *([listen()] if options.get("listen") else []))
+        finally:
+            await ingester.close()
+            if reporter:
+                reporter.cancel()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        # Whatever was counted before the interruption is still reported
+        pass
+
+    results = {method: result.as_dict() for method, result in ingester.snapshot().items() if result is not None}
+    return {"ballots": ingester.tally.nof_voters, "rejected": ingester.rejected, "results": results}
+
+
+def sweep_command(options):
+    """Counts an election over a grid of positions of a party or shapes of the electorate, returning the maps."""
+    if options.get("load"):
+        election = Election.load(options["load"], options.get("seed"))
+    else:
+        election = Election(prearrange_list=True, seed=options.get("seed"))
+        election.prepare_election(options["voters"], options["parties"], options["first_names"],
+                                  options["last_names"], options["party_names"])
+    method_options = {name: options[name] for name in ("seats", "threshold", "k", "max_score")
+                      if options.get(name) is not None}
+    sweep = Sweep.from_election(election, tuple(options["method"]), **method_options)
+
+    axes = options.get("axis") or ["shift" if options.get("electorate") else "economic"]
+    if any((axis in ELECTORATE_PARAMETERS) != bool(options.get("electorate")) for axis in axes):
+        raise ValueError("Error! A party is swept along ideology axes and the electorate by shift and spread")
+    grid = {axis: np.linspace(*(options.get("range") or PARAMETER_RANGES[axis]), options["steps"]) for axis in axes}
+
+    if options.get("electorate"):
+        result = sweep.shift_electorate(options["electorate"], grid, options["workers"])
+    else:
+        party = str(options["party"])
+        result = sweep.move_party(int(party) if party.isdigit() else party, grid, options["workers"])
+
+    output = {"sweep": result.as_dict()}
+    if options.get("map"):
+        output["map"] = result.render(options["method"][0], options["map"])
+    return output
+
+
+def bench_command(options):
+    """Times each phase of an election over a range of sizes, reporting regressions against a baseline if given."""
+    output = run_benchmarks(tuple(options["voters"]), tuple(options["parties"]), tuple(options["method"]),
+                            options["repeat"], options.get("seed") or 0, options["max_work"],
+                            (options["first_names"], options["last_names"], options["party_names"]), sys.stderr)
+    if options.get("baseline"):
+        with open(options["baseline"], "r") as f:
+            output["regressions"] = compare_benchmarks(json.load(f), output)
+    return output
+
+
+def run_command(argv):
+    """
+    Runs a non-interactive command and writes its results as JSON. Returns the exit status: 0 on success, 1 if the
+    command failed and 2 if it was used incorrectly.
+
+    Args:
+    - argv (list): the command and its options, e.g. ["simulate", "--voters", "1000"].
+    """
+    try:
+        arguments = build_parser().parse_args(argv)
+        options = load_options(arguments)
+    except (argparse.ArgumentError, OSError, ValueError) as error:
+        print(json.dumps({"error": str(error)}), file=sys.stderr)
+        return 2
+    except SystemExit as exit:
+        # argparse exits after printing --help or a usage error
+        return exit.code
+
+    if options.get("log_level"):
+        set_log_level(options["log_level"])
+    if options.get("profile"):
+        PROFILER.enable()
+
+    commands = {"simulate": simulate_command, "batch": batch_command, "parliament": parliament_command,
+                "bench": bench_command, "ingest": ingest_command, "sweep": sweep_command}
+    try:
+        output = commands[arguments.command](options)
+    except (OSError, ValueError) as error:
+        print(json.dumps({"error": str(error)}), file=sys.stderr)
+        return 1
+    finally:
+        if options.get("profile"):
+            PROFILER.disable()
+
+    if options.get("profile"):
+        output["profile"] = PROFILER.as_dict()
+
+    output["options"] = {key: value for key, value in options.items() if key != "config"}
+    if options.get("out"):
+        with open(options["out"], "w") as f:
+            json.dump(output, f, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+    return 0
+
+
+def main(argv=None):
+    """Runs the interactive menu when no command is given, otherwise runs the command and exits with its status."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        main_menu()
+    sys.exit(run_command(argv))
+
+
 def exit_program():
     """Exits the program."""
     print("\nGoodbye.")
@@ -2,4 +2,4 @@ from ClassHandler import *
 from TerminalHandler import *
 
 if __name__ == '__main__':
-    main_menu()
+    main()
@@ -0,0 +1,23 @@
+import unittest
+from src.BatchHandler import disagreement_rates, run_batch
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_reproducible_across_worker_counts(self):
+        serial = run_batch(6, nof_voters=200, nof_parties=4, methods=("fptp", "irv"), seed=42, workers=1)
+        parallel = run_batch(6, nof_voters=200, nof_parties=4, methods=("fptp", "irv"), seed=42, workers=3)
+        self.assertEqual(serial, parallel)
+        self.assertEqual([summary["run"] for summary in serial], list(range(6)))
+
+    def test_runs_are_independent(self):
+        summaries = run_batch(2, nof_voters=200, nof_parties=4, seed=7, workers=1)
+        self.assertNotEqual(summaries[0]["counts"], summaries[1]["counts"])
+
+    def test_disagreement_rates(self):
+        summaries = [{"winners": {"fptp": 0, "irv": 0}}, {"winners": {"fptp": 1, "irv": 2}}]
+        self.assertEqual(disagreement_rates(summaries), {"fptp/irv": 0.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+from src.BenchmarkHandler import compare_benchmarks, method_work, run_benchmarks
+from src.TerminalHandler import run_command
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_sweep_rows(self):
+        output = run_benchmarks((1000, 2000), (2, 3), ("fptp", "schulze"), repeat=1, max_work=2000 * 3 * 3 - 1)
+        self.assertIn("python", output["environment"])
+        self.assertEqual(len(output["results"]), 2 * 2 * 4)
+
+        phases = {(row["phase"], row["voters"], row["parties"]): row for row in output["results"]}
+        self.assertEqual(phases[("generation", 1000, 2)]["phase"], "generation")
+        self.assertGreater(phases[("generation", 2000, 3)]["peak_bytes"], 0)
+        self.assertGreaterEqual(phases[("assignment", 1000, 3)]["seconds"], 0)
+        self.assertTrue(phases[("schulze", 2000, 3)]["skipped"])
+        self.assertNotIn("skipped", phases[("schulze", 1000, 3)])
+
+    def test_method_work(self):
+        self.assertEqual(method_work("fptp", 10, 4), 10)
+        self.assertEqual(method_work("irv", 10, 4), 40)
+        self.assertEqual(method_work("copeland", 10, 4), 160)
+
+    def test_compare_benchmarks(self):
+        baseline = {"results": [{"phase": "fptp", "voters": 10, "parties": 2, "seconds": 1.0, "peak_bytes": 100},
+                                {"phase": "irv", "voters": 10, "parties": 2, "skipped": True}]}
+        current = {"results": [{"phase": "fptp", "voters": 10, "parties": 2, "seconds": 2.0, "peak_bytes": 110},
+                               {"phase": "irv", "voters": 10, "parties": 2, "seconds": 1.0, "peak_bytes": 1}]}
+        regressions = compare_benchmarks(baseline, current)
+        self.assertEqual([(row["phase"], row["figure"]) for row in regressions], [("fptp", "seconds")])
+        self.assertAlmostEqual(regressions[0]["ratio"], 2.0)
+
+    def test_bench_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            argv = ["bench", "--voters", "500", "--parties", "2", "--parties", "4", "--method", "fptp", "--repeat", "1",
+                    "--out", path]
+            self.assertEqual(run_command(argv), 0)
+            self.assertEqual(run_command(argv[:-1] + [path + ".2", "--baseline", path]), 0)
+            with open(path + ".2", "r") as f:
+                output = json.load(f)
+        self.assertEqual({row["parties"] for row in output["results"]}, {2, 4})
+        self.assertIsInstance(output["regressions"], list)
+
+
+if __name__ == '__main__':
+    unittest.main()
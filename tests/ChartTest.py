@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.ChartHandler import party_colours, render_in_background, render_pie_chart, render_sweep_map
+from src.ClassHandler import Election
+from src.SweepHandler import Sweep
+
+
+class TestChart(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.election = Election(nof_voters=200, nof_parties=30, seed=0)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_render_files(self):
+        result = self.election.count("fptp")
+        png = render_pie_chart(result, os.path.join(self.directory.name, "results.png"))
+        svg = render_in_background(result, os.path.join(self.directory.name, "results.svg")).result()
+        with open(png, "rb") as f:
+            self.assertEqual(f.read(4), b"\x89PNG")
+        with open(svg, "rb") as f:
+            self.assertIn(b"<svg", f.read())
+
+    def test_FPTP_chart_is_kept_and_errors_logged(self):
+        path = os.path.join(self.directory.name, "fptp.png")
+        self.election.FPTP_vote(path)
+        self.assertEqual(self.election.chart.result(), path)
+        with self.assertLogs("VotingMethods.election", "ERROR") as logs:
+            self.election.FPTP_vote(os.path.join(self.directory.name, "missing", "fptp.png"))
+            self.assertIsInstance(self.election.chart.exception(), OSError)
+            # Charts are drawn one at a time, so the next one finishing means the error has been reported
+            self.election.FPTP_vote(path)
+            self.election.chart.result()
+        self.assertIn("Could not draw the chart", logs.output[0])
+
+    def test_render_sweep_maps(self):
+        sweep = Sweep.from_election(self.election, ("fptp",))
+        line = sweep.shift_electorate("economic", {"shift": [-0.1, 0.0, 0.1]})
+        grid = sweep.move_party(0, {"economic": [0.0, 0.5, 1.0], "social": [0.2, 0.8]})
+        for result, name in ((line, "line.png"), (grid, "map.svg")):
+            path = render_sweep_map(result, "fptp", os.path.join(self.directory.name, name))
+            self.assertGreater(os.path.getsize(path), 0)
+        with self.assertRaises(ValueError):
+            render_sweep_map(sweep.move_party(0, {"economic": [0.5], "social": [0.5], "civil": [0.5]}), "fptp",
+                             os.path.join(self.directory.name, "cube.png"))
+
+    def test_palette_covers_every_party(self):
+        self.assertEqual(len(set(party_colours(50))), 50)
+
+    def test_matplotlib_not_imported_by_counting(self):
+        source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+        code = "import sys, ClassHandler; ClassHandler.Election(100, 3).FPTP_vote(); print('matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], cwd=source, capture_output=True, text=True, check=True)
+        self.assertTrue(output.stdout.strip().endswith("False"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from src.ClassHandler import Election, Party, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
+from src.ConstituencyHandler import district_counts, highest_averages, Parliament
+
+
+class TestConstituency(unittest.TestCase):
+
+    def setUp(self):
+        self.parties = [Party('Party 1', 0.5, 0.5, 0.5, 0.5), Party('Party 2', 0.8, 0.2, 0.7, 0.3),
+                        Party('Party 3', 0.2, 0.8, 0.3, 0.7), Party('Party 4', 0.1, 0.1, 0.1, 0.1)]
+
+    def test_highest_averages(self):
+        votes = [100000, 80000, 30000, 20000]
+        self.assertEqual(highest_averages(votes, 8, "dhondt").tolist(), [4, 3, 1, 0])
+        self.assertEqual(highest_averages(votes, 8, "sainte_lague").tolist(), [3, 3, 1, 1])
+        self.assertEqual(highest_averages([10, 10], 1).tolist(), [1, 0])
+
+    def test_district_counts(self):
+        counts = district_counts(np.array([0, 1, 1, 2, 0]), np.array([0, 0, 1, 1, 1]), 2, 3)
+        self.assertEqual(counts.tolist(), [[1, 1, 0], [1, 1, 1]])
+
+    def test_seats(self):
+        parliament = Parliament(self.parties, [[5, 4, 0, 0], [0, 9, 1, 0], [3, 0, 0, 1]])
+        fptp = parliament.FPTP_seats()
+        self.assertEqual(fptp.seats.tolist(), [2, 1, 0, 0])
+        self.assertEqual(fptp.district_winners.tolist(), [0, 1, 0])
+        self.assertEqual(fptp.votes.tolist(), [8, 13, 1, 1])
+        self.assertIs(parliament.DHondt_seats().winner, self.parties[1])
+        self.assertEqual(parliament.SainteLague_seats(10).seats.sum(), 10)
+
+    def test_from_election(self):
+        election = Election(prearrange_list=True, seed=0)
+        election.prepare_election(1000, 4, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH, nof_districts=10)
+        parliament = Parliament.from_election(election)
+        self.assertEqual(parliament.counts.shape, (10, 4))
+        self.assertEqual(parliament.counts.sum(axis=0).tolist(), election.count("fptp").counts.tolist())
+
+    def test_simulate_reproducible(self):
+        serial = Parliament.simulate(6, 300, 4, seed=3, workers=1)
+        parallel = Parliament.simulate(6, 300, 4, seed=3, workers=2)
+        self.assertEqual(serial.counts.tolist(), parallel.counts.tolist())
+        self.assertEqual(serial.counts.sum(), 1800)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from src.CorpusHandler import build_name_index, clear_name_cache, index_path, load_names
+
+
+class TestCorpus(unittest.TestCase):
+
+    def setUp(self):
+        clear_name_cache()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "names.txt")
+        with open(self.path, "w") as f:
+            f.write("Michael\n  Jessica \r\n\nAshley\n")
+
+    def tearDown(self):
+        clear_name_cache()
+        self.directory.cleanup()
+
+    def test_matches_readlines(self):
+        with open(self.path) as f:
+            expected = [x.strip() for x in f.readlines()]
+        for use_mmap in (True, False):
+            clear_name_cache()
+            self.assertEqual(list(load_names(self.path, use_mmap)), expected)
+
+    def test_no_trailing_newline(self):
+        with open(self.path, "w") as f:
+            f.write("Michael\nAshley")
+        self.assertEqual(list(load_names(self.path)), ["Michael", "Ashley"])
+
+    def test_loaded_once(self):
+        self.assertIs(load_names(self.path), load_names(self.path))
+
+    def test_index(self):
+        build_name_index(self.path)
+        self.assertTrue(os.path.exists(index_path(self.path)))
+        names = load_names(self.path)
+        self.assertEqual(names[1], "Jessica")
+        self.assertEqual(len(names), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
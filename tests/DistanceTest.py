@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from src.DistanceHandler import (distance_matrix, nearest_parties, pairwise_matrix, party_positions, rank_distances,
+                                 rank_matrix)
+from src.ClassHandler import Party
+
+
+class TestDistance(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.ideology = np.round(rng.random((1000, 4)), 2).astype(np.float32)
+        self.positions = np.round(rng.random((7, 4)), 2).astype(np.float32)
+
+    def test_distance_matrix(self):
+        expected = np.abs(self.ideology[:, None, :] - self.positions[None, :, :]).sum(axis=2)
+        distances = distance_matrix(self.ideology, self.positions, chunk_size=64)
+        self.assertEqual(distances.shape, (1000, 7))
+        self.assertTrue(np.allclose(distances, expected))
+
+    def test_nearest_parties_matches_matrix(self):
+        preferred, best = nearest_parties(self.ideology, self.positions, chunk_size=100)
+        distances = distance_matrix(self.ideology, self.positions)
+        self.assertTrue(np.array_equal(preferred, distances.argmin(axis=1)))
+        self.assertTrue(np.array_equal(best, distances.min(axis=1)))
+
+    def test_ties_go_to_first_party(self):
+        positions = np.array([[0.5, 0.5, 0.5, 0.5], [0.5, 0.5, 0.5, 0.5]], dtype=np.float32)
+        preferred, _ = nearest_parties(self.ideology, positions)
+        self.assertFalse(preferred.any())
+
+    def test_rank_matrix(self):
+        rankings = rank_matrix(self.ideology, self.positions, chunk_size=64)
+        distances = distance_matrix(self.ideology, self.positions)
+        self.assertTrue(np.array_equal(rankings[:, 0], distances.argmin(axis=1)))
+        self.assertTrue(np.all(np.diff(np.take_along_axis(distances, rankings.astype(int), axis=1), axis=1) >= 0))
+
+    def test_rank_distances_matches_rank_matrix(self):
+        distances = distance_matrix(self.ideology, self.positions)
+        self.assertTrue(np.array_equal(rank_distances(distances, chunk_size=33), rank_matrix(self.ideology,
+                                                                                             self.positions)))
+
+    def test_pairwise_matrix(self):
+        distances = distance_matrix(self.ideology, self.positions)
+        expected = [[int(np.sum(distances[:, i] < distances[:, j])) for j in range(7)] for i in range(7)]
+        self.assertEqual(pairwise_matrix(self.ideology, self.positions, chunk_size=77).tolist(), expected)
+
+    def test_party_positions(self):
+        positions = party_positions([Party('Party 1', 0.1, 0.2, 0.3, 0.4)])
+        self.assertTrue(np.allclose(positions, [[0.1, 0.2, 0.3, 0.4]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
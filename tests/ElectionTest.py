@@ -1,5 +1,5 @@
 import unittest
-from src.ClassHandler import Election, Voter, Party
+from src.ClassHandler import Election, Voter, Party, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
 
 
 class TestElection(unittest.TestCase):
@@ -15,36 +15,172 @@ class TestElection(unittest.TestCase):
         for party in self.election.parties:
             self.assertTrue(isinstance(party, Party))
 
-    def test_determine_most_suitable_party(self):
+    def test_generate_party_approval(self):
         parties = [
             Party('Party 1', 0.5, 0.5, 0.5, 0.5),
             Party('Party 2', 0.8, 0.2, 0.7, 0.3),
             Party('Party 3', 0.2, 0.8, 0.3, 0.7)
         ]
-        voter = Voter('John', 'Doe', 30, 0.6, 0.4, 0.5, 0.3, Election())
-        self.assertEqual(voter.determine_most_suitable_party(parties), parties[0])
-        voter = Voter('Jane', 'Doe', 25, 0.9, 0.1, 0.8, 0.2, Election())
-        self.assertEqual(voter.determine_most_suitable_party(parties), parties[1])
-        voter = Voter('Bob', 'Smith', 50, 0.1, 0.9, 0.2, 0.8, Election())
-        self.assertEqual(voter.determine_most_suitable_party(parties), parties[2])
+        voter = Voter('John', 'Doe', 30, 0.6, 0.4, 0.5, 0.3, self.election)
+        voter.generate_party_approval(parties)
+        self.assertEqual(voter.most_suitable_party, parties[0])
+        voter = Voter('Jane', 'Doe', 25, 0.9, 0.1, 0.8, 0.2, self.election)
+        voter.generate_party_approval(parties)
+        self.assertEqual(voter.most_suitable_party, parties[1])
+        voter = Voter('Bob', 'Smith', 50, 0.1, 0.9, 0.2, 0.8, self.election)
+        voter.generate_party_approval(parties)
+        self.assertEqual(voter.most_suitable_party, parties[2])
+        self.assertEqual(len(voter.party_scores), 3)
 
     def test_FPTP_vote(self):
-        election = Election(nof_voters=5, nof_parties=2)
+        election = Election(prearrange_list=True)
         election.parties = [
             Party('Party 1', 0.5, 0.5, 0.5, 0.5),
             Party('Party 2', 0.8, 0.2, 0.7, 0.3),
         ]
         election.voters = [
-            Voter('John', 'Doe', 30, 0.6, 0.4, 0.5, 0.3, Election()),  # most suitable: party 1
-            Voter('Jane', 'Doe', 25, 0.9, 0.1, 0.8, 0.2, Election()),  # most suitable: party 2
-            Voter('Bob', 'Smith', 50, 0.1, 0.9, 0.2, 0.8, Election()),  # most suitable: party 2
-            Voter('Alice', 'Johnson', 45, 0.4, 0.6, 0.3, 0.9, Election()),  # most suitable: party 1
-            Voter('Sarah', 'Lee', 29, 0.2, 0.7, 0.6, 0.4, Election())  # most suitable: party 1
+            Voter('John', 'Doe', 30, 0.6, 0.4, 0.5, 0.3, election),  # most suitable: party 1
+            Voter('Jane', 'Doe', 25, 0.9, 0.1, 0.8, 0.2, election),  # most suitable: party 2
+            Voter('Bob', 'Smith', 50, 0.1, 0.9, 0.2, 0.8, election),  # most suitable: party 1
+            Voter('Alice', 'Johnson', 45, 0.4, 0.6, 0.3, 0.9, election),  # most suitable: party 1
+            Voter('Sarah', 'Lee', 29, 0.2, 0.7, 0.6, 0.4, election)  # most suitable: party 1
         ]
 
-        for voter in election.voters:
-            voter.preferred_party = voter.determine_most_suitable_party(election.parties)
-        winner = election.FPTP_vote()
+        preferred = election.generate_party_approval()
+        for voter, index in zip(election.voters, preferred):
+            self.assertIs(voter.most_suitable_party, election.parties[index])
+        result = election.FPTP_vote()
+        self.assertIs(result.winner, election.parties[0])
+        self.assertEqual(result.counts.tolist(), [4, 1])
+
+    def test_replaced_electorate_is_recounted(self):
+        election = Election(prearrange_list=True, seed=2)
+        election.prepare_election(1000, 3)
+        self.assertEqual(election.count("fptp").counts.sum(), 1000)
+        election.clear_voters()
+        election.prepare_election(10, 0)
+        self.assertEqual(election.count("fptp").counts.sum(), 10)
+
+        election.electorate = Election(nof_voters=20, nof_parties=1, seed=3).electorate
+        self.assertEqual(election.count("fptp").counts.sum(), 20)
+
+
+class TestElectionIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.election = Election(prearrange_list=True, seed=0)
+        self.election.prepare_election(100, 5, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH)
+
+    def test_get_and_delete_voter(self):
+        voter = self.election.voters[10]
+        self.assertEqual(self.election.get_voter(voter.id).first_name, voter.first_name)
+        self.election.delete_voter(voter.id)
+        self.assertIsNone(self.election.get_voter(voter.id))
+        self.assertEqual(len(self.election.voters), 99)
+
+    def test_add_voter_rejects_an_impossible_age(self):
+        with self.assertRaises(ValueError):
+            self.election.add_voter("Zed", "Quux", 300, 0.5, 0.5, 0.5, 0.5)
+        self.assertEqual(len(self.election.voters), 100)
+        self.assertEqual(self.election.electorate.first_names.extra, [])
+
+    def test_get_and_delete_party(self):
+        first, last = self.election.parties[0], self.election.parties[-1]
+        self.assertIs(self.election.get_party(first.id), first)
+        self.election.delete_party(first.id)
+        self.assertIsNone(self.election.get_party(first.id))
+        self.assertIs(self.election.parties[0], last)
+        self.assertIs(self.election.get_party(last.id), last)
+
+    def test_party_index_follows_list_edits(self):
+        party = Party('Party 1', 0.5, 0.5, 0.5, 0.5)
+        self.election.get_party(party.id)
+        self.election.parties = [party]
+        self.assertIs(self.election.get_party(party.id), party)
+
+        # Edits in place that keep the length the same
+        replacement, appended = Party('Party 2', 0.1, 0.1, 0.1, 0.1), Party('Party 3', 0.9, 0.9, 0.9, 0.9)
+        self.election.parties[0] = replacement
+        self.assertIs(self.election.get_party(replacement.id), replacement)
+        self.election.parties.pop()
+        self.election.parties.append(appended)
+        self.assertIs(self.election.get_party(appended.id), appended)
+        self.election.delete_party(appended.id)
+        self.assertEqual(self.election.parties, [])
+
+        # Looking up an unknown ID in a list that has not changed does not rebuild the index
+        self.election.parties += [replacement]
+        self.assertIs(self.election.get_party(replacement.id), replacement)
+        index = self.election._party_index
+        self.assertIsNone(self.election.get_party("P-1"))
+        self.assertIs(self.election._party_index, index)
+
+
+class TestIncrementalTally(unittest.TestCase):
+
+    def setUp(self):
+        self.election = Election(prearrange_list=True, seed=1)
+        self.election.prepare_election(2000, 6, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH)
+        self.election.generate_party_approval()
+
+    def assert_matches_recount(self):
+        tally = self.election._current_tally()
+        self.assertIsNotNone(tally)
+        preferred = tally.preferred.copy()
+        counts = tally.counts.copy()
+        self.election._cache = {}
+        self.assertEqual(preferred.tolist(), self.election.generate_party_approval().tolist())
+        self.assertEqual(counts.tolist(), self.election.first_preference_counts().tolist())
+
+    def test_add_party(self):
+        # Sits exactly on an existing party, so every tie has to stay with the earlier party
+        first = self.election.parties[0]
+        self.election.add_party("Copy", first.economic_ideology, first.diplomatic_ideology, first.civil_ideology,
+                                first.social_ideology)
+        self.assertEqual(self.election.first_preference_counts()[-1], 0)
+        self.election.add_party("New", 0.5, 0.5, 0.5, 0.5)
+        self.assert_matches_recount()
+
+    def test_delete_party(self):
+        self.election.add_party("Copy", 0.5, 0.5, 0.5, 0.5)
+        self.election.add_party("Copy", 0.5, 0.5, 0.5, 0.5)
+        self.election.delete_party(self.election.parties[1].id)
+        self.assert_matches_recount()
+        self.election.delete_party(self.election.parties[-1].id)
+        self.assert_matches_recount()
+
+    def test_add_and_delete_voters(self):
+        self.election.add_voter("Jane", "Doe", 25, 0.9, 0.1, 0.8, 0.2)
+        self.election.delete_voter(self.election.voters[3].id)
+        self.assertEqual(self.election.first_preference_counts().sum(), 2000)
+        self.assert_matches_recount()
+
+
+class TestCompareMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.election = Election(prearrange_list=True, seed=2)
+        self.election.prepare_election(3000, 5, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH)
+
+    def test_matches_separate_counts(self):
+        comparison = self.election.compare_methods()
+        self.assertEqual(set(self.election._cache), {"distances", "tally", "rankings", "pairwise"})
+        fresh = Election(prearrange_list=True)
+        fresh.parties, fresh.electorate = self.election.parties, self.election.electorate
+        for method, result in comparison.results.items():
+            self.assertEqual(result.counts.tolist(), fresh.count(method).counts.tolist())
+            self.assertIs(comparison.winners[method], result.winner)
+        self.assertIn("ranked_pairs", comparison.table())
+        self.assertTrue({"approval", "score", "borda"} <= set(comparison.results))
+        self.assertEqual(self.election.compare_methods(["approval"], k=2, seats=3).results["approval"].total, 6000)
+        self.assertEqual(comparison.as_dict()["unanimous"], comparison.unanimous)
+
+    def test_fptp_only_skips_distance_matrix(self):
+        comparison = self.election.compare_methods(["fptp"])
+        self.assertNotIn("distances", self.election._cache)
+        self.assertTrue(comparison.unanimous)
+        with self.assertRaises(ValueError):
+            self.election.compare_methods(["fptp", "plurality"])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from src.ElectorateHandler import Electorate, NameColumn
+
+
+class TestElectorate(unittest.TestCase):
+
+    def setUp(self):
+        self.electorate = Electorate(["John", "Jane"], ["DOE", "SMITH"])
+        self.electorate.generate(100, 0, np.random.default_rng(0))
+
+    def test_generate(self):
+        self.assertEqual(len(self.electorate), 100)
+        self.assertEqual(self.electorate.ideology.shape, (100, 4))
+        self.assertEqual(self.electorate.ideology.dtype, np.float32)
+        self.assertTrue(np.all((self.electorate.ages >= 18) & (self.electorate.ages <= 100)))
+        self.assertTrue(np.array_equal(self.electorate.ids, np.arange(100)))
+
+    def test_append_and_row(self):
+        self.electorate.append(500, "Alice", "DOE", 45, [0.57, 0.6, 0.3, 0.9])
+        self.assertEqual(self.electorate.row(100), (500, "Alice", "DOE", 45, [0.57, 0.6, 0.3, 0.9]))
+        self.assertEqual(self.electorate.last_names.code("DOE"), 0)
+        self.assertEqual(self.electorate.position(500), 100)
+
+    def test_append_rejects_values_that_do_not_fit(self):
+        for age, district in ((256, 0), (-1, 0), (30, 70000)):
+            with self.assertRaises(ValueError):
+                self.electorate.append(500, "Zed", "QUUX", age, [0.5] * 4, district)
+        self.assertEqual(len(self.electorate), 100)
+        self.assertEqual((self.electorate.first_names.extra, self.electorate.last_names.extra), ([], []))
+
+    def test_remove(self):
+        self.electorate.remove(self.electorate.position(10))
+        self.assertEqual(len(self.electorate), 99)
+        self.assertIsNone(self.electorate.position(10))
+        # The last voter takes the removed voter's row
+        self.assertEqual(self.electorate.position(99), 10)
+        self.assertEqual(self.electorate.ids[10], 99)
+
+    def test_index_follows_changes(self):
+        self.assertEqual(self.electorate.position(50), 50)
+        self.electorate.append(500, "Alice", "DOE", 45, [0.5, 0.5, 0.5, 0.5])
+        self.electorate.generate(10, 1000, np.random.default_rng(1))
+        self.electorate.remove(self.electorate.position(0))
+        self.assertEqual(self.electorate.position(1009), 0)
+        self.assertEqual(self.electorate.position(500), 100)
+        for position, voter_id in enumerate(self.electorate.ids):
+            self.assertEqual(self.electorate.position(voter_id), position)
+
+    def test_generate_chunks_matches_generate(self):
+        chunks = list(self.electorate.generate_chunks(250, 0, np.random.default_rng(5), chunk_size=100))
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+        electorate = Electorate(["John", "Jane"], ["DOE", "SMITH"])
+        electorate.generate(250, 0, np.random.default_rng(5), chunk_size=100)
+        self.assertTrue(np.array_equal(np.concatenate([chunk.ideology for chunk in chunks]), electorate.ideology))
+        self.assertTrue(np.array_equal(np.concatenate([chunk.ids for chunk in chunks]), electorate.ids))
+
+    def test_name_column_extra(self):
+        names = NameColumn(["A", "B"])
+        self.assertEqual(names.code("B"), 1)
+        self.assertEqual(names.code("C"), 2)
+        self.assertEqual(names[2], "C")
+        self.assertEqual(len(names.table), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
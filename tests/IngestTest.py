@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.ClassHandler import Election, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
+from src.IngestHandler import BallotIngester, ingest_files, parse_ideology, parse_rankings
+from src.TerminalHandler import run_command
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.election = Election(prearrange_list=True, seed=7)
+        self.election.prepare_election(3000, 4, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH)
+        self.lines = [",".join(f"{value:.2f}" for value in row) for row in self.election.electorate.ideology.tolist()]
+        self.path = os.path.join(self.directory.name, "ballots.csv")
+        with open(self.path, "w") as f:
+            f.write("\n".join(self.lines))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_matches_election(self, results):
+        for method, result in results.items():
+            self.assertEqual(result.counts.tolist(), self.election.count(method).counts.tolist())
+
+    def test_parse_ideology(self):
+        ideology, rejected = parse_ideology(b"0.1,0.2,0.3,0.4\nbad\n\n0.5,0.5,0.5\n1,1,1,nan\n0.2, 0.2 ,0.2,0.2")
+        self.assertEqual(ideology.tolist(), np.array([[0.1, 0.2, 0.3, 0.4], [0.2] * 4], dtype=np.float32).tolist())
+        self.assertEqual(rejected, 3)
+        ideology, rejected = parse_ideology(b"0.1,,0.3,0.4\n0.5,0.6,,0.8\n,0.2,0.3,0.4\n0.5,0.6,0.7,\n1,1,1,1\n")
+        self.assertEqual((ideology.tolist(), rejected), ([[1.0] * 4], 4))
+        ideology, rejected = parse_ideology(b"5,-3,0.3,0.4\n0,0,0,1\n0.5,0.5,1.5,0.5\n0.5,0.5,0.5,inf\n-0.1,0,0,0\n")
+        self.assertEqual((ideology.tolist(), rejected), ([[0.0, 0.0, 0.0, 1.0]], 4))
+
+    def test_parse_rankings(self):
+        parties = self.election.parties
+        data = f"0,1,2,3\n{parties[3].id},{parties[2].id},1,0\n0,0,1,2\n0,1,2\n".encode()
+        rankings, rejected = parse_rankings(data, parties)
+        self.assertEqual(rankings.tolist(), [[0, 1, 2, 3], [3, 2, 1, 0]])
+        self.assertEqual(rejected, 2)
+        rankings, rejected = parse_rankings(b"0,1,2,3\n3,,2 1,0\n", parties)
+        self.assertEqual((rankings.tolist(), rejected), ([[0, 1, 2, 3]], 1))
+
+    def test_ingest_files_matches_election(self):
+        ingester = ingest_files(self.election.parties, [self.path], ("fptp", "copeland", "borda", "score"),
+                                read_size=1000)
+        self.assertEqual((ingester.tally.nof_voters, ingester.rejected), (3000, 0))
+        self.assert_matches_election(ingester.snapshot())
+
+    def test_socket_with_snapshots(self):
+        async def run():
+            ingester = BallotIngester(self.election.parties, ("fptp", "schulze"), max_pending=2, read_size=512)
+            self.assertEqual(ingester.snapshot(), {"fptp": None, "schulze": None})
+            server = await ingester.serve()
+            host, port = server.sockets[0].getsockname()[:2]
+            data = "\n".join(self.lines).encode()
+            for start in range(0, len(data), len(data) // 2 + 1):
+                _, writer = await asyncio.open_connection(host, port)
+                # Written in pieces that split ballots, which must be put back together
+                for piece in range(start, min(start + len(data) // 2 + 1, len(data)), 777):
+                    writer.write(data[piece:min(piece + 777, start + len(data) // 2 + 1, len(data))])
+                    await writer.drain()
+                if start == 0:
+                    writer.write(b"\n")
+                writer.close()
+                await writer.wait_closed()
+            while ingester.tally.nof_voters < 3000:
+                await asyncio.sleep(0.01)
+            server.close()
+            return await ingester.close()
+
+        self.assert_matches_election(asyncio.run(run()))
+
+    def test_overlong_lines_are_dropped(self):
+        async def run(data):
+            ingester = BallotIngester(self.election.parties, read_size=16)
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            await ingester.ingest_reader(reader)
+            await ingester.close()
+            return ingester.tally.nof_voters, ingester.rejected
+
+        self.assertEqual(asyncio.run(run(b"0.1," * 100 + b"\n0.1,0.2,0.3,0.4\n" + b"9" * 100)), (1, 2))
+        self.assertEqual(asyncio.run(run(b"0.1,0.2,0.3,0.4\n0.5,0.5,0.5,0.5")), (2, 0))
+
+    def test_ranked_ballots(self):
+        rankings = self.election.party_rankings()
+        path = os.path.join(self.directory.name, "rankings.csv")
+        with open(path, "w") as f:
+            f.write("\n".join(",".join(map(str, row)) for row in rankings.tolist()))
+        ingester = ingest_files(self.election.parties, [path], ("fptp", "ranked_pairs", "borda"), "ranking")
+        self.assert_matches_election(ingester.snapshot())
+        with self.assertRaises(ValueError):
+            BallotIngester(self.election.parties, ("score",), "ranking")
+
+    def test_ingest_command(self):
+        out = os.path.join(self.directory.name, "results.json")
+        self.election.save(os.path.join(self.directory.name, "election.vme"))
+        argv = ["ingest", self.path, self.path, "--load", os.path.join(self.directory.name, "election.vme"),
+                "--method", "approval", "--out", out]
+        self.assertEqual(run_command(argv), 0)
+        with open(out) as f:
+            output = json.load(f)
+        self.assertEqual(output["ballots"], 6000)
+        self.assertEqual(output["results"]["approval"]["counts"],
+                         (2 * self.election.count("approval").counts).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
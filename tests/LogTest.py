@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+from src.ClassHandler import Election
+from src.LogHandler import get_logger, Profiler, PROFILER, set_log_level
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        profiler = Profiler()
+        with profiler.span("tally"):
+            profiler.count("ballots counted", 10)
+        self.assertEqual(profiler.as_dict(), {"phases": {}, "counters": {}})
+
+    def test_nested_spans(self):
+        profiler = Profiler()
+        profiler.enable()
+        with profiler.span("tally"):
+            with profiler.span("distances"):
+                time.sleep(0.02)
+            profiler.count("ballots counted", 5)
+            profiler.count("ballots counted", 5)
+        recorded = profiler.as_dict()
+        tally, distances = recorded["phases"]["tally"], recorded["phases"]["distances"]
+        self.assertEqual(tally["calls"], 1)
+        self.assertGreaterEqual(tally["seconds"], distances["seconds"])
+        self.assertLess(tally["self_seconds"], distances["self_seconds"])
+        self.assertEqual(recorded["counters"]["ballots counted"], 10)
+        self.assertIn("distances", profiler.table())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            profiler.to_json(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["counters"], {"ballots counted": 10})
+
+    def test_election_phases(self):
+        PROFILER.enable()
+        try:
+            election = Election(nof_voters=500, nof_parties=4, seed=1)
+            election.count("fptp")
+            election.count("irv")
+            election.count("fptp")
+        finally:
+            PROFILER.disable()
+        recorded = PROFILER.as_dict()
+        self.assertTrue({"corpus load", "generation", "distances", "tally"} <= set(recorded["phases"]))
+        self.assertEqual(recorded["phases"]["tally"]["calls"], 3)
+        self.assertEqual(recorded["counters"]["voters generated"], 500)
+        self.assertEqual(recorded["counters"]["cache hits"], 1)
+
+    def test_reductions_are_not_counted_as_distances(self):
+        election = Election(nof_voters=1000, nof_parties=5, seed=1)
+        PROFILER.enable()
+        try:
+            election.compare_methods()
+        finally:
+            PROFILER.disable()
+        recorded = PROFILER.as_dict()
+        self.assertEqual(recorded["counters"]["distance cells"], 5000)
+        self.assertEqual(recorded["phases"]["distances"]["calls"], 1)
+
+    def test_set_log_level(self):
+        self.assertEqual(set_log_level("warning"), logging.WARNING)
+        self.assertEqual(get_logger("election").getEffectiveLevel(), logging.WARNING)
+        with self.assertRaises(ValueError):
+            set_log_level("loud")
+
+
+if __name__ == '__main__':
+    unittest.main()
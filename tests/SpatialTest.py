@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from src.DistanceHandler import nearest_parties
+from src.SpatialHandler import find_nearest_parties, PartyIndex
+
+
+class TestSpatial(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.ideology = np.round(rng.random((3000, 4)), 2).astype(np.float32)
+        self.positions = np.round(rng.random((500, 4)), 1).astype(np.float32)
+
+    def assert_matches_brute_force(self, positions, **options):
+        expected = nearest_parties(self.ideology, positions)
+        found = PartyIndex(positions, **options).nearest(self.ideology, chunk_size=700)
+        self.assertTrue(np.array_equal(found[0], expected[0]))
+        self.assertTrue(np.array_equal(found[1], expected[1]))
+
+    def test_matches_brute_force(self):
+        for leaf_size in (None, 4, 1000):
+            self.assert_matches_brute_force(self.positions, leaf_size=leaf_size)
+
+    def test_ties_go_to_first_party(self):
+        # Every position appears twice, with the copies at the end, so every voter has a tie to break
+        self.assert_matches_brute_force(np.concatenate([self.positions[::-1], self.positions]), leaf_size=8)
+
+    def test_find_nearest_parties(self):
+        for positions in (self.positions[:10], self.positions):
+            self.assertTrue(np.array_equal(find_nearest_parties(self.ideology, positions)[0],
+                                           nearest_parties(self.ideology, positions)[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
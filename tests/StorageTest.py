@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.ClassHandler import Election, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH
+from src.StorageHandler import read_election_file
+from src.TerminalHandler import run_command
+
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "election.vme")
+        self.election = Election(prearrange_list=True, seed=5)
+        self.election.prepare_election(2000, 4, FIRST_NAME_PATH, LAST_NAME_PATH, PARTY_NAME_PATH, nof_districts=3)
+        self.election.add_voter("Zebedee", "Quux", 33, 0.1, 0.2, 0.3, 0.4)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        self.election.save(self.path)
+        loaded = Election.load(self.path)
+
+        self.assertEqual(len(loaded.voters), 2001)
+        self.assertEqual([party.name for party in loaded.parties], [party.name for party in self.election.parties])
+        self.assertTrue(np.array_equal(loaded.electorate.ideology, self.election.electorate.ideology))
+        self.assertTrue(np.array_equal(loaded.electorate.districts, self.election.electorate.districts))
+        self.assertEqual(loaded.voters[0].first_name, self.election.voters[0].first_name)
+        self.assertEqual(loaded.voters[-1].last_name, "Quux")
+        self.assertEqual(loaded.count("irv").counts.tolist(), self.election.count("irv").counts.tolist())
+        self.assertEqual(loaded.rng.random(), self.election.rng.random())
+
+    def test_columns_are_mapped_and_file_unchanged(self):
+        self.election.save(self.path)
+        with open(self.path, "rb") as f:
+            before = f.read()
+
+        loaded = Election.load(self.path)
+        self.assertIsInstance(loaded.electorate._ideology, np.memmap)
+        first = loaded.voters[0]
+        loaded.delete_voter(first.id)
+        loaded.add_voter("Ann", "Other", 50, 0.5, 0.5, 0.5, 0.5)
+        self.assertIsNone(loaded.get_voter(first.id))
+        self.assertNotEqual(loaded.voters[-1].id, self.election.voters[-1].id)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), before)
+
+    def test_loaded_election_saves_to_the_same_size(self):
+        self.election.save(self.path)
+        size = os.path.getsize(self.path)
+        path = self.path
+        for i in range(3):
+            loaded = Election.load(path)
+            path = os.path.join(self.directory.name, f"again{i}.vme")
+            loaded.save(path)
+            self.assertLessEqual(os.path.getsize(path), size + 1024)
+        again = Election.load(path)
+        self.assertEqual(again.voters[5].first_name, self.election.voters[5].first_name)
+        self.assertEqual(again.voters[-1].last_name, "Quux")
+
+    def test_save_over_the_loaded_file(self):
+        self.election.save(self.path)
+        loaded = Election.load(self.path)
+        loaded.add_voter("Ann", "Other", 50, 0.5, 0.5, 0.5, 0.5)
+        loaded.save(self.path)
+        # The election saved over its own file still reads from the old one
+        self.assertEqual(loaded.voters[0].first_name, self.election.voters[0].first_name)
+
+        again = Election.load(self.path)
+        self.assertEqual(len(again.voters), 2002)
+        self.assertEqual(again.voters[-1].first_name, "Ann")
+        self.assertTrue(np.array_equal(again.electorate.ideology[:2001], self.election.electorate.ideology))
+        self.assertEqual(os.listdir(self.directory.name), ["election.vme"])
+
+    def test_empty_and_invalid_files(self):
+        Election(prearrange_list=True).save(self.path)
+        electorate, parties, _ = read_election_file(self.path)
+        self.assertEqual((len(electorate), parties), (0, []))
+
+        with open(self.path, "wb") as f:
+            f.write(b"not an election")
+        with self.assertRaises(ValueError):
+            Election.load(self.path)
+
+    def test_simulate_save_and_load(self):
+        out = os.path.join(self.directory.name, "results.json")
+        self.assertEqual(run_command(["simulate", "--voters", "300", "--save", self.path, "--out", out]), 0)
+        self.assertEqual(run_command(["simulate", "--load", self.path, "--method", "copeland", "--out", out]), 0)
+        self.assertEqual(run_command(["simulate", "--load", self.path, "--stream", "--out", out]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
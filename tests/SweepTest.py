@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+from src.ClassHandler import Election, Party
+from src.ElectorateHandler import Electorate
+from src.LogHandler import PROFILER
+from src.SweepHandler import Sweep
+
+METHODS = ("fptp", "irv", "schulze", "approval", "score", "borda")
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.election = Election(prearrange_list=True, seed=11)
+        self.election.prepare_election(3000, 4)
+        self.sweep = Sweep.from_election(self.election, METHODS)
+
+    def recount(self, parties=None, ideology=None):
+        """Returns a fresh Election over the same voters with the given parties or ideologies."""
+        election = Election(prearrange_list=True)
+        election.electorate = self.election.electorate
+        if ideology is not None:
+            columns = {name: getattr(self.election.electorate, name)[:len(self.election.electorate)]
+                       for name in ("_ids", "_ages", "_first_name_codes", "_last_name_codes", "_districts")}
+            election.electorate = Electorate.from_columns(dict(columns, _ideology=ideology))
+        election.parties = parties or self.election.parties
+        return election
+
+    def assert_point(self, result, point, election):
+        for method in METHODS:
+            expected = election.count(method)
+            self.assertEqual(result.winners[method][point], expected.winner_index)
+            np.testing.assert_array_equal(result.shares[method][point], expected.shares)
+
+    def test_move_party_matches_election(self):
+        grid = {"economic": np.linspace(0, 1, 4), "social": np.linspace(0, 1, 3)}
+        result = self.sweep.move_party(2, grid)
+        self.assertEqual(result.shape, (4, 3))
+        for i, economic in enumerate(grid["economic"]):
+            for j, social in enumerate(grid["social"]):
+                parties = [Party(party.name, party.economic_ideology, party.diplomatic_ideology, party.civil_ideology,
+                                 party.social_ideology) for party in self.election.parties]
+                parties[2].economic_ideology, parties[2].social_ideology = float(economic), float(social)
+                self.assert_point(result, (i, j), self.recount(parties))
+
+    def test_ties_go_to_the_first_party(self):
+        first, second = self.election.parties[0], self.election.parties[1]
+        position = (first.economic_ideology, first.diplomatic_ideology, first.civil_ideology, first.social_ideology)
+        onto_first = self.sweep.move_party(second.id, dict(zip(("economic", "diplomatic", "civil", "social"),
+                                                                 ([value] for value in position))))
+        self.assertEqual(onto_first.shares["fptp"][0, 0, 0, 0, 1], 0)
+        self.assertGreater(onto_first.shares["fptp"][0, 0, 0, 0, 0], 0)
+
+    def test_shift_electorate_matches_election(self):
+        grid = {"shift": [-0.2, 0.0, 0.3], "spread": [0.5, 1.5]}
+        result = self.sweep.shift_electorate("civil", grid)
+        ideology = self.election.electorate.ideology
+        centre = np.float32(ideology[:, 2].mean())
+        for i, shift in enumerate(grid["shift"]):
+            for j, spread in enumerate(grid["spread"]):
+                moved = ideology.copy()
+                moved[:, 2] = np.clip(centre + np.float32(spread) * (moved[:, 2] - centre) + np.float32(shift), 0, 1)
+                self.assert_point(result, (i, j), self.recount(ideology=moved))
+
+    def test_repeated_points_are_reused(self):
+        PROFILER.enable()
+        try:
+            self.sweep.move_party(0, {"civil": [0.1, 0.5, 0.1]})
+            self.sweep.move_party(0, {"civil": [0.5, 0.9]})
+        finally:
+            PROFILER.disable()
+        self.assertEqual(PROFILER.counters["sweep points counted"], 3)
+        self.assertEqual(PROFILER.counters["sweep points reused"], 2)
+
+    def test_workers_give_the_same_maps(self):
+        grid = {"economic": np.linspace(0, 1, 5)}
+        serial = Sweep.from_election(self.election, ("fptp", "borda")).move_party(1, grid)
+        parallel = Sweep.from_election(self.election, ("fptp", "borda")).move_party(1, grid, workers=2)
+        self.assertEqual(serial.as_dict(), parallel.as_dict())
+
+    def test_invalid_sweeps(self):
+        with self.assertRaises(ValueError):
+            self.sweep.move_party(0, {"shift": [0.1]})
+        with self.assertRaises(ValueError):
+            self.sweep.shift_electorate("civil", {"economic": [0.1]})
+        with self.assertRaises(ValueError):
+            self.sweep.move_party("P-1", {"economic": [0.1]})
+        with self.assertRaises(ValueError):
+            Sweep.from_election(self.election, ("plurality",))
+
+
+if __name__ == '__main__':
+    unittest.main()
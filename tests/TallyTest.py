@@ -0,0 +1,138 @@
+import unittest
+import numpy as np
+from src.ClassHandler import Party
+from src.DistanceHandler import distance_matrix, pairwise_matrix, party_positions, rank_matrix
+from src.TallyHandler import (approval_tally, borda_tally, copeland_tally, fptp_tally, ranked_pairs_tally, ranked_tally,
+                              schulze_tally, score_tally, StreamingTally)
+
+
+class TestTally(unittest.TestCase):
+
+    def setUp(self):
+        self.parties = [Party('Party 1', 0.5, 0.5, 0.5, 0.5), Party('Party 2', 0.8, 0.2, 0.7, 0.3),
+                        Party('Party 3', 0.2, 0.8, 0.3, 0.7)]
+
+    def test_fptp_tally(self):
+        result = fptp_tally(np.array([0, 1, 1, 2, 1]), self.parties)
+        self.assertEqual(result.counts.tolist(), [1, 3, 1])
+        self.assertIs(result.winner, self.parties[1])
+        self.assertAlmostEqual(result.shares[1], 0.6)
+        self.assertEqual([party.votes for party in self.parties], [0, 0, 0])
+
+    def test_fptp_tie_goes_to_first_party(self):
+        result = fptp_tally(np.array([2, 1]), self.parties)
+        self.assertIs(result.winner, self.parties[1])
+
+    def test_result_is_immutable(self):
+        result = fptp_tally(np.array([0, 1]), self.parties)
+        with self.assertRaises(ValueError):
+            result.counts[0] = 5
+        with self.assertRaises(AttributeError):
+            result.winner_index = 2
+
+    def test_irv_matches_full_recount(self):
+        rng = np.random.default_rng(3)
+        rankings = np.array([rng.permutation(3) for _ in range(301)])
+        result = ranked_tally(rankings, self.parties)
+
+        # Recounts every ballot from scratch each round
+        remaining = [0, 1, 2]
+        while True:
+            counts = {party: 0 for party in remaining}
+            for ranking in rankings:
+                counts[next(party for party in ranking if party in remaining)] += 1
+            leader = max(remaining, key=lambda party: counts[party])
+            if counts[leader] * 2 > len(rankings) or len(remaining) == 1:
+                break
+            remaining.remove(min(remaining, key=lambda party: counts[party]))
+        self.assertEqual(result.winner_index, leader)
+        self.assertEqual(result.rounds[0].tolist(), np.bincount(rankings[:, 0], minlength=3).tolist())
+
+    def test_irv_eliminates_and_transfers(self):
+        # Party 3 is eliminated first and its ballots carry Party 1 past Party 2
+        rankings = np.array([[0, 2, 1]] * 4 + [[1, 0, 2]] * 5 + [[2, 0, 1]] * 3)
+        result = ranked_tally(rankings, self.parties)
+        self.assertEqual(result.eliminated, (2,))
+        self.assertIs(result.winner, self.parties[0])
+        self.assertEqual(result.counts.tolist(), [7, 5, 0])
+
+    def test_stv_surplus_transfer(self):
+        rankings = np.array([[0, 1, 2]] * 8 + [[2, 1, 0]] * 3 + [[1, 2, 0]] * 1)
+        result = ranked_tally(rankings, self.parties, seats=2)
+        self.assertEqual(result.method, "stv")
+        self.assertEqual(result.elected, (0, 1))
+
+    def test_schulze_example(self):
+        # The 45 voter example from Schulze's paper, where E wins despite there being no Condorcet winner
+        pairwise = np.array([[0, 20, 26, 30, 22], [25, 0, 16, 33, 18], [19, 29, 0, 17, 24], [15, 12, 28, 0, 14],
+                             [23, 27, 21, 31, 0]])
+        parties = self.parties + [Party('Party 4', 0, 0, 0, 0), Party('Party 5', 1, 1, 1, 1)]
+        result = schulze_tally(pairwise, parties)
+        self.assertEqual(result.winner_index, 4)
+        self.assertIsNone(result.condorcet_winner)
+        self.assertEqual(result.counts.tolist(), [3, 1, 2, 0, 4])
+
+    def test_condorcet_methods_agree_on_condorcet_winner(self):
+        pairwise = np.array([[0, 6, 7], [4, 0, 6], [3, 4, 0]])
+        for tally in (schulze_tally, copeland_tally, ranked_pairs_tally):
+            result = tally(pairwise, self.parties)
+            self.assertEqual(result.winner_index, 0)
+            self.assertEqual(result.condorcet_winner, 0)
+
+    def test_ranked_pairs_skips_cycles(self):
+        # 0 beats 1 by 7-3 and 1 beats 2 by 6-4 are locked first, so 2 beating 0 by 6-4 would close a cycle
+        pairwise = np.array([[0, 7, 4], [3, 0, 6], [6, 4, 0]])
+        result = ranked_pairs_tally(pairwise, self.parties)
+        self.assertEqual(result.winner_index, 0)
+        self.assertEqual(result.counts.tolist(), [1, 1, 0])
+
+    def test_streaming_tally_matches_full_count(self):
+        ideology = np.round(np.random.default_rng(2).random((500, 4)), 2).astype(np.float32)
+        positions = party_positions(self.parties)
+        tally = StreamingTally(self.parties, ("fptp", "schulze"))
+        for start in range(0, 500, 128):
+            tally.add(distance_matrix(ideology[start:start + 128], positions))
+        preferred = distance_matrix(ideology, positions).argmin(axis=1)
+        self.assertEqual(tally.result().counts.tolist(), fptp_tally(preferred, self.parties).counts.tolist())
+        self.assertEqual(tally.pairwise.tolist(), pairwise_matrix(ideology, positions).tolist())
+        with self.assertRaises(ValueError):
+            StreamingTally(self.parties, ("irv",))
+
+    def test_approval_tally(self):
+        distances = np.array([[0.2, 1.0, 1.8], [1.5, 0.4, 0.3]], dtype=np.float32)
+        self.assertEqual(approval_tally(self.parties, distances).counts.tolist(), [1, 2, 1])
+        self.assertEqual(approval_tally(self.parties, distances, threshold=0.3).counts.tolist(), [1, 0, 1])
+        rankings = np.array([[0, 1, 2], [2, 1, 0]])
+        result = approval_tally(self.parties, rankings=rankings, k=1)
+        self.assertEqual(result.counts.tolist(), [1, 0, 1])
+        self.assertIs(result.winner, self.parties[0])
+        with self.assertRaises(ValueError):
+            approval_tally(self.parties, distances, rankings, threshold=1.0, k=1)
+
+    def test_score_tally(self):
+        distances = np.array([[0.2, 1.0, 1.8], [1.0, 1.0, 1.0]], dtype=np.float32)
+        self.assertEqual(score_tally(distances, self.parties).counts.tolist(), [20, 15, 10])
+        self.assertEqual(score_tally(distances, self.parties, max_score=2).counts.tolist(), [4, 3, 2])
+
+    def test_borda_tally(self):
+        result = borda_tally(np.array([[0, 1, 2], [2, 0, 1]]), self.parties)
+        self.assertEqual(result.counts.tolist(), [3, 1, 2])
+        self.assertEqual(result.method, "borda")
+
+    def test_streaming_totals_match_full_count(self):
+        ideology = np.round(np.random.default_rng(3).random((500, 4)), 2).astype(np.float32)
+        positions = party_positions(self.parties)
+        distances, rankings = distance_matrix(ideology, positions), rank_matrix(ideology, positions)
+        for options in ({"threshold": 0.9}, {"k": 2}):
+            tally = StreamingTally(self.parties, ("approval", "score", "borda"), max_score=5, **options)
+            for start in range(0, 500, 128):
+                tally.add(distances[start:start + 128])
+            self.assertEqual(tally.result("approval").counts.tolist(),
+                             approval_tally(self.parties, distances, rankings, **options).counts.tolist())
+            self.assertEqual(tally.result("score").counts.tolist(),
+                             score_tally(distances, self.parties, 5).counts.tolist())
+            self.assertEqual(tally.result("borda").counts.tolist(), borda_tally(rankings, self.parties).counts.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
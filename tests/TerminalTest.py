@@ -0,0 +1,93 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.TerminalHandler import run_command
+
+
+class TestTerminal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.directory.name, "results.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_json(self, *argv):
+        self.assertEqual(run_command(list(argv) + ["--out", self.out]), 0)
+        with open(self.out) as f:
+            return json.load(f)
+
+    def test_simulate(self):
+        output = self.run_json("simulate", "--voters", "500", "--parties", "3", "--method", "fptp", "--method", "irv",
+                               "--seed", "4")
+        self.assertEqual(set(output["results"]), {"fptp", "irv"})
+        self.assertEqual(sum(output["results"]["fptp"]["counts"]), 500)
+        again = self.run_json("simulate", "--voters", "500", "--parties", "3", "--method", "fptp", "--method", "irv",
+                              "--seed", "4")
+        self.assertEqual(output["results"]["fptp"]["counts"], again["results"]["fptp"]["counts"])
+
+    def test_cardinal_methods(self):
+        stored = self.run_json("simulate", "--voters", "400", "--method", "approval", "--method", "borda", "--method",
+                               "score", "--approvals", "2", "--max-score", "5", "--seed", "3")
+        streamed = self.run_json("simulate", "--voters", "400", "--method", "approval", "--method", "borda", "--method",
+                                 "score", "--approvals", "2", "--max-score", "5", "--seed", "3", "--stream",
+                                 "--chunk-size", "1000")
+        self.assertEqual(sum(stored["results"]["approval"]["counts"]), 800)
+        for method in ("approval", "borda", "score"):
+            self.assertEqual(stored["results"][method]["counts"], streamed["results"][method]["counts"])
+
+    def test_config_file(self):
+        config = os.path.join(self.directory.name, "config.json")
+        with open(config, "w") as f:
+            json.dump({"voters": 200, "parties": 2, "method": "copeland", "stream": True}, f)
+        output = self.run_json("simulate", "--config", config, "--parties", "4")
+        self.assertEqual(len(output["results"]["copeland"]["counts"]), 4)
+        self.assertEqual(output["options"]["voters"], 200)
+
+    def test_config_file_errors(self):
+        config = os.path.join(self.directory.name, "config.json")
+        for options in ({"voters": "abc"}, {"voters": 2.5}, {"stream": "yes"}, {"method": ["fptp", "lottery"]},
+                        {"votes": 10}):
+            with open(config, "w") as f:
+                json.dump(options, f)
+            errors = io.StringIO()
+            with contextlib.redirect_stderr(errors):
+                self.assertEqual(run_command(["simulate", "--config", config, "--out", self.out]), 2)
+            self.assertIn("Error!", json.loads(errors.getvalue())["error"])
+        with open(config, "w") as f:
+            json.dump({"voters": "200", "runs": 3, "steps": 5}, f)
+        self.assertEqual(self.run_json("simulate", "--config", config)["options"]["voters"], 200)
+
+    def test_batch_and_parliament(self):
+        output = self.run_json("batch", "--runs", "3", "--voters", "100", "--workers", "1", "--seed", "1")
+        self.assertEqual(len(output["runs"]), 3)
+        output = self.run_json("parliament", "--districts", "5", "--voters", "100", "--workers", "1")
+        self.assertEqual(sum(output["results"]["dhondt"]["seats"]), 5)
+
+    def test_profile(self):
+        output = self.run_json("simulate", "--voters", "300", "--method", "schulze", "--profile")
+        self.assertIn("distances", output["profile"]["phases"])
+        self.assertEqual(output["profile"]["counters"]["ballots counted"], 300)
+
+    def test_sweep(self):
+        output = self.run_json("sweep", "--voters", "500", "--party", "1", "--axis", "economic", "--axis", "social",
+                               "--steps", "3", "--method", "fptp", "--method", "borda", "--workers", "1", "--seed", "2")
+        self.assertEqual(output["sweep"]["target"], output["sweep"]["parties"][1])
+        self.assertEqual(len(output["sweep"]["winners"]["borda"]), 3)
+        self.assertEqual(len(output["sweep"]["shares"]["fptp"][0][0]), 5)
+        electorate = self.run_json("sweep", "--voters", "500", "--electorate", "civil", "--axis", "spread",
+                                   "--range", "0.5", "1.5", "--steps", "2", "--workers", "1", "--seed", "2")
+        self.assertEqual(electorate["sweep"]["parameters"], {"spread": [0.5, 1.5]})
+        self.assertEqual(run_command(["sweep", "--electorate", "civil", "--axis", "social", "--workers", "1"]), 1)
+
+    def test_errors(self):
+        self.assertEqual(run_command(["simulate", "--config", os.path.join(self.directory.name, "missing.json")]), 2)
+        self.assertEqual(run_command(["simulate", "--method", "stv", "--seats", "0", "--out", self.out]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()